@@ -1,3 +1,4 @@
 from .viewsets import *
 from .generics import *
 from .api_views import *
+from .mixins import *
@@ -0,0 +1,30 @@
+from rest_framework.response import Response
+
+
+class PageSerializerContextMixin:
+    """
+    PageSerializerContextMixin: Builds part of the serializer context from the objects of the current page.
+    The list handler paginates first and then calls get_page_serializer_context with the visible objects only,
+    so batch computations run for one page instead of the whole queryset.
+    Example: Use in a list view whose serializer reads precomputed data (e.g. missing products) from its context.
+    """
+
+    def get_page_serializer_context(self, objects):
+        """
+        Return extra serializer context for the objects that are about to be serialized.
+        """
+        return {}
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        objects = list(page if page is not None else queryset)
+
+        context = self.get_serializer_context()
+        context.update(self.get_page_serializer_context(objects))
+        serializer = self.get_serializer(objects, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
@@ -6,7 +6,6 @@ from django.core.validators import MinValueValidator
 from apps.base.exceptions.exception_error import CustomExceptionError
 from apps.base.models import AbstractBaseModel
 from apps.foods.utils import CalculatePrices
-from apps.menus.models import Menu
 
 
 class FoodSection(AbstractBaseModel):
@@ -132,16 +131,7 @@ class Food(AbstractBaseModel):
         super().save(*args, **kwargs)
 
     def changing_dependent_objects(self):
-        menus = self.menus.annotate(
-            has_inactive_food=models.Exists(self.menus.filter(foods__status=False))
-        )
-
-        for menu in menus:
-            menu.status = not menu.has_inactive_food
-            menu.calculate_prices()
-
-        Menu.objects.bulk_update(menus, ["net_price", "gross_price", "status"])
-        CalculatePrices.calculate_objects(objs=menus, type="food")
+        CalculatePrices.calculate_objects(objs=self.menus.all(), type="food")
 
     def change_dependent(self):
         self.change_object()
@@ -1,13 +1,13 @@
 from decimal import ROUND_UP, ROUND_HALF_UP, Decimal
 from django.db import models
-from django.db.models import F, When, Value, DecimalField, Case, ExpressionWrapper, Sum
+from django.db.models import F, When, Value, DecimalField, Case, ExpressionWrapper
 from django.core.validators import MinValueValidator
 
 from apps.base.exceptions import CustomExceptionError
 from apps.base.models import AbstractBaseModel
-from apps.foods.models.food import Food
 from apps.foods.utils import CalculatePrices
 from apps.warehouses.models import Warehouse
+from apps.warehouses.utils.product_stock import get_available_quantities
 
 
 class RecipeFood(AbstractBaseModel):
@@ -106,13 +106,9 @@ class RecipeFood(AbstractBaseModel):
     def save(self, *args, **kwargs):
         warehouse, product = self.get_product_in_warehouse()
         self.calculate_prices(warehouse=warehouse)
-        product_count = warehouse.aggregate(total=Sum("count"))["total"] or Decimal('0')
+        available_quantity = get_available_quantities([product.id])[product.id]
 
-        # Calculate actual available quantity considering difference_measures
-        difference_measures = product.difference_measures if product.difference_measures else Decimal('1')
-        available_quantity = product_count * difference_measures
-
-        if product_count == Decimal('0') or self.count > available_quantity:
+        if available_quantity == Decimal('0') or self.count > available_quantity:
             self.status = False
         else:
             self.status = True
@@ -121,10 +117,7 @@ class RecipeFood(AbstractBaseModel):
         self.changing_dependent_objects()
 
     def changing_dependent_objects(self):
-        foods = list(self.foods.all().prefetch_related("recipes").distinct())
-        for food in foods:
-            food.calculate_prices()
-        Food.objects.bulk_update(foods, ["net_price", "gross_price"])
+        foods = self.foods.all()
         CalculatePrices.calculate_objects(objs=foods, type="recipe_food")
 
     def delete(self, using=None, keep_parents=False):
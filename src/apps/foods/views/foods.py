@@ -7,14 +7,16 @@ from apps.base.views import (
     CustomListCreateAPIView,
     CustomRetrieveUpdateDestroyAPIView,
     CustomGenericAPIView,
+    PageSerializerContextMixin,
 )
 from apps.foods.models import Food, FoodSection
 from apps.foods.serializers import FoodSerializer, FoodCreateUpdateSerializer, FoodSectionSerializer, OptimizedFoodSerializer
 from apps.foods.utils.missing_products import calculate_missing_products_batch
 from apps.warehouses.utils import validate_uuid
+from apps.warehouses.views.mixins import CatalogStaleMixin
 
 
-class FoodRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
+class FoodRetrieveUpdateDestroyAPIView(CatalogStaleMixin, CustomRetrieveUpdateDestroyAPIView):
     queryset = Food.objects.all().prefetch_related("recipes", "recipes__product")
     serializer_class = FoodSerializer
 
@@ -24,7 +26,7 @@ class FoodRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
         return super().get_serializer(*args, **kwargs)
 
 
-class FoodListCreateAPIView(CustomListCreateAPIView):
+class FoodListCreateAPIView(CatalogStaleMixin, PageSerializerContextMixin, CustomListCreateAPIView):
     queryset = Food.objects.all().prefetch_related(
         "recipes",
         "recipes__product",
@@ -41,20 +43,13 @@ class FoodListCreateAPIView(CustomListCreateAPIView):
             return FoodCreateUpdateSerializer(*args, **kwargs)
         return super().get_serializer(*args, **kwargs)
 
-    def get_serializer_context(self):
+    def get_page_serializer_context(self, objects):
         """
-        Add batch missing products data to serializer context for optimization.
+        Add batch missing products data of the current page to serializer context.
+        Only foods with status False show missing products.
         """
-        context = super().get_serializer_context()
-
-        # Only calculate batch missing products for list views (GET requests)
-        if self.request.method == "GET":
-            queryset = self.get_queryset()
-            # Pre-calculate missing products for all foods in the queryset
-            missing_products_batch = calculate_missing_products_batch(queryset)
-            context['missing_products_batch'] = missing_products_batch
-
-        return context
+        missing_products_batch = calculate_missing_products_batch([food for food in objects if not food.status])
+        return {"missing_products_batch": missing_products_batch}
 
 
 class FoodsOnMenu(CustomGenericAPIView):
@@ -11,9 +11,10 @@ from apps.base.views import (
 from apps.foods.models import RecipeFood
 from apps.foods.serializers import RecipeFoodSerializer, RecipeUpdateFoodSerializer
 from apps.warehouses.utils import validate_uuid
+from apps.warehouses.views.mixins import CatalogStaleMixin
 
 
-class RecipeFoodRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
+class RecipeFoodRetrieveUpdateDestroyAPIView(CatalogStaleMixin, CustomRetrieveUpdateDestroyAPIView):
     queryset = RecipeFood.objects.all().select_related("product")
     serializer_class = RecipeFoodSerializer
 
@@ -23,7 +24,7 @@ class RecipeFoodRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView)
         return super().get_serializer_class()
 
 
-class RecipeFoodListCreateAPIView(CustomListCreateAPIView):
+class RecipeFoodListCreateAPIView(CatalogStaleMixin, CustomListCreateAPIView):
     queryset = RecipeFood.objects.all().select_related("product")
     serializer_class = RecipeFoodSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -7,7 +7,7 @@ from django.utils.timezone import now
 
 from apps.base.models import AbstractBaseModel
 from apps.base.exceptions import CustomExceptionError
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.stay_range import stay_gist_indexes
 
 
 class Guest(AbstractBaseModel):
@@ -82,6 +82,26 @@ class Guest(AbstractBaseModel):
     check_out = models.DateTimeField(
         help_text="Date of check-out."
     )
+    last_billed_date = models.DateField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="The last date the nightly billing charged this guest."
+    )
+
+    class Meta:
+        indexes = [
+            # === Occupancy, availability and billing: guests staying in a room ===
+            models.Index(
+                fields=["room", "check_in", "check_out"],
+                condition=models.Q(status="New"),
+                name="guest_new_room_stay_idx",
+            ),
+            # === Status transitions: guests whose check-out has passed ===
+            models.Index(fields=["check_out"], condition=models.Q(status="New"), name="guest_new_check_out_idx"),
+        ]
+        # === Availability search: stays overlapping a window (PostgreSQL only) ===
+        indexes += stay_gist_indexes("guest_stay_gist_idx")
 
     def clean(self):
         today = now().date()
@@ -124,14 +144,6 @@ class Guest(AbstractBaseModel):
         self.full_clean()
         super().save(*args, **kwargs)
 
-        if self.room:
-            update_room_occupancy(self.room)
-
-    def delete(self, *args, **kwargs):
-        room = self.room
-        super().delete(*args, **kwargs)
-        update_room_occupancy(room)
-
     def __str__(self):
         """
         Return a string representation of the guest, which is the full name.
@@ -176,10 +188,5 @@ class GuestGroup(AbstractBaseModel):
         # ⚠️ Agar xatolik bo‘lmasa, saqlayveradi
         super().save(*args, **kwargs)
 
-        # 🔁 Bandlikni yangilab chiqamiz
-        for order in related_orders:
-            for room in order.rooms.all():
-                update_room_occupancy(room)
-
     def __str__(self):
         return self.name
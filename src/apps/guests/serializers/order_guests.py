@@ -4,7 +4,6 @@ from apps.guests.models import Guest
 from apps.base.exceptions import CustomExceptionError
 from apps.base.serializers import CustomModelSerializer
 from apps.guests.utils.calculate_price import calculate_guest_price
-from apps.orders.utils.refresh_rooms import update_room_occupancy
 
 
 class GuestBaseSerializer(CustomModelSerializer):
@@ -37,7 +36,6 @@ class GuestCreateSerializer(GuestBaseSerializer):
         guest = Guest.objects.create(**validated_data)
         calculate_guest_price(guest)
         guest.save(update_fields=["price"])
-        update_room_occupancy(guest.room)
         return guest
 
 
@@ -52,7 +50,6 @@ class GuestUpdateSerializer(GuestBaseSerializer):
 
         calculate_guest_price(instance)
         instance.save()
-        update_room_occupancy(instance.room)
         return instance
 
 
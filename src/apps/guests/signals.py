@@ -2,7 +2,7 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from apps.guests.models import Guest
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.occupancy_events import sync_guest_occupancy
 
 
 # @receiver(post_save, sender=Guest)
@@ -17,15 +17,14 @@ from apps.orders.utils.refresh_rooms import update_room_occupancy
 #         update_room_occupancy(instance.room)
 
 
-@receiver([post_save, post_delete], sender=Guest)
+@receiver(post_save, sender=Guest)
 def update_room_occupancy_signal(sender, instance, **kwargs):
-    if getattr(instance, "room", None):
-        update_room_occupancy(instance.room)
-        instance.room.save(update_fields=[
-            "occupied_count",
-            "available_count",
-            "remaining_capacity"
-        ])
+    sync_guest_occupancy(instance)
+
+
+@receiver(post_delete, sender=Guest)
+def update_room_occupancy_on_guest_delete_signal(sender, instance, **kwargs):
+    sync_guest_occupancy(instance, deleted=True)
 #
 # @receiver(post_delete, sender=Guest)
 # def update_room_occupancy_on_guest_delete(sender, instance, **kwargs):
@@ -1,3 +1,14 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.guests.models import Guest
+from apps.guests.utils.daily_billing import bill_guests_for_date
+from apps.orders.tests import RoomStaysMixin
+
+
 # def calculate_prices(self):
 #     total_cost = Decimal("0.00")
 #     two_places = Decimal("0.01")
@@ -72,4 +83,21 @@
 #                 total_cost += per_guest_price * min(room.capacity, group_count)
 #             current_day += timedelta(days=1)
 #
-#         self.general_cost = total_cost.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
\ No newline at end of file
+#         self.general_cost = total_cost.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+class DailyBillingTests(RoomStaysMixin, TestCase):
+    """
+    The nightly billing charges every staying guest once per date.
+    """
+
+    def test_daily_billing_is_idempotent(self):
+        day = (timezone.now() + timedelta(days=1)).date()
+
+        # === Guests 0 and 1 share the small room: 3 people, 15 per night ===
+        self.assertEqual(bill_guests_for_date(day), 2)
+        self.assertEqual(bill_guests_for_date(day), 0)
+        self.assertEqual(
+            sorted(Guest.objects.filter(last_billed_date=day).values_list("price", flat=True)),
+            [Decimal("5"), Decimal("10")],
+        )
@@ -1,15 +1,23 @@
-def calculate_guest_price(guest):
+def count_overlapping_guests(room, check_in, check_out, exclude_pk=None):
     from apps.guests.models import Guest
 
+    overlapping_guests = Guest.objects.filter(
+        room=room,
+        status=Guest.Status.COMPLETED,
+        check_out__gt=check_in,
+        check_in__lt=check_out
+    )
+    if exclude_pk is not None:
+        overlapping_guests = overlapping_guests.exclude(pk=exclude_pk)
+    return overlapping_guests.count() + 1
+
+
+def calculate_guest_price(guest, overlapping_guests=None):
     days = (guest.check_out - guest.check_in).days
     if days < 1:
         days = 1
 
-    overlapping_guests = Guest.objects.filter(
-        room=guest.room,
-        status=Guest.Status.COMPLETED,
-        check_out__gt=guest.check_in,
-        check_in__lt=guest.check_out
-    ).exclude(pk=guest.pk).count() + 1
+    if overlapping_guests is None:
+        overlapping_guests = count_overlapping_guests(guest.room, guest.check_in, guest.check_out, guest.pk)
 
-    guest.price = (guest.room.gross_price * days) / overlapping_guests
\ No newline at end of file
+    guest.price = (guest.room.gross_price * days) / overlapping_guests
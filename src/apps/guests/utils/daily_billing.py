@@ -0,0 +1,74 @@
+"""
+Daily Guest Billing Utility Module
+
+This module charges the guests that stay in a room on a given date for that
+night, in one set-based pass.
+
+Active guests are grouped by room with one grouped query; every guest pays an
+equal share of the room's gross price per person (single rooms are charged the
+full price). Prices are written with one ``bulk_update`` together with
+``last_billed_date``, so a guest is charged at most once per date and a retried
+run does not double-charge.
+
+Example:
+    bill_guests_for_date(date.today())
+    # Returns: number of charged guests
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q, Sum
+
+
+def get_daily_price(room, room_guests, guest_count):
+    """
+    Returns:
+        Decimal: The price of one night for a guest record of ``guest_count`` people
+    """
+    if room.capacity == 1:
+        return room.gross_price
+    return round(room.gross_price / (room_guests or 1), 2) * guest_count
+
+
+def bill_guests_for_date(day):
+    """
+    Charge every active guest with a room for the night of ``day``.
+
+    Args:
+        day: The billed date
+
+    Returns:
+        int: Number of charged guests
+    """
+    Guest = apps.get_model("guests", "Guest")
+
+    active_guests = Guest.objects.filter(
+        status=Guest.Status.NEW,
+        check_in__lte=day,
+        check_out__gte=day,
+        room__isnull=False,
+    )
+
+    with transaction.atomic():
+        guests = list(
+            active_guests.filter(Q(last_billed_date__isnull=True) | Q(last_billed_date__lt=day))
+            .select_for_update(of=("self",))
+            .select_related("room")
+        )
+        if not guests:
+            return 0
+
+        # === People per room, billed or not, split the room price ===
+        room_guests = dict(
+            active_guests.order_by()
+            .values("room_id")
+            .annotate(total=Sum("count"))
+            .values_list("room_id", "total")
+        )
+
+        for guest in guests:
+            guest.price += get_daily_price(guest.room, room_guests.get(guest.room_id), guest.count)
+            guest.last_billed_date = day
+
+        Guest.objects.bulk_update(guests, ["price", "last_billed_date"])
+    return len(guests)
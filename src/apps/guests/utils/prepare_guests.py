@@ -1,10 +1,12 @@
 import random
 
 from apps.guests.models import Guest
-from apps.guests.utils.calculate_price import calculate_guest_price
+from apps.guests.utils.calculate_price import calculate_guest_price, count_overlapping_guests
 
 def prepare_bulk_guests(hotel, room, guests_data, check_in, check_out):
     guests = []
+    # === Every new guest shares the room and the dates: count the overlaps once ===
+    overlapping_guests = count_overlapping_guests(room, check_in, check_out)
 
     for guest_data in guests_data:
         guest = Guest(
@@ -18,7 +20,7 @@ def prepare_bulk_guests(hotel, room, guests_data, check_in, check_out):
             order_number=f"№{random.randint(1000000, 9999999)}"
         )
         guest.full_clean()
-        calculate_guest_price(guest)
+        calculate_guest_price(guest, overlapping_guests)
         guests.append(guest)
 
     return guests
@@ -1,11 +1,10 @@
 from decimal import ROUND_UP, ROUND_HALF_UP, Decimal
 from django.db import models
-from django.db.models import Q, OuterRef, Exists, Sum, DecimalField
+from django.db.models import Sum, DecimalField
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
 
 from apps.base.exceptions import CustomExceptionError
-from apps.menus.models.recipe import Recipe
 from apps.base.models import AbstractBaseModel
 
 
@@ -110,22 +109,13 @@ class Menu(AbstractBaseModel):
         super().save(*args, **kwargs)
 
     def changing_dependent_objects(self):
-        recipes = Recipe.objects.annotate(
-            has_inactive_menu=Exists(
-                Menu.objects.filter(
-                    Q(pk=OuterRef("menu_breakfast_id"))
-                    | Q(pk=OuterRef("menu_lunch_id"))
-                    | Q(pk=OuterRef("menu_dinner_id")),
-                    status=False,
-                )
-            )
-        )
-
-        for recipe in recipes:
-            recipe.status = not recipe.has_inactive_menu
-            recipe.calculate_prices()
+        """
+        Recompute the recipes that use this menu with the dependency engine, the
+        same rules as every other catalog change; coalesced per transaction.
+        """
+        from apps.warehouses.utils.recalculation_queue import mark_nodes_changed
 
-        Recipe.objects.bulk_update(recipes, ["status", "net_price", "gross_price"])
+        mark_nodes_changed("menu", [self.pk])
 
     def change_dependent(self):
         self.change_object()
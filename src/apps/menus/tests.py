@@ -1,3 +1,332 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.foods.models import Food, FoodSection, RecipeFood
+from apps.menus.models import Menu, Recipe
+from apps.menus.utils.missing_products import calculate_missing_products_batch_menus
+from apps.menus.views import menu as menu_views
+from apps.products.models import Product
+from apps.sections.models import Measure, Section
+from apps.warehouses.models import Warehouse
+from apps.warehouses.utils.check_availability import (
+    check_foods_availability_batch,
+    check_menus_availability_batch,
+    check_recipes_availability_batch,
+)
+from apps.warehouses.utils import recalculation_queue
+from apps.warehouses.utils.requirements import explode_requirements
+from apps.warehouses.utils.recalculate_dependencies import (
+    DependencyRecalculator,
+    recalculate_dependent_objects,
+    recalculate_product_dependencies,
+)
+
+
+class CatalogTestMixin:
+    """
+    A small catalog (products -> recipe foods -> foods -> menus -> recipe) and
+    helpers comparing it with the per-object model methods.
+    """
+
+    maxDiff = None
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        food_section = FoodSection.objects.create(name="Soups")
+
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}",
+                measure=measure,
+                measure_warehouse=measure,
+                section=section,
+                difference_measures=difference_measures,
+            )
+            for i, difference_measures in enumerate(
+                [Decimal("1"), Decimal("1000"), Decimal("0"), Decimal("12")]
+            )
+        ]
+
+        self.recipe_foods = [
+            RecipeFood.objects.create(product=self.products[i % 4], count=count)
+            for i, count in enumerate(
+                [Decimal("2"), Decimal("500"), Decimal("3"), Decimal("6"), Decimal("7"), Decimal("900")]
+            )
+        ]
+
+        self.foods = []
+        for i in range(3):
+            food = Food.objects.create(name=f"Food {i}", section=food_section, profit=Decimal("5"))
+            food.recipes.set(self.recipe_foods[i * 2:i * 2 + 2])
+            self.foods.append(food)
+
+        self.menus = []
+        for i in range(2):
+            menu = Menu.objects.create(name=f"Menu {i}", profit=Decimal("4"), menu_type="lunch")
+            menu.foods.set(self.foods[i:i + 2])
+            self.menus.append(menu)
+
+        self.recipe = Recipe.objects.create(
+            name="Recipe",
+            profit=Decimal("3"),
+            menu_breakfast=self.menus[0],
+            menu_lunch=self.menus[0],
+            menu_dinner=self.menus[1],
+        )
+
+        # === Nothing is in stock yet, so the default statuses must be recomputed once ===
+        recalculate_product_dependencies([product.id for product in self.products])
+
+    def receive(self, product, gross_price, arrived_count, count=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            warehouse = Warehouse.objects.create(
+                product=product, gross_price=gross_price, arrived_count=arrived_count
+            )
+        if count is not None:
+            with self.captureOnCommitCallbacks(execute=True):
+                warehouse.count = count
+                warehouse.save()
+        return warehouse
+
+    def legacy_state(self):
+        """
+        Recompute the whole catalog with the model methods, bottom-up.
+        """
+        state = {}
+
+        for product in Product.objects.all():
+            total = sum(Warehouse.objects.filter(product=product).values_list("count", flat=True), Decimal("0"))
+            state[product.id] = total > Decimal("0")
+
+        for recipe_food in RecipeFood.objects.select_related("product"):
+            warehouse, product = recipe_food.get_product_in_warehouse()
+            total = sum(warehouse.values_list("count", flat=True), Decimal("0"))
+            measure = product.difference_measures or Decimal("1")
+            recipe_food.calculate_prices(warehouse)
+            recipe_food.status = recipe_food.count <= total * measure
+            recipe_food.save_base(update_fields=["status", "price"])
+            state[recipe_food.id] = (recipe_food.status, recipe_food.price)
+
+        foods = Food.objects.prefetch_related("recipes")
+        availability = check_foods_availability_batch(foods)
+        for food in foods:
+            food.calculate_prices()
+            food.status = availability[food.id]
+            food.save_base(update_fields=["status", "net_price", "gross_price"])
+            state[food.id] = (food.status, food.net_price, food.gross_price)
+
+        menus = Menu.objects.prefetch_related("foods__recipes")
+        availability = check_menus_availability_batch(menus)
+        for menu in menus:
+            menu.calculate_prices()
+            menu.status = availability[menu.id]
+            menu.save_base(update_fields=["status", "net_price", "gross_price"])
+            state[menu.id] = (menu.status, menu.net_price, menu.gross_price)
+
+        recipes = Recipe.objects.select_related("menu_breakfast", "menu_lunch", "menu_dinner")
+        availability = check_recipes_availability_batch(recipes)
+        for recipe in recipes:
+            recipe.calculate_prices()
+            recipe.status = availability[recipe.id]
+            state[recipe.id] = (recipe.status, recipe.net_price, recipe.gross_price)
+
+        return state
+
+    def current_state(self):
+        state = {product.id: product.status for product in Product.objects.all()}
+        state.update({rf.id: (rf.status, rf.price) for rf in RecipeFood.objects.all()})
+        for model in (Food, Menu, Recipe):
+            state.update({obj.id: (obj.status, obj.net_price, obj.gross_price) for obj in model.objects.all()})
+        return state
+
+    def assertMatchesLegacy(self):
+        current = self.current_state()
+        self.assertEqual(current, self.legacy_state())
+
+
+class DependencyRecalculationTests(CatalogTestMixin, TestCase):
+    """
+    The single-pass engine must produce the same statuses and prices as the
+    per-object model methods and the batch availability checks.
+    """
+
+    def test_receiving_matches_legacy(self):
+        self.receive(self.products[0], Decimal("100"), Decimal("10"))
+        self.assertMatchesLegacy()
+
+        self.receive(self.products[1], Decimal("37"), Decimal("3"))
+        self.receive(self.products[2], Decimal("19.99"), Decimal("7"))
+        self.receive(self.products[3], Decimal("240"), Decimal("2"))
+        self.assertMatchesLegacy()
+
+        # === A later, more expensive batch and a partially used older one ===
+        self.receive(self.products[0], Decimal("300"), Decimal("10"))
+        self.receive(self.products[1], Decimal("50"), Decimal("1"), count=Decimal("0.4"))
+        self.assertMatchesLegacy()
+
+    def test_shortage_matches_legacy(self):
+        for product in self.products:
+            self.receive(product, Decimal("10"), Decimal("1"))
+        self.assertMatchesLegacy()
+
+        warehouse = Warehouse.objects.filter(product=self.products[3]).first()
+        warehouse.count = Decimal("0")
+        with self.captureOnCommitCallbacks(execute=True):
+            warehouse.save()
+
+        state = self.current_state()
+        self.assertFalse(state[self.products[3].id])
+        self.assertFalse(state[self.recipe.id][0])
+        self.assertMatchesLegacy()
+
+    def test_recalculate_functions(self):
+        for product in self.products:
+            self.receive(product, Decimal("80"), Decimal("4"))
+
+        Food.objects.update(net_price=0, gross_price=0, status=False)
+        Menu.objects.update(net_price=0, gross_price=0, status=False)
+        Recipe.objects.update(net_price=0, gross_price=0, status=False)
+        recalculate_dependent_objects("food", [food.id for food in self.foods])
+        self.assertMatchesLegacy()
+
+        Product.objects.update(status=False)
+        RecipeFood.objects.update(price=0, status=False)
+        recalculate_product_dependencies([product.id for product in self.products])
+        self.assertMatchesLegacy()
+
+    def test_changes_in_one_transaction_recompute_once(self):
+        with mock.patch.object(DependencyRecalculator, "run", autospec=True) as run:
+            with self.captureOnCommitCallbacks(execute=True):
+                for product in self.products:
+                    Warehouse.objects.create(product=product, gross_price=Decimal("10"), arrived_count=Decimal("1"))
+                self.recipe_foods[0].save()
+                self.recipe_foods[0].save()
+
+        run.assert_called_once()
+        recalculator = run.call_args.args[0]
+        self.assertEqual(recalculator.product_ids, {product.id for product in self.products})
+        self.assertTrue({food.id for food in self.foods} <= recalculator.nodes["food"])
+        self.assertIn(self.recipe.id, recalculator.nodes["recipe"])
+
+    def test_rolled_back_changes_are_dropped(self):
+        with mock.patch.object(DependencyRecalculator, "run", autospec=True) as run:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        recalculation_queue.mark_products_changed([self.products[0].id])
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.assertIsNone(recalculation_queue.get_pending(connection.alias)["scheduled"])
+                recalculation_queue.mark_products_changed([self.products[1].id])
+
+        run.assert_called_once()
+        self.assertEqual(run.call_args.args[0].product_ids, {self.products[1].id})
+
+    def test_menu_change_recomputes_its_recipes_only(self):
+        for product in self.products:
+            self.receive(product, Decimal("80"), Decimal("4"))
+        other = Recipe.objects.create(
+            name="Other", profit=Decimal("1"), menu_breakfast=self.menus[1], menu_lunch=self.menus[1],
+            menu_dinner=self.menus[1],
+        )
+        Recipe.objects.update(net_price=0, gross_price=0, status=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.menus[0].changing_dependent_objects()
+
+        other.refresh_from_db()
+        self.assertEqual((other.status, other.net_price), (False, Decimal("0")))
+
+        # === Same rules as every other path: the engine's availability, not the menu flags ===
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            (self.recipe.status, self.recipe.net_price, self.recipe.gross_price),
+            self.legacy_state()[self.recipe.id],
+        )
+        self.assertGreater(self.recipe.net_price, 0)
+
+class RequirementsExplosionTests(CatalogTestMixin, TestCase):
+    """
+    Product requirements of foods, menus and recipes, exploded in one pass.
+    """
+
+    def test_explode_requirements(self):
+        self.receive(self.products[0], Decimal("100"), Decimal("10"))
+        self.receive(self.products[1], Decimal("37"), Decimal("3"))
+
+        result = explode_requirements(
+            {("food", self.foods[0].id): 2, ("menu", self.menus[1].id): 1, ("recipe", self.recipe.id): 1}
+        )
+
+        food = result[("food", self.foods[0].id)]
+        self.assertEqual(food["requirements"], {self.products[0].id: Decimal("4"), self.products[1].id: Decimal("1000")})
+        self.assertTrue(food["available"])
+        self.assertEqual(food["missing"], {})
+
+        # === The recipe serves menu 0 twice (breakfast and lunch) and menu 1 once ===
+        recipe = result[("recipe", self.recipe.id)]
+        self.assertEqual(recipe["requirements"][self.products[3].id], Decimal("18"))
+        self.assertFalse(recipe["available"])
+        self.assertEqual(recipe["missing"]["Product 3"], {"measure": "kg", "missing": "18.00"})
+
+        self.assertFalse(result[("menu", self.menus[1].id)]["available"])
+
+
+class MissingProductsCacheTests(CatalogTestMixin, TestCase):
+    """
+    Missing products of menus are cached until a product they use changes.
+    """
+
+    def test_missing_products_cache(self):
+        cache.clear()
+        self.receive(self.products[0], Decimal("100"), Decimal("10"))
+
+        missing = calculate_missing_products_batch_menus(self.menus)
+        self.assertIn("Product 1", missing[self.menus[0].id])
+
+        # === Cached: the dependency index read only ===
+        with self.assertNumQueries(1):
+            self.assertEqual(calculate_missing_products_batch_menus(self.menus), missing)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.receive(self.products[1], Decimal("37"), Decimal("3"))
+
+        missing = calculate_missing_products_batch_menus(self.menus)
+        self.assertNotIn("Product 1", missing[self.menus[0].id])
+        self.assertIn("Product 3", missing[self.menus[0].id])
+
+
+class MenuListMissingProductsTests(CatalogTestMixin, TestCase):
+    """
+    The menu list computes missing products for the current page only.
+    """
+
+    def test_list_computes_missing_products_for_page(self):
+        cache.clear()
+        extra_menus = [
+            Menu.objects.create(name=f"Menu extra {i}", profit=Decimal("4"), menu_type="dinner") for i in range(3)
+        ]
+        for menu in extra_menus:
+            menu.foods.set(self.foods[:1])
+
+        with mock.patch.object(
+            menu_views,
+            "calculate_missing_products_batch_menus",
+            wraps=calculate_missing_products_batch_menus,
+        ) as batch:
+            response = APIClient().get("/api/v1/menus/", {"per_page": 2})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        batch.assert_called_once()
+        self.assertEqual(
+            {str(menu.id) for menu in batch.call_args.args[0]},
+            {item["id"] for item in response.data["results"] if not item["status"]},
+        )
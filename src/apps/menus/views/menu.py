@@ -9,6 +9,7 @@ from apps.base.views import (
     CustomListCreateAPIView,
     CustomRetrieveUpdateDestroyAPIView,
     CustomGenericAPIView,
+    PageSerializerContextMixin,
 )
 from apps.menus.models import Menu
 from apps.menus.serializers import (
@@ -21,9 +22,10 @@ from apps.menus.utils.missing_products import (
     calculate_missing_products_batch_menus,
 )
 from apps.warehouses.utils import validate_uuid
+from apps.warehouses.views.mixins import CatalogStaleMixin
 
 
-class MenuRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
+class MenuRetrieveUpdateDestroyAPIView(CatalogStaleMixin, CustomRetrieveUpdateDestroyAPIView):
     queryset = Menu.objects.all().prefetch_related(
         "foods", "foods__recipes", "foods__recipes__product"
     )
@@ -67,7 +69,7 @@ class MenuRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
         return context
 
 
-class MenuListCreateAPIView(CustomListCreateAPIView):
+class MenuListCreateAPIView(CatalogStaleMixin, PageSerializerContextMixin, CustomListCreateAPIView):
     queryset = Menu.objects.all().prefetch_related(
         "foods", "foods__recipes", "foods__recipes__product"
     )
@@ -95,20 +97,15 @@ class MenuListCreateAPIView(CustomListCreateAPIView):
         )
         return Response(response_serializer.data, status=201)
 
-    def get_serializer_context(self):
+    def get_page_serializer_context(self, objects):
         """
-        Add batch missing products data to serializer context for optimization.
+        Add batch missing products data of the current page to serializer context.
+        Only menus with status False show missing products.
         """
-        context = super().get_serializer_context()
-
-        # Only calculate batch missing products for list views (GET requests)
-        if self.request.method == "GET":
-            queryset = self.get_queryset()
-            # Pre-calculate missing products for all menus in the queryset
-            missing_products_batch = calculate_missing_products_batch_menus(queryset)
-            context["missing_products_batch"] = missing_products_batch
-
-        return context
+        missing_products_batch = calculate_missing_products_batch_menus(
+            [menu for menu in objects if not menu.status]
+        )
+        return {"missing_products_batch": missing_products_batch}
 
 
 class MenusOnRecipe(CustomGenericAPIView):
@@ -2,20 +2,25 @@ from rest_framework.filters import SearchFilter
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from apps.base.views import CustomListCreateAPIView, CustomRetrieveUpdateDestroyAPIView
+from apps.base.views import (
+    CustomListCreateAPIView,
+    CustomRetrieveUpdateDestroyAPIView,
+    PageSerializerContextMixin,
+)
 from apps.menus.models import Recipe
 from apps.menus.serializers import RecipeSerializer, OptimizedRecipeSerializer
 from apps.menus.utils.missing_products import calculate_missing_products_batch_recipes
+from apps.warehouses.views.mixins import CatalogStaleMixin
 
 
-class RecipeRetrieveUpdateDestroyAPIView(CustomRetrieveUpdateDestroyAPIView):
+class RecipeRetrieveUpdateDestroyAPIView(CatalogStaleMixin, CustomRetrieveUpdateDestroyAPIView):
     queryset = Recipe.objects.all().select_related(
         "menu_breakfast", "menu_lunch", "menu_dinner"
     )
     serializer_class = RecipeSerializer
 
 
-class RecipeListCreateAPIView(CustomListCreateAPIView):
+class RecipeListCreateAPIView(CatalogStaleMixin, PageSerializerContextMixin, CustomListCreateAPIView):
     queryset = Recipe.objects.all().select_related(
         "menu_breakfast", "menu_lunch", "menu_dinner"
     ).prefetch_related(
@@ -28,17 +33,12 @@ class RecipeListCreateAPIView(CustomListCreateAPIView):
     filterset_fields = ["status"]
     search_fields = ["name", "gross_price", "profit"]
 
-    def get_serializer_context(self):
+    def get_page_serializer_context(self, objects):
         """
-        Add batch missing products data to serializer context for optimization.
+        Add batch missing products data of the current page to serializer context.
+        Only recipes with status False show missing products.
         """
-        context = super().get_serializer_context()
-
-        # Only calculate batch missing products for list views (GET requests)
-        if self.request.method == "GET":
-            queryset = self.get_queryset()
-            # Pre-calculate missing products for all recipes in the queryset
-            missing_products_batch = calculate_missing_products_batch_recipes(queryset)
-            context['missing_products_batch'] = missing_products_batch
-
-        return context
+        missing_products_batch = calculate_missing_products_batch_recipes(
+            [recipe for recipe in objects if not recipe.status]
+        )
+        return {"missing_products_batch": missing_products_batch}
@@ -1,7 +1,11 @@
 from django.contrib import admin
 
-from apps.orders.models import FoodOrder, HotelOrder
+from apps.orders.models import FoodOrder, HotelOrder, RoomAllocation, StatusTransitionWatermark
 
 admin.site.register(FoodOrder)
 
 admin.site.register(HotelOrder)
+
+admin.site.register(RoomAllocation)
+
+admin.site.register(StatusTransitionWatermark)
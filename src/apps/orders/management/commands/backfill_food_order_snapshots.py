@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.utils.snapshot_prices import backfill_food_order_snapshots
+
+
+class Command(BaseCommand):
+    help = "Fill the price snapshot columns of food orders placed before they existed."
+
+    def handle(self, *args, **kwargs):
+        updated = backfill_food_order_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Food order snapshots backfilled: {updated} rows"))
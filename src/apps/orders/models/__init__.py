@@ -1,2 +1,4 @@
 from .food_order import *
-from .hotel_order import *
\ No newline at end of file
+from .hotel_order import *
+from .room_allocation import *
+from .status_watermark import *
\ No newline at end of file
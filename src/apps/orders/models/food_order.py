@@ -1,18 +1,19 @@
 from collections import defaultdict
 from datetime import timedelta
-from decimal import ROUND_UP, ROUND_HALF_UP, Decimal
+from decimal import ROUND_UP, Decimal
 
 from django.utils.timezone import now
 from django.db import models, transaction
-from django.db.models import Sum, F, Q, Prefetch, Case, When, DecimalField, Value
 
 from apps.orders.utils import new_id
 from apps.base.exceptions import CustomExceptionError
 from apps.base.models import AbstractBaseModel
-from apps.menus.models import Menu
-from apps.products.models import Product
+from apps.base.services import normalize_text_fields
+from apps.statistics.utils.monthly_stats import refresh_monthly_stats_on_commit
 from apps.warehouses.models import Warehouse, ProductsUsed
-from apps.foods.models import Food
+from apps.warehouses.utils.deduct_products import deduct_products
+from apps.warehouses.utils.product_stock import refresh_product_stock
+from apps.warehouses.utils.requirements import explode_requirements
 from apps.warehouses.utils.update_product_dependencies import (
     update_product_dependencies_in_warehouse,
 )
@@ -83,6 +84,12 @@ class FoodOrder(AbstractBaseModel):
 
     # === The price of the order. ===
     price = models.DecimalField(max_digits=15, decimal_places=2)
+    # === Profit of one item at the time the order was placed. ===
+    profit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # === Net price of one item at the time the order was placed. ===
+    net_price = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # === Actual FIFO cost of the order (sum of its ProductsUsed prices). ===
+    cost = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     # ===  The address where the order should be delivered. ===
     address = models.CharField(max_length=1200, blank=True, null=True)
 
@@ -101,6 +108,10 @@ class FoodOrder(AbstractBaseModel):
         verbose_name_plural = "Food orders"
         # === Ordering field for sorting a set of queries ===
         ordering = ["-created_at"]
+        indexes = [
+            # === Statistics and monthly rollups: orders of a status in a date range ===
+            models.Index(fields=["status", "created_at"], name="food_order_status_created_idx"),
+        ]
 
     def __str__(self):
         """
@@ -108,26 +119,6 @@ class FoodOrder(AbstractBaseModel):
         """
         return f"{self.food_order_id} - {self.get_order_type_display()} - {self.price}"
 
-    @property
-    def profit(self):
-        products = {
-            self.ProductType.FOOD: "food",
-            self.ProductType.MENU: "menu",
-            self.ProductType.RECIPE: "recipe",
-        }
-        product = getattr(self, products[self.product_type])
-        return product.profit
-
-    @property
-    def net_price(self):
-        products = {
-            self.ProductType.FOOD: "food",
-            self.ProductType.MENU: "menu",
-            self.ProductType.RECIPE: "recipe",
-        }
-        product = getattr(self, products[self.product_type])
-        return product.net_price
-
     @property
     def total_price(self):
         return Decimal(self.price * self.product_count).quantize(
@@ -153,17 +144,55 @@ class FoodOrder(AbstractBaseModel):
                 code=400, detail="The order cannot be marked as ready yet."
             )
         self.__class__.objects.filter(id=self.id).update(status=self.Status.ACCEPTED)
+        refresh_monthly_stats_on_commit([self.created_at])
 
     def save(self, *args, **kwargs):
+        # === Prices are snapshotted at placement; later saves keep them ===
+        if self._state.adding:
+            self.prepare_order()
+        self.deduction_of_goods_from_the_warehouse()
+        self.rollback_order()
+        super().save(*args, **kwargs)
+
+    def prepare_order(self):
         self.validate_products()
         self.selected_product_type()
         self.selected_order_type()
         self.validate_order_type()
         self.validate_order_time()
         self.set_price()
-        self.deduction_of_goods_from_the_warehouse()
-        self.rollback_order()
-        super().save(*args, **kwargs)
+
+    @classmethod
+    def bulk_place(cls, orders):
+        """
+        Validate and create several new orders with one shared warehouse deduction.
+
+        Product needs of all orders are summed and checked once, deducted FIFO in
+        one locked transaction and the dependent objects are refreshed once.
+        Every order still gets its own ProductsUsed rows keyed by food_order_id.
+        """
+        for order in orders:
+            order.prepare_order()
+            normalize_text_fields(order)
+
+        # === One requirements explosion for every distinct ordered item ===
+        requirements = explode_requirements({order.get_item(): 1 for order in orders})
+        orders_products_needed = {
+            order.food_order_id: {
+                product_id: quantity * order.product_count
+                for product_id, quantity in requirements[order.get_item()]["requirements"].items()
+            }
+            for order in orders
+        }
+
+        with transaction.atomic():
+            used_products = deduct_products(orders_products_needed)
+            costs = defaultdict(Decimal)
+            for used in used_products:
+                costs[used.order_id] += used.price
+            for order in orders:
+                order.cost = costs[order.food_order_id]
+            return cls.objects.bulk_create(orders)
 
     def selected_product_type(self):
         self.product_type = (
@@ -204,142 +233,44 @@ class FoodOrder(AbstractBaseModel):
         match self.product_type:
             case self.ProductType.FOOD:
                 self.price = self.food.gross_price
+                self.profit = self.food.profit
+                self.net_price = self.food.net_price
             case self.ProductType.MENU:
                 self.price = self.menu.gross_price
+                self.profit = self.menu.profit
+                self.net_price = self.menu.net_price
             case self.ProductType.RECIPE:
                 self.price = self.recipe.gross_price
+                self.profit = self.recipe.profit
+                self.net_price = self.recipe.net_price
 
     def process_product_deductions(self, products_needed: dict):
-        product_ids = [product_id for product_id, need in products_needed.items()]
-        products_dict = Product.objects.in_bulk(product_ids)
-        warehouses = (
-            Warehouse.objects.select_related("product", "product__measure")
-            .filter(Q(status=True) & Q(product_id__in=product_ids))
-            .select_for_update()
-        )
-        food_shortages = {}
-
-        for product_id, required_quantity in products_needed.items():
-            product = products_dict[product_id]
-
-            total_available = (
-                warehouses.filter(product_id=product_id).aggregate(
-                    total=Sum(
-                        F("count")
-                        * Case(
-                            When(product__difference_measures=0, then=Value(1)),
-                            default=F("product__difference_measures"),
-                            output_field=DecimalField(max_digits=10, decimal_places=2),
-                        )
-                    )
-                )["total"]
-                or Decimal('0')
-            )
+        used_products = deduct_products({self.food_order_id: products_needed})
+        self.cost = sum((used.price for used in used_products), Decimal("0"))
 
-            if total_available < required_quantity:
-                if product_id not in food_shortages:
-                    food_shortages[str(product_id)] = {
-                        "name": product.name,
-                        "needed": (required_quantity - total_available),
-                        "measure": product.measure.abbreviation,
-                    }
-                else:
-                    food_shortages[str(product_id)]["needed"] += (
-                        required_quantity - total_available
-                    )
-
-        if food_shortages:
-            raise CustomExceptionError(code=400, detail=food_shortages)
-
-        update_warehouses = []
-
-        used_products = []
-
-        for product_id, required_quantity in products_needed.items():
-            product = products_dict[product_id]
-            product_warehouses = warehouses.filter(product_id=product_id).order_by(
-                "created_at"
-            )
+    def get_item(self):
+        """
+        Return the ordered item as (item_type, item_id) for explode_requirements.
+        """
+        match self.product_type:
+            case self.ProductType.FOOD:
+                return "food", self.food_id
+            case self.ProductType.MENU:
+                return "menu", self.menu_id
+            case self.ProductType.RECIPE:
+                return "recipe", self.recipe_id
 
-            for warehouse_item in product_warehouses:
-                available_quantity = (
-                    warehouse_item.count * product.difference_measures
-                    if product.difference_measures
-                    else Decimal('1')
-                )
-                net_price = warehouse_item.get_net_price()
-                # Calculate price with proper rounding
-                item_price = (net_price * Decimal(str(required_quantity))).quantize(
-                    Decimal('0.01'), rounding=ROUND_HALF_UP
-                )
-                used_products.append(
-                    ProductsUsed(
-                        warehouse_id=warehouse_item.id,
-                        count=str(required_quantity),
-                        price=item_price,
-                        order_id=self.food_order_id,
-                    )
-                )
-                if available_quantity >= required_quantity:
-                    deduction = (
-                        Decimal(str(required_quantity)) / product.difference_measures
-                    ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                    warehouse_item.count -= deduction
-                    if warehouse_item.count == Decimal('0'):
-                        warehouse_item.status = False
-                    update_warehouses.append(warehouse_item)
-                    break
-                else:
-                    required_quantity -= available_quantity
-                    warehouse_item.count = Decimal('0')
-                    warehouse_item.status = False
-                    update_warehouses.append(warehouse_item)
-
-        Warehouse.objects.bulk_update(update_warehouses, ["status", "count"])
-        ProductsUsed.objects.bulk_create(used_products)
-
-        update_product_dependencies_in_warehouse(product_ids)
+    def get_products_needed(self):
+        """
+        Sum the product quantities required by this order, keyed by product ID.
+        """
+        item = self.get_item()
+        return explode_requirements({item: self.product_count})[item]["requirements"]
 
     def deduction_of_goods_from_the_warehouse(self):
         if not self._state.adding:
             return
-        with transaction.atomic():
-            products_needed = defaultdict(int)
-            match self.product_type:
-                case self.ProductType.FOOD:
-                    recipe_foods = self.food.recipes.all()
-                    for recipe in recipe_foods:
-                        products_needed[recipe.product_id] += (
-                            recipe.count * self.product_count
-                        )
-                case self.ProductType.MENU:
-                    foods = self.menu.foods.all().prefetch_related("recipes")
-
-                    for food in foods:
-                        for recipe in food.recipes.all():
-                            products_needed[recipe.product_id] += (
-                                recipe.count * self.product_count
-                            )
-
-                case self.ProductType.RECIPE:
-                    menus = Menu.objects.filter(
-                        Q(breakfast_recipes=self.recipe)
-                        | Q(lunch_recipes=self.recipe)
-                        | Q(dinner_recipes=self.recipe)
-                    ).prefetch_related(
-                        Prefetch(
-                            "foods", queryset=Food.objects.prefetch_related("recipes")
-                        )
-                    )
-
-                    for menu in menus:
-                        for food in menu.foods.all():
-                            for recipe in food.recipes.all():
-                                products_needed[recipe.product_id] += (
-                                    recipe.count * self.product_count
-                                )
-
-            self.process_product_deductions(products_needed)
+        self.process_product_deductions(self.get_products_needed())
 
     def rollback_order(self):
         if self.status != self.Status.CANCELED:
@@ -347,12 +278,13 @@ class FoodOrder(AbstractBaseModel):
         with transaction.atomic():
             used_products = ProductsUsed.objects.filter(order_id=self.food_order_id).select_related("warehouse", "warehouse__product")
 
-            warehouse_restore_map = defaultdict(lambda: {"count": 0, "product_id": None})
+            warehouse_restore_map = defaultdict(lambda: {"count": Decimal('0'), "product_id": None})
 
             product_ids = set()
 
             for used in used_products:
-                warehouse_restore_map[used.warehouse_id]["count"] += float(used.count) / used.warehouse.product.difference_measures
+                difference_measures = used.warehouse.product.difference_measures or Decimal('1')
+                warehouse_restore_map[used.warehouse_id]["count"] += used.count / difference_measures
                 warehouse_restore_map[used.warehouse_id]["product_id"] = used.warehouse.product_id
                 product_ids.add(used.warehouse.product_id)
 
@@ -365,5 +297,7 @@ class FoodOrder(AbstractBaseModel):
             Warehouse.objects.bulk_update(warehouses, ["count", "status"])
 
             used_products.delete()
+            self.cost = Decimal("0")
 
+            refresh_product_stock(product_ids)
             update_product_dependencies_in_warehouse(product_ids)
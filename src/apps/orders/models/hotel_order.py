@@ -1,9 +1,10 @@
 from django.db import models
+from django.utils.timezone import now
 
 from apps.guests.models import GuestGroup
 from apps.orders.utils import new_id
 from apps.base.models import AbstractBaseModel
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.stay_range import stay_gist_indexes
 
 
 class HotelOrderManager(models.Manager):
@@ -24,6 +25,9 @@ class HotelOrder(AbstractBaseModel):
         ACTIVE = 'Active', 'Active'
         COMPLETED = 'Completed', 'Completed'
 
+    # === Statuses whose stays still hold their rooms ===
+    BOOKED_STATUSES = [OrderStatus.PLANNED, OrderStatus.ACTIVE]
+
     objects = HotelOrderManager()
 
     guest_type = models.CharField(
@@ -89,6 +93,15 @@ class HotelOrder(AbstractBaseModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["order_status", "check_in"], name="hotel_order_status_in_idx"),
+            models.Index(fields=["order_status", "check_out"], name="hotel_order_status_out_idx"),
+            models.Index(
+                fields=["order_status", "guest_type", "check_in", "check_out"], name="hotel_order_status_stay_idx"
+            ),
+        ]
+        # === Availability search: stays overlapping a window (PostgreSQL only) ===
+        indexes += stay_gist_indexes("hotel_order_stay_gist_idx")
 
     @property
     def profit(self):
@@ -99,16 +112,24 @@ class HotelOrder(AbstractBaseModel):
         else:
             return 0
 
+    def get_order_status(self, at=None):
+        """
+        The status of the stay at a point in time; later transitions are applied
+        by ``apps.orders.utils.status_transitions``.
+        """
+        at = at or now()
+        if at < self.check_in:
+            return self.OrderStatus.PLANNED
+        if at < self.check_out:
+            return self.OrderStatus.ACTIVE
+        return self.OrderStatus.COMPLETED
+
     def save(self, *args, **kwargs):
+        # === Full saves (creation, edited dates) set the status from the dates ===
+        if kwargs.get("update_fields") is None and self.check_in and self.check_out:
+            self.order_status = self.get_order_status()
         super().save(*args, **kwargs)
 
-        if self.guest_type == self.GuestType.INDIVIDUAL and self.room:
-            update_room_occupancy(self.room)
-
-        elif self.guest_type == self.GuestType.GROUP:
-            for room in self.rooms.all():
-                update_room_occupancy(room)
-
         if self.guest_group:
             self.guest_group.guest_group_status = GuestGroup.GuestGroupStatus.ACCEPTED
             self.guest_group.save(update_fields=["guest_group_status"])
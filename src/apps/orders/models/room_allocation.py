@@ -0,0 +1,51 @@
+from django.db import models
+
+from apps.base.models import AbstractBaseModel
+from apps.guests.models import Guest
+
+
+class RoomAllocation(AbstractBaseModel):
+    """
+    The guests of a group hotel order placed in one of its rooms.
+
+    Allocations are computed once by ``apps.orders.utils.room_placement`` when
+    the order is created; occupancy and availability reads use them instead of
+    re-distributing the group.
+    """
+
+    # === The group hotel order. ===
+    order = models.ForeignKey(
+        "orders.HotelOrder",
+        on_delete=models.CASCADE,
+        related_name="room_allocations",
+    )
+    # === The room (type) the guests are placed in. ===
+    room = models.ForeignKey(
+        "rooms.Room",
+        on_delete=models.CASCADE,
+        related_name="allocations",
+    )
+    # === Gender of the placed guests when the group is split by gender. ===
+    gender = models.PositiveSmallIntegerField(
+        choices=Guest.Gender.choices,
+        null=True,
+        blank=True,
+    )
+    # === Number of guests placed in the room. ===
+    guests = models.PositiveIntegerField()
+    # === Number of room units used by those guests. ===
+    units = models.PositiveIntegerField()
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "hotel_order_room_allocation"
+        # === The singular name for the room allocation. ===
+        verbose_name = "Room allocation"
+        # === The plural name for the room allocations. ===
+        verbose_name_plural = "Room allocations"
+        constraints = [
+            models.UniqueConstraint(fields=["order", "room", "gender"], name="room_allocation_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.guests} guests in {self.units} x {self.room_id}"
@@ -0,0 +1,26 @@
+from django.db import models
+
+from apps.base.models import AbstractBaseModel
+
+
+class StatusTransitionWatermark(AbstractBaseModel):
+    """
+    The point in time up to which a status-transition job has processed the
+    check-in/check-out boundaries. The next run only looks at boundaries after it.
+    """
+
+    # === The job the watermark belongs to. ===
+    name = models.CharField(max_length=100, unique=True)
+    # === Boundaries up to this time have been applied. ===
+    processed_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "status_transition_watermark"
+        # === The singular name for the watermark. ===
+        verbose_name = "Status transition watermark"
+        # === The plural name for the watermarks. ===
+        verbose_name_plural = "Status transition watermarks"
+
+    def __str__(self):
+        return f"{self.name}: {self.processed_until}"
@@ -1,14 +1,11 @@
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from apps.base.serializers import CustomModelSerializer
-from apps.guests.models import Guest
 from apps.guests.serializers.group_guests import GuestGroupListSerializer
 from apps.orders.models import FoodOrder
 from apps.orders.models.hotel_order import HotelOrder
 from apps.guests.serializers import ActiveNoGuestListSerializer
 from apps.orders.serializers import OnlyFoodOrderSerializer
-from apps.rooms.models import RoomType, Room
 from apps.warehouses.utils import validate_uuid
 
 
@@ -48,18 +45,16 @@ class ActiveHotelOrderFoodSerializer(CustomModelSerializer):
         read_only_fields = ["created_at", "total_cost"]
 
     def get_guests(self, obj):
+        """
+        The order's own guests (prefetched with their rooms by the list views),
+        optionally only those staying in rooms of the requested room type.
+        """
+        guests = obj.guests.all()
         request = self.context.get("request")
-        if not request:
-            return ActiveNoGuestListSerializer(obj.guests.all(), many=True).data
-
-        room_type_id = request.GET.get("room_type")
-        if not room_type_id:
-            return ActiveNoGuestListSerializer(obj.guests.all(), many=True).data
-
-        validate_uuid(room_type_id)
-        room_type = get_object_or_404(RoomType, pk=room_type_id)
-        rooms = Room.objects.filter(room_type=room_type)
-        guests = Guest.objects.filter(room__in=rooms)
+        room_type_id = request.GET.get("room_type") if request else None
+        if room_type_id:
+            validate_uuid(room_type_id)
+            guests = [guest for guest in guests if guest.room and str(guest.room.room_type_id) == room_type_id]
         return ActiveNoGuestListSerializer(guests, many=True).data
 
     def get_nights(self, obj):
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
 from apps.base.exceptions import CustomExceptionError
-from apps.base.serializers import CustomModelSerializer
+from apps.base.serializers import CustomModelSerializer, CustomSerializer
 from apps.orders.models import FoodOrder
 
 
@@ -151,3 +151,20 @@ class FoodOrderRetrieveSerializer(CustomModelSerializer):
             instance.order_ready()
             return instance
         return super().update(instance, validated_data)
+
+
+class FoodOrderBulkCreateSerializer(CustomSerializer):
+    orders = OnlyFoodOrderSerializer(many=True)
+
+    def validate_orders(self, orders):
+        if not orders:
+            raise CustomExceptionError(code=400, detail="At least one order is required")
+        return orders
+
+    def create(self, validated_data):
+        user = self.get_user_from_context()
+        orders = [
+            FoodOrder(**order, created_by=user, updated_by=user)
+            for order in validated_data["orders"]
+        ]
+        return {"orders": FoodOrder.bulk_place(orders)}
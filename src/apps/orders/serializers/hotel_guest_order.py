@@ -3,7 +3,9 @@ from django.db import transaction
 from rest_framework import serializers
 
 from apps.orders.utils.calculate_price import calculate_prices_for_order
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.orders.utils.room_placement import get_group_size, place_group_order
+from apps.rooms.utils.availability import get_rooms_availability
+from apps.rooms.utils.occupancy_events import get_guest_schedule, sync_occupancy_sources
 from apps.rooms.models import Room
 from apps.guests.models import Guest, GuestGroup
 from apps.base.exceptions import CustomExceptionError
@@ -19,6 +21,8 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
     guests = GuestListSerializer(many=True, read_only=True)
     guest_details = serializers.ListField(write_only=True, child=serializers.DictField(), required=False)
     guest_group = serializers.UUIDField(write_only=True, required=False)
+    men_count = serializers.IntegerField(write_only=True, required=False, min_value=0)
+    women_count = serializers.IntegerField(write_only=True, required=False, min_value=0)
     order_status = serializers.CharField(read_only=True)
     hotel_name = serializers.CharField(source="hotel.name", read_only=True)
     guest_type = serializers.CharField(read_only=True)
@@ -36,6 +40,8 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
             "guests",
             "guest_details",
             "guest_group",
+            "men_count",
+            "women_count",
             "order_food",
             "food_order",
             "rooms",
@@ -86,15 +92,7 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
             HotelOrder.GuestType.GROUP if guest_group else HotelOrder.GuestType.INDIVIDUAL
         )
 
-        if data["guest_type"] == HotelOrder.GuestType.GROUP:\
-            # validate duplicate room
-            busy_rooms = []
-            for room in rooms:
-                if room.is_busy:
-                    busy_rooms.append(room)
-            if busy_rooms:
-                names = ", ".join([f"{room.hotel.name} - {room.room_number}" for room in busy_rooms])
-                raise serializers.ValidationError(f"Quyidagi xonalar band: {names}")
+        self.validate_availability(data)
 
         if guest_group and guests_data:
             raise CustomExceptionError(code=400, detail="Faqat bittasi: guest_group yoki guest_details")
@@ -111,6 +109,17 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
         if guests_data and data.get("count_of_people") != len(guests_data):
             raise CustomExceptionError(code=400, detail="guest_details bilan count_of_people mos emas")
 
+        # Group size as placement sees it: count_of_people, otherwise the guest group's count
+        if guest_group:
+            count_of_people = get_group_size(count_of_people, guest_group)
+
+        # Split by gender: both parts are required and must add up to the group
+        if "men_count" in data or "women_count" in data:
+            if not guest_group:
+                raise CustomExceptionError(code=400, detail="men_count/women_count faqat group order uchun")
+            if data.get("men_count", 0) + data.get("women_count", 0) != count_of_people:
+                raise CustomExceptionError(code=400, detail="men_count va women_count yig'indisi guruhdagi odamlar soniga teng emas")
+
         # Extra validation: For GROUP orders make sure selected rooms have enough total capacity
         if guest_group and rooms:
             # rooms here is a list or queryset of Room instances (converted by DRF)
@@ -128,11 +137,45 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
 
         return data
 
+    def validate_availability(self, data):
+        """
+        Reject rooms that are fully booked at any moment of the check_in → check_out window,
+        including planned (future) stays.
+        """
+        check_in = data.get("check_in", getattr(self.instance, "check_in", None))
+        check_out = data.get("check_out", getattr(self.instance, "check_out", None))
+        if data["guest_type"] == HotelOrder.GuestType.GROUP:
+            selected_rooms = data.get("rooms") or []
+        else:
+            selected_rooms = [data["room"]] if data.get("room") else []
+
+        if not selected_rooms or not check_in or not check_out or check_out <= check_in:
+            return
+
+        availability = get_rooms_availability(
+            check_in,
+            check_out,
+            rooms=Room.objects.filter(id__in=[room.id for room in selected_rooms]),
+            exclude_order=self.instance,
+        )
+        busy_rooms = [room for room in selected_rooms if availability[room.id]["free"] <= 0]
+        if busy_rooms:
+            names = ", ".join([f"{room.hotel.name} - {room.room_number}" for room in busy_rooms])
+            raise serializers.ValidationError(f"Quyidagi xonalar band: {names}")
+
+        free = sum(availability[room.id]["free"] for room in selected_rooms)
+        if (data.get("count_of_people") or 0) > free:
+            raise CustomExceptionError(
+                code=400, detail=f"Tanlangan xonalarda shu sanalar uchun {free} ta bo'sh joy bor."
+            )
+
     def create(self, validated_data):
         guests_data = validated_data.pop("guest_details", [])
         guest_group_id = validated_data.pop("guest_group", None)
         rooms = validated_data.pop("rooms", [])
         food_orders = validated_data.pop("food_order", [])
+        men_count = validated_data.pop("men_count", None)
+        women_count = validated_data.pop("women_count", None)
         count_of_people = validated_data.get("count_of_people") or 0
 
 
@@ -156,6 +199,7 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
             elif guest_group_id:
                 order.guest_group_id = guest_group_id
                 order.save(update_fields=["guest_group"])
+                place_group_order(order, rooms, men=men_count, women=women_count)
                 order.rooms.set(rooms)
 
                 guest_group = GuestGroup.objects.get(id=guest_group_id)
@@ -167,12 +211,9 @@ class HotelOrderGuestSerializer(CustomModelSerializer):
             calculate_prices_for_order(order)
             order.save(update_fields=["general_cost"])
 
-            # Room occupancy refresh
-            rooms_to_refresh = (
-                [order.room] if order.guest_type == HotelOrder.GuestType.INDIVIDUAL else rooms
-            )
-            for room in rooms_to_refresh:
-                update_room_occupancy(room)
+            # Room occupancy: bulk-created guests send no signals, group orders are synced on save
+            if guests_data:
+                sync_occupancy_sources({guest.id: get_guest_schedule(guest) for guest in guests})
 
         return order
 
@@ -3,7 +3,7 @@ from django.db.models.signals import post_save, m2m_changed
 
 from apps.orders.models.hotel_order import HotelOrder
 from apps.orders.utils.calculate_price import calculate_prices_for_order
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.occupancy_events import sync_order_occupancy
 
 
 @receiver(post_save, sender=HotelOrder)
@@ -40,5 +40,4 @@ def hotel_order_guests_changed(sender, instance: HotelOrder, action, **kwargs):
 @receiver(m2m_changed, sender=HotelOrder.rooms.through)
 def update_room_occupancy_on_m2m_change(sender, instance, action, **kwargs):
     if action in {"post_add", "post_remove", "post_clear"}:
-        for room in instance.rooms.all():
-            update_room_occupancy(room)
\ No newline at end of file
+        sync_order_occupancy(instance)
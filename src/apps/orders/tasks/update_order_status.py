@@ -1,21 +1,16 @@
 from celery import shared_task
-from django.utils.timezone import now
-from apps.orders.models import HotelOrder
 
+from apps.orders.utils.status_transitions import transition_hotel_order_statuses
 
-@shared_task
-def update_order_status_daily():
-    today = now().date()
-
-    orders = HotelOrder.objects.select_related("room").all()
-    for order in orders:
-        if today < order.check_in.date():
-            new_status = HotelOrder.OrderStatus.PLANNED
-        elif order.check_in.date() <= today <= order.check_out.date():
-            new_status = HotelOrder.OrderStatus.ACTIVE
-        else:
-            new_status = HotelOrder.OrderStatus.COMPLETED
 
-        if order.order_status != new_status:
-            order.order_status = new_status
-            order.save(update_fields=["order_status"])
+@shared_task
+def transition_hotel_order_statuses_task():
+    """
+    PLANNED → ACTIVE → COMPLETED o'tishlarini oxirgi ishga tushirishdan beri
+    check_in/check_out vaqti o'tgan orderlar va mehmonlar uchun bajaradi.
+    """
+    counts = transition_hotel_order_statuses()
+    return (
+        f"{counts['started']} orders started, {counts['completed'] + counts['skipped']} orders "
+        f"and {counts['guests']} guests completed"
+    )
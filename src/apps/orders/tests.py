@@ -1,3 +1,457 @@
+import random
+import uuid
+from unittest import skipUnless
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.counter_agents.models import CounterAgent
+from apps.foods.models import Food, FoodSection, RecipeFood
+from apps.base.exceptions import CustomExceptionError
+from apps.guests.models import Guest, GuestGroup
+from apps.hotels.models import Hotel
+from apps.orders.models import FoodOrder, HotelOrder, RoomAllocation
+from apps.orders.serializers.hotel_guest_order import HotelOrderGuestSerializer
+from apps.orders.utils.calculate_price import sweep_guest_prices
+from apps.orders.utils.refresh_rooms import refresh_rooms_occupancy, update_room_occupancy
+from apps.orders.utils.status_transitions import transition_hotel_order_statuses
+from apps.orders.utils.room_placement import place_group_order, plan_group_placement
+from apps.products.models import Product
+from apps.rooms.models import Room, RoomType
+from apps.rooms.utils.availability import get_rooms_availability
+from apps.sections.models import Measure, Section
+from apps.warehouses.models import ProductStock, ProductsUsed, Warehouse
+
+
+class FoodOrderBulkCreateTests(TestCase):
+    """
+    Test the batch food-order endpoint.
+    """
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        self.product = Product.objects.create(
+            name="Rice",
+            measure=measure,
+            measure_warehouse=measure,
+            section=section,
+            difference_measures=Decimal("1000"),
+        )
+        Warehouse.objects.create(product=self.product, gross_price=Decimal("100"), arrived_count=Decimal("1"))
+        Warehouse.objects.create(product=self.product, gross_price=Decimal("200"), arrived_count=Decimal("1"))
+
+        recipe_food = RecipeFood.objects.create(product=self.product, count=Decimal("300"))
+        self.food = Food.objects.create(
+            name="Plov", section=FoodSection.objects.create(name="Main"), profit=Decimal("10")
+        )
+        self.food.recipes.set([recipe_food])
+        self.counter_agent = CounterAgent.objects.create(
+            name="Agent", address="Makkah", counter_agent_type=CounterAgent.Type.B2B
+        )
+
+        self.client = APIClient()
+        self.url = reverse("food_orders_bulk_create")
+
+    def order(self, product_count):
+        return {
+            "food": str(self.food.id),
+            "product_count": product_count,
+            "counter_agent": str(self.counter_agent.id),
+        }
+
+    def test_orders_share_one_deduction(self):
+        response = self.client.post(
+            self.url, {"orders": [self.order(2), self.order(3)]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["orders"]), 2)
+        self.assertEqual(ProductStock.objects.get(product=self.product).available, Decimal("500"))
+
+        for order in FoodOrder.objects.all():
+            used = ProductsUsed.objects.filter(order_id=order.food_order_id)
+            self.assertEqual(
+                sum(Decimal(item.count) for item in used), Decimal("300") * order.product_count
+            )
+            self.assertEqual(order.cost, sum(item.price for item in used))
+            self.assertEqual(order.profit, Decimal("10"))
+
+    def test_shortage_creates_nothing(self):
+        response = self.client.post(
+            self.url, {"orders": [self.order(4), self.order(3)]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FoodOrder.objects.exists())
+        self.assertFalse(ProductsUsed.objects.exists())
+
+
+class FoodOrderSnapshotTests(TestCase):
+    """
+    The prices of an order are snapshotted when it is placed.
+    """
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        product = Product.objects.create(
+            name="Rice",
+            measure=measure,
+            measure_warehouse=measure,
+            section=Section.objects.create(name="Vegetables"),
+            difference_measures=Decimal("1000"),
+        )
+        self.food = Food.objects.create(
+            name="Plov", section=FoodSection.objects.create(name="Main"), profit=Decimal("10")
+        )
+        self.food.recipes.set([RecipeFood.objects.create(product=product, count=Decimal("300"))])
+        with self.captureOnCommitCallbacks(execute=True):
+            Warehouse.objects.create(product=product, gross_price=Decimal("100"), arrived_count=Decimal("1"))
+        self.food.refresh_from_db()
+        self.order = FoodOrder.objects.create(
+            food=self.food,
+            product_count=1,
+            counter_agent=CounterAgent.objects.create(
+                name="Agent", address="Makkah", counter_agent_type=CounterAgent.Type.B2B
+            ),
+        )
+
+    def test_later_saves_keep_the_snapshot(self):
+        placed = (self.order.profit, self.order.net_price, self.order.price)
+        Food.objects.filter(pk=self.food.pk).update(
+            profit=Decimal("99"), net_price=Decimal("500"), gross_price=Decimal("599")
+        )
+
+        response = APIClient().patch(
+            reverse("food_order_retrieve", args=[self.order.pk]),
+            {"status": FoodOrder.Status.CANCELED},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, FoodOrder.Status.CANCELED)
+        self.assertEqual((self.order.profit, self.order.net_price, self.order.price), placed)
+        self.assertEqual((self.order.profit, self.order.net_price), (Decimal("10"), Decimal("30")))
+
+
+
+class OrderPricingTests(SimpleTestCase):
+    """
+    The sweep-line pricing must charge exactly what the day-by-day walk did.
+    """
+
+    def legacy_prices(self, stays, daily_price):
+        prices = []
+        for check_in, check_out, count in stays:
+            cost = Decimal("0.00")
+            current_day = check_in
+            while current_day < check_out:
+                guests_count = sum(c for ci, co, c in stays if ci <= current_day < co) or 1
+                cost += (daily_price / guests_count) * count
+                current_day += timedelta(days=1)
+            prices.append(cost)
+        return prices
+
+    def test_matches_day_by_day_walk(self):
+        rng = random.Random(7)
+        start = datetime(2025, 5, 1, 14, 0)
+        for _ in range(20):
+            stays = []
+            for _ in range(rng.randint(1, 8)):
+                check_in = start + timedelta(days=rng.randint(0, 10), hours=rng.choice([0, 0, 3, 12]))
+                check_out = check_in + timedelta(days=rng.randint(0, 12), hours=rng.choice([0, 0, -2, 5]))
+                stays.append((check_in, check_out, rng.randint(1, 3)))
+
+            quantize = lambda prices: [price.quantize(Decimal("0.01")) for price in prices]
+            self.assertEqual(
+                quantize(sweep_guest_prices(stays, Decimal("250.00"))),
+                quantize(self.legacy_prices(stays, Decimal("250.00"))),
+            )
+
+
+class StatusTransitionTests(TestCase):
+    """
+    Each run only moves the orders whose check-in or check-out passed since the previous run.
+    """
+
+    def test_transitions_since_watermark(self):
+        now = timezone.now()
+        Status = HotelOrder.OrderStatus
+        stays = {
+            "starts": (Status.PLANNED, now + timedelta(hours=1), now + timedelta(days=1)),
+            "ends": (Status.ACTIVE, now - timedelta(days=1), now + timedelta(hours=2)),
+            "short": (Status.PLANNED, now + timedelta(minutes=10), now + timedelta(minutes=30)),
+            "later": (Status.PLANNED, now + timedelta(days=2), now + timedelta(days=3)),
+        }
+        orders = HotelOrder.objects.bulk_create(
+            [
+                HotelOrder(
+                    order_status=status, check_in=check_in, check_out=check_out,
+                    guest_type=HotelOrder.GuestType.GROUP, count_of_people=1,
+                )
+                for status, check_in, check_out in stays.values()
+            ]
+        )
+
+        self.assertEqual(transition_hotel_order_statuses(now), {"started": 0, "completed": 0, "skipped": 0, "guests": 0})
+        self.assertEqual(
+            transition_hotel_order_statuses(now + timedelta(hours=3)),
+            {"started": 1, "completed": 1, "skipped": 1, "guests": 0},
+        )
+        self.assertEqual(
+            transition_hotel_order_statuses(now + timedelta(hours=3))["started"], 0
+        )
+        self.assertEqual(
+            [HotelOrder.objects.get(pk=order.pk).order_status for order in orders],
+            [Status.ACTIVE, Status.COMPLETED, Status.COMPLETED, Status.PLANNED],
+        )
+
+    def test_save_sets_status_from_dates(self):
+        now = timezone.now()
+        order = HotelOrder.objects.create(
+            guest_type=HotelOrder.GuestType.GROUP, count_of_people=1,
+            check_in=now + timedelta(days=1), check_out=now + timedelta(days=2),
+        )
+        self.assertEqual(order.order_status, HotelOrder.OrderStatus.PLANNED)
+
+
+class RoomStaysMixin:
+    """
+    Two rooms of one hotel, three individual guests (one already left) and a
+    group order placed in both rooms.
+    """
+
+    def setUp(self):
+        hotel = Hotel.objects.create(
+            name="Hotel", address="Makkah", email="hotel@example.com", phone_number="+9660110000000", rating=4
+        )
+        room_type = RoomType.objects.create(name="Standard")
+        room_fields = {"hotel": hotel, "room_type": room_type, "net_price": 10, "profit": 5, "gross_price": 15}
+        self.small_room = Room.objects.create(capacity=2, count=3, room_number="101", **room_fields)
+        self.large_room = Room.objects.create(capacity=4, count=1, room_number="201", **room_fields)
+
+        now = timezone.now()
+        Guest.objects.bulk_create(
+            [
+                Guest(
+                    hotel=hotel, room=self.small_room, order_number=f"№{i}", gender=Guest.Gender.MALE,
+                    full_name=f"Guest {i}", count=count, check_in=now - timedelta(days=1), check_out=check_out,
+                )
+                for i, (count, check_out) in enumerate(
+                    [(1, now + timedelta(days=1)), (2, now + timedelta(days=2)), (2, now - timedelta(hours=1))]
+                )
+            ]
+        )
+        order = HotelOrder.objects.bulk_create(
+            [
+                HotelOrder(
+                    hotel=hotel, guest_type=HotelOrder.GuestType.GROUP, count_of_people=7,
+                    check_in=now - timedelta(days=1), check_out=now + timedelta(days=3),
+                )
+            ]
+        )[0]
+        HotelOrder.rooms.through.objects.bulk_create(
+            [HotelOrder.rooms.through(hotelorder=order, room=room) for room in (self.small_room, self.large_room)]
+        )
+
+
+class RoomOccupancyTests(RoomStaysMixin, TestCase):
+    """
+    The set-based occupancy engine refreshes every room with a fixed number of queries.
+    """
+
+    def test_refresh_all_rooms(self):
+        with self.assertNumQueries(5):
+            refresh_rooms_occupancy()
+
+        # === 3 individual guests and 6 of the group in the smaller rooms first ===
+        self.small_room.refresh_from_db()
+        self.assertEqual(
+            (self.small_room.occupied_count, self.small_room.available_count, self.small_room.remaining_capacity),
+            (3, 0, 0),
+        )
+        self.assertTrue(self.small_room.is_busy)
+
+        self.large_room.refresh_from_db()
+        self.assertEqual(
+            (self.large_room.occupied_count, self.large_room.available_count, self.large_room.remaining_capacity),
+            (1, 0, 3),
+        )
+        self.assertFalse(self.large_room.is_busy)
+
+    def test_single_room_wrapper(self):
+        update_room_occupancy(self.large_room, save=False)
+        self.assertEqual(self.large_room.remaining_capacity, 3)
+
+
+class GroupPlacementTests(RoomStaysMixin, TestCase):
+    """
+    Group orders are split over the fewest room units and the split is stored per room.
+    """
+
+    def test_plan_group_placement(self):
+        # === Fewest units: the last 4-bed unit is swapped for a 2-bed one ===
+        self.assertEqual(
+            plan_group_placement([("x", 6, 1), ("y", 4, 1), ("z", 2, 1)], people=8),
+            {("x", None): {"guests": 6, "units": 1}, ("z", None): {"guests": 2, "units": 1}},
+        )
+        self.assertEqual(
+            plan_group_placement([("a", 2, 3), ("b", 4, 1)], men=3, women=4),
+            {("b", Guest.Gender.FEMALE): {"guests": 4, "units": 1}, ("a", Guest.Gender.MALE): {"guests": 3, "units": 2}},
+        )
+
+    def test_stored_allocation_is_read(self):
+        now = timezone.now()
+        order = HotelOrder.objects.create(
+            hotel=self.small_room.hotel, guest_type=HotelOrder.GuestType.GROUP, count_of_people=7,
+            check_in=now + timedelta(days=5), check_out=now + timedelta(days=6),
+        )
+        place_group_order(order, [self.small_room, self.large_room])
+        order.rooms.set([self.small_room, self.large_room])
+
+        self.assertEqual(
+            dict(RoomAllocation.objects.filter(order=order).values_list("room_id", "guests")),
+            {self.large_room.id: 4, self.small_room.id: 3},
+        )
+        availability = get_rooms_availability(order.check_in, order.check_out)
+        self.assertEqual(availability[self.large_room.id]["booked"], 4)
+        self.assertEqual(availability[self.small_room.id]["booked"], 3)
+
+    def test_gender_split_checked_against_group_size(self):
+        now = timezone.now()
+        group = GuestGroup.objects.create(name="Group", count=7)
+        data = {
+            "hotel": str(self.small_room.hotel.id),
+            "rooms": [str(self.small_room.id), str(self.large_room.id)],
+            "guest_group": str(group.id),
+            "count_of_people": 0,
+            "check_in": now + timedelta(days=5),
+            "check_out": now + timedelta(days=6),
+        }
+
+        # === count_of_people is 0: the split must add up to the guest group, as placement does ===
+        serializer = HotelOrderGuestSerializer(data={**data, "men_count": 3, "women_count": 4})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(CustomExceptionError):
+            HotelOrderGuestSerializer(data={**data, "men_count": 3, "women_count": 3}).is_valid()
+
+
+class HotelOrderListQueryTests(TestCase):
+    """
+    The active and completed order lists only serialize the order's own guests,
+    with a query count that does not grow with the hotel's guest history.
+    """
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(
+            name="Hotel", address="Makkah", email="hotel@example.com", phone_number="+9660110000000", rating=4
+        )
+        self.room_type = RoomType.objects.create(name="Standard")
+        self.room = Room.objects.create(
+            hotel=self.hotel, room_type=self.room_type, capacity=4, count=5, room_number="101",
+            net_price=10, profit=5, gross_price=15,
+        )
+        self.now = timezone.now()
+
+        self.orders = HotelOrder.objects.bulk_create(
+            [
+                HotelOrder(
+                    hotel=self.hotel, room=self.room, order_status=status, count_of_people=2,
+                    guest_type=HotelOrder.GuestType.INDIVIDUAL,
+                    check_in=self.now - timedelta(days=2), check_out=self.now + timedelta(days=2),
+                )
+                for status in [HotelOrder.OrderStatus.ACTIVE] * 3 + [HotelOrder.OrderStatus.COMPLETED] * 3
+            ]
+        )
+        HotelOrder.guests.through.objects.bulk_create(
+            [
+                HotelOrder.guests.through(hotelorder=order, guest=guest)
+                for order in self.orders
+                for guest in self.add_guests(2)
+            ]
+        )
+
+    def add_guests(self, count):
+        return Guest.objects.bulk_create(
+            [
+                Guest(
+                    hotel=self.hotel, room=self.room, order_number=f"№{uuid.uuid4().hex[:8]}",
+                    gender=Guest.Gender.MALE, full_name="Guest", price=Decimal("10"),
+                    check_in=self.now - timedelta(days=2), check_out=self.now + timedelta(days=2),
+                )
+                for _ in range(count)
+            ]
+        )
+
+    def fetch(self, name, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_lists_serialize_order_guests_only(self):
+        for name in ["active-orders-list", "no-active-orders-list"]:
+            for params in [{}, {"room_type": str(self.room_type.id)}]:
+                response, queries = self.fetch(name, **params)
+                # === count, page, guests and food orders (+ rooms, + the room_type filter lookup) ===
+                self.assertLessEqual(queries, 6)
+                self.assertEqual([len(order["guests"]) for order in response.data["results"]], [2, 2, 2])
+
+                # === Hotel history: guests that belong to no listed order ===
+                self.add_guests(30)
+                response, queries_with_history = self.fetch(name, **params)
+                self.assertEqual(queries_with_history, queries)
+                self.assertEqual([len(order["guests"]) for order in response.data["results"]], [2, 2, 2])
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is PostgreSQL specific")
+class IndexUsageTests(TestCase):
+    """
+    The hot filters of occupancy, billing, statistics and deduction are served by the Meta.indexes.
+    """
+
+    def assertUsesIndex(self, queryset, *index_names):
+        # === The tables are tiny here; make the planner show which index it would use ===
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), plan)
+
+    def test_hot_queries_use_indexes(self):
+        now = timezone.now()
+
+        self.assertUsesIndex(
+            Guest.objects.filter(status=Guest.Status.NEW, room_id=uuid.uuid4(), check_in__lte=now, check_out__gt=now),
+            "guest_new_room_stay_idx",
+        )
+        self.assertUsesIndex(
+            Guest.objects.filter(status=Guest.Status.NEW, check_out__lte=now), "guest_new_check_out_idx"
+        )
+        self.assertUsesIndex(
+            HotelOrder.objects.filter(
+                order_status=HotelOrder.OrderStatus.ACTIVE,
+                guest_type=HotelOrder.GuestType.GROUP,
+                check_in__lte=now,
+            ),
+            "hotel_order_status_stay_idx",
+            "hotel_order_status_in_idx",
+        )
+        self.assertUsesIndex(
+            FoodOrder.objects.filter(status=FoodOrder.Status.ACCEPTED, created_at__gte=now), "food_order_status_created_idx"
+        )
+        self.assertUsesIndex(
+            Warehouse.objects.filter(product_id=uuid.uuid4(), status=True).order_by("created_at"),
+            "warehouse_active_product_idx",
+        )
+
 #
 # class IndividualHotelOrder(HotelOrder):
 #     room = FK(Room)
@@ -8,4 +462,4 @@
 # class GroupHotelOrder(HotelOrder):
 #     rooms = M2M(Room)
 #     guest_group = FK(GuestGroup)
-#     count_of_people = Integer
\ No newline at end of file
+#     count_of_people = Integer
@@ -7,12 +7,14 @@ from apps.orders.views import (HotelOrderCreateAPIView,
                                HotelOrderDeleteAPIView)
 from apps.orders.views.active_orders import ActiveHotelOrderListAPIView
 from apps.orders.views.food_order import (FoodOrderListCreateAPIView,
-                                          FoodOrderRetrieveUpdateAPIView,)
+                                          FoodOrderRetrieveUpdateAPIView,
+                                          FoodOrderBulkCreateAPIView,)
 from apps.orders.views.noactive_orders import NoActiveHotelOrderListAPIView
 
 urlpatterns = [
     # ===================  Food Orders ===================
     path("food_orders/", FoodOrderListCreateAPIView.as_view(), name="food_orders_create_list"),
+    path("food_orders/bulk/", FoodOrderBulkCreateAPIView.as_view(), name="food_orders_bulk_create"),
     path("food_orders/<str:pk>/", FoodOrderRetrieveUpdateAPIView.as_view(), name="food_order_retrieve"),
 
     # ===================  Hotel Orders ===================
@@ -1,9 +1,66 @@
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
 from apps.guests.models import Guest
 from apps.base.exceptions import CustomExceptionError
 
+DAY = timedelta(days=1)
+
+
+def count_nights(check_in, start, end):
+    """
+    Number of nightly charges (at check_in, check_in + 1 day, ...) that fall in [start, end).
+    """
+    if end <= start:
+        return 0
+    first = -((check_in - start) // DAY)
+    last = -((check_in - end) // DAY)
+    return max(last - max(first, 0), 0)
+
+
+def sweep_guest_prices(stays, daily_price):
+    """
+    Split a room's daily price between overlapping guests with one sweep.
+
+    A guest is charged once per day of the stay, at check-in and every 24 hours
+    after it. Each charge is shared by everyone in the room at that moment, in
+    proportion to the number of people per guest record. Check-in and check-out
+    times are sorted once into segments of constant occupancy, and every guest
+    is charged per segment instead of per day.
+
+    Args:
+        stays: List of (check_in, check_out, count)
+        daily_price: Price of the room for one day
+
+    Returns:
+        list: Price of every stay, unrounded, in the order of ``stays``
+    """
+    times = sorted({time for check_in, check_out, _ in stays for time in (check_in, check_out)})
+
+    # === People in the room during [times[i], times[i + 1]) ===
+    changes = [0] * len(times)
+    for check_in, check_out, count in stays:
+        if check_in < check_out:
+            changes[bisect_left(times, check_in)] += count
+            changes[bisect_left(times, check_out)] -= count
+
+    occupancy = []
+    current = 0
+    for change in changes:
+        current += change
+        occupancy.append(current)
+
+    prices = []
+    for check_in, check_out, count in stays:
+        price = Decimal("0.00")
+        for i in range(bisect_left(times, check_in), bisect_right(times, check_out) - 1):
+            nights = count_nights(check_in, times[i], min(times[i + 1], check_out))
+            if nights:
+                price += (daily_price / (occupancy[i] or 1)) * count * nights
+        prices.append(price)
+    return prices
+
 
 def calculate_prices_for_order(order):
     total_cost = Decimal("0.00")
@@ -11,24 +68,16 @@ def calculate_prices_for_order(order):
 
     if order.guest_type == order.GuestType.INDIVIDUAL and order.room and order.guests.exists():
         all_guests = list(order.guests.filter(status=Guest.Status.NEW))
-        daily_price = order.room.gross_price
-        guest_updates = []
-
-        for guest in all_guests:
-            guest_cost = Decimal("0.00")
-            current_day = guest.check_in
-
-            while current_day < guest.check_out:
-                overlapping_guests = [g for g in all_guests if g.check_in <= current_day < g.check_out]
-                guests_count = sum(g.count for g in overlapping_guests) or 1
-                guest_cost += (daily_price / guests_count) * guest.count
-                current_day += timedelta(days=1)
+        prices = sweep_guest_prices(
+            [(guest.check_in, guest.check_out, guest.count) for guest in all_guests],
+            order.room.gross_price,
+        )
 
+        for guest, guest_cost in zip(all_guests, prices):
             guest.price = guest_cost.quantize(two_places, ROUND_HALF_UP)
-            guest_updates.append(guest)
             total_cost += guest.price
 
-        Guest.objects.bulk_update(guest_updates, ["price"])
+        Guest.objects.bulk_update(all_guests, ["price"])
         order.general_cost = total_cost.quantize(two_places)
 
     elif order.guest_type == order.GuestType.GROUP and order.rooms.exists() and order.guest_group_id:
@@ -1,159 +1,198 @@
 import math
+from collections import defaultdict
+
+from django.apps import apps
 from django.db.models import Sum
 from django.utils import timezone
 
 from apps.base.exceptions import CustomExceptionError
 
+OCCUPANCY_FIELDS = ["current_guests", "occupied_count", "available_count", "remaining_capacity", "is_busy"]
+
 
-def calculate_optimal_room_distribution(total_people, rooms_in_order, target_room):
+def distribute_group_guests(total_people, rooms_in_order):
     """
-    Calculate optimal distribution of guests across rooms.
-    This function distributes guests efficiently by filling smaller rooms first.
-    
+    Distribute the guests of one group order across its rooms, filling smaller rooms first.
+
     Args:
         total_people: Total number of people to distribute
-        rooms_in_order: List of room objects in the order
-        target_room: The specific room we're calculating guests for
-        
+        rooms_in_order: List of (room_id, capacity, count) of the order's rooms,
+                        in the rooms' default ordering
+
     Returns:
-        Number of guests assigned to the target room
+        dict: Dictionary mapping room IDs to the number of guests assigned to them
     """
-    if not rooms_in_order or total_people <= 0:
-        return 0
-        
-    print(f"📊 DIST: {total_people} odamni {len(rooms_in_order)} xonaga taqsimlaymiz")
-    print(f"📊 DIST: Target room: {target_room.room_number} (ID: {target_room.id})")
-    
-    # Create a distribution plan
     distribution = {}
     remaining_people = total_people
-    
-    # Sort rooms by capacity (smaller rooms first for optimal filling)
-    sorted_rooms = sorted(rooms_in_order, key=lambda r: (r.capacity or 0))
-    
-    # Distribute guests room by room, filling smaller rooms first
-    for room in sorted_rooms:
-        capacity = room.capacity or 0
-        count = getattr(room, 'count', 1) or 1  # Safe way to get count, default to 1
-        total_room_capacity = capacity * count
-        
-        print(f"📊 DIST: Room {room.room_number}: capacity={capacity}, count={count}, total_capacity={total_room_capacity}")
-        
+
+    # === Stable sort: rooms of equal capacity keep their default ordering ===
+    for room_id, capacity, count in sorted(rooms_in_order, key=lambda room: room[1] or 0):
+        total_room_capacity = (capacity or 0) * (count or 1)
+
         if remaining_people <= 0 or total_room_capacity <= 0:
-            distribution[room.id] = 0
+            distribution[room_id] = 0
             continue
-            
-        # Assign guests to this room type
-        if remaining_people <= total_room_capacity:
-            # All remaining people can fit in this room type
-            distribution[room.id] = remaining_people
-            remaining_people = 0
-        else:
-            # Fill this room type to capacity
-            distribution[room.id] = total_room_capacity
-            remaining_people -= total_room_capacity
-            
-        print(f"📊 DIST: Room {room.room_number} ga {distribution[room.id]} odam tayinlandi")
-    
-    result = distribution.get(target_room.id, 0)
-    print(f"📊 DIST: Target room {target_room.room_number} uchun yakuniy natija: {result} odam")
-    
-    # Return the number of guests assigned to the target room
-    return result
 
-def update_room_occupancy(room, save=True):
-    from apps.guests.models import Guest
-    from apps.orders.models import HotelOrder
+        assigned = min(remaining_people, total_room_capacity)
+        distribution[room_id] = assigned
+        remaining_people -= assigned
 
-    now = timezone.now()
+    return distribution
 
-    if not room.capacity:
-        raise CustomExceptionError(code=400, detail="Room capacity cannot be null or zero.")
 
-    # Get room count safely, default to 1 if not set (treat as single physical room)
-    room_count = getattr(room, 'count', 1) or 1
-
-    print(f"🔍 DEBUG: Room {room.room_number} (ID: {room.id}) ni yangilamoqdamiz")
-    print(f"🔍 DEBUG: capacity={room.capacity}, count={room_count}, total_capacity={room.capacity * room_count}")
-
-    # === Individual guests ===
-    # Get all active individual guests for this room (faqat hozirgi vaqtda xonada bo'lganlar)
-    individual_guests_count = Guest.objects.filter(
-        room=room,
-        status=Guest.Status.NEW,
-        check_in__lte=now,  # Check-in vaqti o'tgan
-        check_out__gt=now   # Check-out vaqti hali kelmagan
-    ).aggregate(total=Sum("count"))['total'] or 0
-
-    print(f"🔍 DEBUG: Individual guests (hozir xonada): {individual_guests_count}")
-
-    # === Group guests ===
-    # Get all active group orders that include this room (faqat hozirgi vaqtda xonada bo'lganlar)
-    group_orders = HotelOrder.objects.filter(
-        rooms=room,
-        order_status=HotelOrder.OrderStatus.ACTIVE,
-        guest_type=HotelOrder.GuestType.GROUP,
-        check_in__lte=now,  # Check-in vaqti o'tgan
-        check_out__gt=now   # Check-out vaqti hali kelmagan
-    ).select_related("guest_group").prefetch_related("rooms")
-
-    print(f"🔍 DEBUG: {group_orders.count()} ta group order topildi (hozir xonada)")
-
-    # Calculate group guests using optimal distribution algorithm
-    group_guests_count = 0
-    for order in group_orders:
-        # Get actual number of people in this order
-        people_in_order = (order.count_of_people or 0)
-        if people_in_order <= 0 and order.guest_group:
-            people_in_order = (order.guest_group.count or 0)
-        if people_in_order <= 0:
-            print(f"🔍 DEBUG: Order {order.id} - odamlar soni 0")
-            continue
-            
-        rooms_in_order = list(order.rooms.all())
-        if not rooms_in_order:
-            print(f"🔍 DEBUG: Order {order.id} - xonalar yo'q")
-            continue
-            
-        print(f"🔍 DEBUG: Order {order.id}: {people_in_order} odam, {len(rooms_in_order)} xona")
-        
-        # Calculate optimal distribution of guests across all rooms in this order
-        guests_for_current_room = calculate_optimal_room_distribution(
-            people_in_order, rooms_in_order, room
+def load_group_orders(order_rooms):
+    """
+    Read group orders with all their rooms and stored allocations in two queries.
+
+    Args:
+        order_rooms: QuerySet of ``HotelOrder.rooms.through`` rows to read
+
+    Returns:
+        dict: {order_id: {"people": int, "check_in": datetime, "check_out": datetime,
+                          "rooms": [(room_id, capacity, count), ...],
+                          "allocation": {room_id: guests}}}
+              with the rooms in their default ordering
+    """
+    RoomAllocation = apps.get_model("orders", "RoomAllocation")
+    rows = order_rooms.order_by("hotelorder_id", "-room__created_at").values_list(
+        "hotelorder_id",
+        "hotelorder__count_of_people",
+        "hotelorder__guest_group__count",
+        "hotelorder__check_in",
+        "hotelorder__check_out",
+        "room_id",
+        "room__capacity",
+        "room__count",
+    )
+
+    orders = {}
+    for order_id, count_of_people, group_count, check_in, check_out, room_id, capacity, count in rows:
+        order = orders.setdefault(
+            order_id,
+            {
+                "people": count_of_people or group_count or 0,
+                "check_in": check_in,
+                "check_out": check_out,
+                "rooms": [],
+            },
         )
-        print(f"🔍 DEBUG: Room {room.room_number} ga {guests_for_current_room} odam tayinlandi")
-        group_guests_count += guests_for_current_room
+        order["rooms"].append((room_id, capacity, count))
+
+    if orders:
+        allocations = (
+            RoomAllocation.objects.filter(order_id__in=orders)
+            .order_by()
+            .values("order_id", "room_id")
+            .annotate(total=Sum("guests"))
+            .values_list("order_id", "room_id", "total")
+        )
+        for order_id, room_id, total in allocations:
+            orders[order_id].setdefault("allocation", {})[room_id] = total
+    return orders
 
-    # Calculate total guests for this room type
-    total_guests_float = (individual_guests_count or 0) + group_guests_count
-    # Use ceiling for occupancy calculation (can't have fractional guests)
-    total_guests = math.ceil(total_guests_float)
-    total_capacity = room.capacity * room_count
 
-    print(f"🔍 DEBUG: individual={individual_guests_count}, group={group_guests_count}")
-    print(f"🔍 DEBUG: total_guests={total_guests}, total_capacity={total_capacity}")
+def get_group_distribution(order):
+    """
+    Returns:
+        dict: Dictionary mapping room IDs to the guests of a loaded group order.
+              The stored allocation is used while it still matches the order's
+              rooms and size; older orders are distributed smallest rooms first.
+    """
+    if order["people"] <= 0:
+        return {}
+
+    allocation = order.get("allocation")
+    room_ids = {room_id for room_id, _, _ in order["rooms"]}
+    if allocation and set(allocation) <= room_ids and sum(allocation.values()) == order["people"]:
+        return {room_id: allocation.get(room_id, 0) for room_id in room_ids}
+    return distribute_group_guests(order["people"], order["rooms"])
+
+
+def apply_room_occupancy(room, individual_guests, group_guests):
+    """
+    Set the occupancy fields of a room from its current head-count.
+    """
+    room_count = room.count or 1
+    total_guests = math.ceil((individual_guests or 0) + group_guests)
+    room.current_guests = total_guests
+    total_capacity = room.capacity * room_count
 
-    # === Calculate occupancy ===
     if total_guests == 0:
         occupied_rooms = 0
         remaining_capacity = total_capacity
     else:
-        # Calculate how many rooms are occupied or will be occupied
-        occupied_rooms = math.ceil(total_guests / room.capacity) if room.capacity > 0 else 0
+        occupied_rooms = math.ceil(total_guests / room.capacity)
         remaining_capacity = max(total_capacity - total_guests, 0)
 
-    print(f"🔍 DEBUG: occupied_rooms={occupied_rooms}, remaining_capacity={remaining_capacity}")
-
     room.occupied_count = min(occupied_rooms, room_count)
     room.available_count = max(room_count - room.occupied_count, 0)
     room.remaining_capacity = remaining_capacity
     room.is_busy = room.remaining_capacity == 0
 
-    print(f"🔍 DEBUG: YAKUNIY: occupied_count={room.occupied_count}, remaining_capacity={room.remaining_capacity}, is_busy={room.is_busy}")
+
+def refresh_rooms_occupancy(rooms=None, save=True):
+    """
+    Recompute the current occupancy of many rooms at once.
+
+    Individual guests are summed per room with one grouped query, and the rooms
+    and stored allocations of every booked group order are read with two
+    queries. The results are written with one ``bulk_update``. Rooms without a
+    capacity are skipped.
+
+    Args:
+        rooms: Iterable of Room instances, or None for every room
+        save: Whether to write the results
+
+    Returns:
+        list: The refreshed Room instances
+    """
+    Room = apps.get_model("rooms", "Room")
+    Guest = apps.get_model("guests", "Guest")
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+
+    now = timezone.now()
+    refresh_all = rooms is None
+    rooms = [room for room in (Room.objects.all() if refresh_all else rooms) if room.capacity]
+    if not rooms:
+        return []
+    room_filter = {} if refresh_all else {"room_id__in": [room.id for room in rooms]}
+
+    # === Individual guests currently in each room ===
+    individual_guests = dict(
+        Guest.objects.filter(
+            status=Guest.Status.NEW, check_in__lte=now, check_out__gt=now, **room_filter
+        )
+        .order_by()
+        .values("room_id")
+        .annotate(total=Sum("count"))
+        .values_list("room_id", "total")
+    )
+
+    # === Every room of the booked group orders that include one of the rooms ===
+    OrderRooms = HotelOrder.rooms.through
+    active_orders = OrderRooms.objects.filter(
+        hotelorder__order_status__in=HotelOrder.BOOKED_STATUSES,
+        hotelorder__guest_type=HotelOrder.GuestType.GROUP,
+        hotelorder__check_in__lte=now,
+        hotelorder__check_out__gt=now,
+        **room_filter,
+    ).values("hotelorder_id")
+
+    group_guests = defaultdict(int)
+    for order in load_group_orders(OrderRooms.objects.filter(hotelorder_id__in=active_orders)).values():
+        for room_id, assigned in get_group_distribution(order).items():
+            group_guests[room_id] += assigned
+
+    for room in rooms:
+        apply_room_occupancy(room, individual_guests.get(room.id, 0), group_guests[room.id])
 
     if save:
-        print(f"🔍 DEBUG: Room ni saqlayapmiz...")
-        room.save(update_fields=[
-            "occupied_count", "available_count", "remaining_capacity", "is_busy"
-        ])
-        print(f"🔍 DEBUG: Room saqlandi!")
+        Room.objects.bulk_update(rooms, OCCUPANCY_FIELDS)
+    return rooms
+
+
+def update_room_occupancy(room, save=True):
+    if not room.capacity:
+        raise CustomExceptionError(code=400, detail="Room capacity cannot be null or zero.")
+
+    refresh_rooms_occupancy([room], save=save)
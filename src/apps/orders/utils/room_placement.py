@@ -0,0 +1,166 @@
+"""
+Group Room Placement Utility Module
+
+This module places the guests of a group hotel order into its rooms once, when
+the order is created, and stores the result as ``RoomAllocation`` rows.
+
+Every room row stands for ``count`` identical units of ``capacity`` beds. The
+planner uses as few units as possible: it takes the largest free units first
+and then swaps the last one for the smallest unit that still fits the rest of
+the group. When the group is split by gender, men and women are placed into
+separate units.
+
+Example:
+    place_group_order(order, rooms, men=12, women=9)
+    # Returns: list of saved RoomAllocation instances
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+
+from apps.base.exceptions import CustomExceptionError
+from apps.rooms.utils.availability import get_rooms_availability
+
+
+def plan_units(people, units):
+    """
+    Choose the fewest units that hold ``people`` guests.
+
+    Args:
+        people: Number of guests to place
+        units: List of free units as (room_id, capacity), modified in place:
+               the chosen units are removed
+
+    Returns:
+        list: [(room_id, guests), ...] one item per chosen unit
+    """
+    units.sort(key=lambda unit: unit[1], reverse=True)
+
+    chosen = []
+    remaining = people
+    while remaining > 0 and units:
+        chosen.append(units.pop(0))
+        remaining -= chosen[-1][1]
+
+    if remaining > 0:
+        raise CustomExceptionError(code=400, detail="Tanlangan xonalar sig'imi guruh uchun yetarli emas.")
+    if not chosen:
+        return []
+
+    # === The last unit only has to hold what the bigger ones left over ===
+    rest = chosen[-1][1] + remaining
+    smaller = [unit for unit in units if rest <= unit[1] < chosen[-1][1]]
+    if smaller:
+        best = min(smaller, key=lambda unit: unit[1])
+        units.remove(best)
+        units.append(chosen.pop())
+        chosen.append(best)
+
+    placement = []
+    remaining = people
+    for room_id, capacity in chosen:
+        placement.append((room_id, min(capacity, remaining)))
+        remaining -= placement[-1][1]
+    return placement
+
+
+def plan_group_placement(rooms, people=0, men=None, women=None):
+    """
+    Plan the placement of a group across its rooms.
+
+    Args:
+        rooms: List of (room_id, capacity, free_units)
+        people: Group size when the group is not split by gender
+        men: Number of men, splits the group by gender together with ``women``
+        women: Number of women
+
+    Returns:
+        dict: {(room_id, gender): {"guests": int, "units": int}}, gender is None
+              when the group is not split
+    """
+    Guest = apps.get_model("guests", "Guest")
+
+    units = [
+        (room_id, capacity)
+        for room_id, capacity, free_units in rooms
+        if capacity
+        for _ in range(free_units)
+    ]
+
+    if men is None and women is None:
+        parts = [(None, people)]
+    else:
+        # === The larger part first: it has the widest choice of units ===
+        parts = sorted(
+            [(Guest.Gender.MALE, men or 0), (Guest.Gender.FEMALE, women or 0)],
+            key=lambda part: part[1],
+            reverse=True,
+        )
+
+    placement = defaultdict(lambda: {"guests": 0, "units": 0})
+    for gender, count in parts:
+        for room_id, guests in plan_units(count, units):
+            placement[(room_id, gender)]["guests"] += guests
+            placement[(room_id, gender)]["units"] += 1
+    return dict(placement)
+
+
+def get_group_size(count_of_people, guest_group_id):
+    """
+    The number of people a group order places: ``count_of_people`` when given,
+    otherwise the size of its guest group (the same rule ``load_group_orders`` uses).
+    """
+    GuestGroup = apps.get_model("guests", "GuestGroup")
+    if count_of_people or not guest_group_id:
+        return count_of_people or 0
+    return GuestGroup.objects.filter(id=guest_group_id).values_list("count", flat=True).first() or 0
+
+
+def place_group_order(order, rooms, men=None, women=None):
+    """
+    Compute and store the room allocation of a group hotel order.
+
+    Only the units that are free for the whole stay (other stays included,
+    the order's own excluded) are used.
+
+    Args:
+        order: Saved group HotelOrder
+        rooms: The rooms selected for the order
+        men: Number of men when the group is split by gender
+        women: Number of women when the group is split by gender
+
+    Returns:
+        list: The saved RoomAllocation instances
+    """
+    Room = apps.get_model("rooms", "Room")
+    RoomAllocation = apps.get_model("orders", "RoomAllocation")
+
+    rooms = list(rooms)
+    availability = get_rooms_availability(
+        order.check_in,
+        order.check_out,
+        rooms=Room.objects.filter(id__in=[room.id for room in rooms]),
+        exclude_order=order,
+    )
+    people = get_group_size(order.count_of_people, order.guest_group_id)
+    plan = plan_group_placement(
+        [
+            (room.id, room.capacity, min(room.count or 0, availability[room.id]["free"] // room.capacity))
+            for room in rooms
+            if room.capacity
+        ],
+        people=people,
+        men=men,
+        women=women,
+    )
+
+    allocations = [
+        RoomAllocation(order=order, room_id=room_id, gender=gender, guests=row["guests"], units=row["units"])
+        for (room_id, gender), row in plan.items()
+    ]
+    with transaction.atomic():
+        RoomAllocation.objects.filter(order=order).delete()
+        RoomAllocation.objects.bulk_create(allocations)
+    return allocations
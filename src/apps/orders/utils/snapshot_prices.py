@@ -0,0 +1,67 @@
+"""
+Food Order Snapshot Utility Module
+
+This module backfills the price snapshot columns (``profit``, ``net_price`` and
+``cost``) of food orders that were placed before the columns existed. New orders
+fill them in ``FoodOrder.set_price`` and during the warehouse deduction.
+
+Every column is filled with set-based ``UPDATE`` statements: profit and net price
+are read from the ordered food, menu or recipe, and the cost is the sum of the
+order's ``ProductsUsed`` prices.
+
+Example:
+    backfill_food_order_snapshots()
+    # Returns: number of row updates
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_food_order_snapshots():
+    """
+    Fill the snapshot columns of orders that have none yet.
+
+    Profit and net price are copied from the current ordered item, so the
+    backfill should run once, right after the columns are added.
+
+    Returns:
+        int: Number of row updates
+    """
+    FoodOrder = apps.get_model("orders", "FoodOrder")
+    ProductsUsed = apps.get_model("warehouses", "ProductsUsed")
+    items = {
+        FoodOrder.ProductType.FOOD: ("food", apps.get_model("foods", "Food")),
+        FoodOrder.ProductType.MENU: ("menu", apps.get_model("menus", "Menu")),
+        FoodOrder.ProductType.RECIPE: ("recipe", apps.get_model("menus", "Recipe")),
+    }
+
+    cost = (
+        ProductsUsed.objects.filter(order_id=OuterRef("food_order_id"))
+        .order_by()
+        .values("order_id")
+        .annotate(total=Sum("price"))
+        .values("total")
+    )
+
+    updated = 0
+    with transaction.atomic():
+        for product_type, (field, model) in items.items():
+            item = model.objects.filter(id=OuterRef(f"{field}_id"))
+            updated += FoodOrder.objects.filter(
+                product_type=product_type, profit=0, net_price=0, **{f"{field}__isnull": False}
+            ).update(
+                profit=Subquery(item.values("profit")[:1]),
+                net_price=Subquery(item.values("net_price")[:1]),
+            )
+
+        updated += FoodOrder.objects.filter(cost=0).update(
+            cost=Coalesce(
+                Subquery(cost),
+                Value(0),
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            )
+        )
+    return updated
@@ -0,0 +1,89 @@
+"""
+Hotel Order Status Transition Utility Module
+
+This module moves hotel orders and guests along PLANNED → ACTIVE → COMPLETED
+when their check-in or check-out time passes.
+
+A watermark (``StatusTransitionWatermark``) stores the time of the previous
+run, so every run only touches rows whose boundary falls inside
+``(watermark, now]``. The orders are moved with three indexed
+``UPDATE ... WHERE`` statements and the guests with one more; the first run
+(no watermark yet) has no lower bound and catches up on everything.
+
+Room occupancy needs no work here: the check-in and check-out events of the
+same stays are applied by the occupancy event queue. The monthly hotel rollups
+of the completed orders are refreshed on commit.
+
+Example:
+    transition_hotel_order_statuses()
+    # Returns: {"started": 3, "completed": 5, "skipped": 0, "guests": 7}
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from apps.statistics.utils.monthly_stats import refresh_monthly_stats_on_commit
+
+WATERMARK_NAME = "hotel_order_status"
+
+
+def crossed(field, since, now):
+    """
+    Lookups of the rows whose ``field`` time passed in ``(since, now]``.
+    """
+    lookups = {f"{field}__lte": now}
+    if since is not None:
+        lookups[f"{field}__gt"] = since
+    return lookups
+
+
+def transition_hotel_order_statuses(now=None):
+    """
+    Apply the status transitions of every boundary crossed since the last run.
+
+    Args:
+        now: Reference time, defaults to the current time
+
+    Returns:
+        dict: Number of started, completed and skipped (PLANNED → COMPLETED)
+              orders and completed guests
+    """
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+    Guest = apps.get_model("guests", "Guest")
+    StatusTransitionWatermark = apps.get_model("orders", "StatusTransitionWatermark")
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        watermark, _ = StatusTransitionWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+        since = watermark.processed_until
+        if since is not None and since >= now:
+            return {"started": 0, "completed": 0, "skipped": 0, "guests": 0}
+
+        finished = HotelOrder.objects.filter(**crossed("check_out", since, now))
+        months = list(
+            finished.filter(order_status__in=HotelOrder.BOOKED_STATUSES).dates("created_at", "month")
+        )
+
+        counts = {
+            # === PLANNED → ACTIVE: the stay has started and is still running ===
+            "started": HotelOrder.objects.filter(
+                order_status=HotelOrder.OrderStatus.PLANNED, check_out__gt=now, **crossed("check_in", since, now)
+            ).update(order_status=HotelOrder.OrderStatus.ACTIVE),
+            # === ACTIVE → COMPLETED ===
+            "completed": finished.filter(order_status=HotelOrder.OrderStatus.ACTIVE).update(
+                order_status=HotelOrder.OrderStatus.COMPLETED
+            ),
+            # === PLANNED → COMPLETED: the whole stay fell between two runs ===
+            "skipped": finished.filter(order_status=HotelOrder.OrderStatus.PLANNED).update(
+                order_status=HotelOrder.OrderStatus.COMPLETED
+            ),
+            "guests": Guest.objects.filter(status=Guest.Status.NEW, **crossed("check_out", since, now)).update(
+                status=Guest.Status.COMPLETED, room=None
+            ),
+        }
+
+        watermark.processed_until = now
+        watermark.save(update_fields=["processed_until", "updated_at"])
+        refresh_monthly_stats_on_commit(months)
+    return counts
@@ -6,9 +6,9 @@ from rest_framework.response import Response
 from apps.base.views import CustomListAPIView
 from apps.guests.models import Guest
 from apps.orders.filters import HotelFilterForGuests
+from apps.orders.models import FoodOrder
 from apps.orders.models.hotel_order import HotelOrder
 from apps.orders.serializers import ActiveHotelOrderFoodSerializer
-from apps.rooms.models import Room, RoomType
 
 
 class ActiveHotelOrderListAPIView(CustomListAPIView):
@@ -26,9 +26,8 @@ class ActiveHotelOrderListAPIView(CustomListAPIView):
             GET /api/v1/hotels/14690dfa-f331-405a-aeea-61cfd429ee64/?room_type=134a7b13-924f-4e16-825c-86eb07a1a2ee
 
        🏨 Related Prefetched Data:
-       - Guests and their linked rooms and room types
+       - The order's guests and their rooms
        - Food orders
-       - Hotel-level guests and their rooms
        Example Queries:
             - `/api/v1/orders/active/?search=Hilton`
             - `/api/v1/orders/active/?created_at_after=2025-01-01&created_at_before=2025-01-31`
@@ -40,13 +39,12 @@ class ActiveHotelOrderListAPIView(CustomListAPIView):
     search_fields = ["hotel__name"]
 
     def get_queryset(self):
-        return HotelOrder.objects.active_orders().select_related("hotel", "room", "guest_group").prefetch_related("guests",
-                                                                                           "guests__room",
-                                                                                           "guests__room__room_type",
-                                                                                           "food_order",
-                                                                                           Prefetch("hotel__guests", queryset=Guest.objects.all()),
-                                                                                           Prefetch("hotel__guests__room", queryset=Room.objects.all()),
-                                                                                           Prefetch("hotel__guests__room__room_type", queryset=RoomType.objects.all()))
+        # === Only the order's own guests, not every guest the hotel has ever had ===
+        return HotelOrder.objects.active_orders().select_related("hotel", "room", "guest_group").prefetch_related(
+            Prefetch("guests", queryset=Guest.objects.select_related("room")),
+            Prefetch("food_order", queryset=FoodOrder.objects.select_related("counter_agent", "food", "menu", "recipe")),
+            "rooms",
+        )
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -2,10 +2,14 @@ from rest_framework.filters import SearchFilter
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from apps.base.views import CustomRetrieveUpdateAPIView, CustomListCreateAPIView
+from apps.base.views import CustomRetrieveUpdateAPIView, CustomListCreateAPIView, CustomCreateAPIView
 from apps.orders.filters import FoodOrderFilter
 from apps.orders.models import FoodOrder
-from apps.orders.serializers import OnlyFoodOrderSerializer, FoodOrderRetrieveSerializer
+from apps.orders.serializers import (
+    OnlyFoodOrderSerializer,
+    FoodOrderRetrieveSerializer,
+    FoodOrderBulkCreateSerializer,
+)
 
 
 class FoodOrderListCreateAPIView(CustomListCreateAPIView):
@@ -41,3 +45,11 @@ class FoodOrderRetrieveUpdateAPIView(CustomRetrieveUpdateAPIView):
         .prefetch_related("menu__foods")
     )
     serializer_class = FoodOrderRetrieveSerializer
+
+
+class FoodOrderBulkCreateAPIView(CustomCreateAPIView):
+    """
+    Create several food orders with one shared warehouse deduction.
+    """
+    queryset = FoodOrder.objects.all()
+    serializer_class = FoodOrderBulkCreateSerializer
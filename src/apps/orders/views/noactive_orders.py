@@ -5,8 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.guests.models import Guest
 from apps.orders.filters import HotelFilterForGuests
-from apps.orders.models import HotelOrder
-from apps.rooms.models import Room, RoomType
+from apps.orders.models import FoodOrder, HotelOrder
 from apps.base.views import CustomListAPIView
 from apps.orders.serializers.noactive_hotel_guest_food import NoActiveHotelOrderSerializer
 
@@ -37,13 +36,11 @@ class NoActiveHotelOrderListAPIView(CustomListAPIView):
     filterset_class = HotelFilterForGuests
 
     def get_queryset(self):
-        return HotelOrder.objects.completed_orders().select_related("hotel").prefetch_related("guests",
-                                                                                           "guests__room",
-                                                                                           "guests__room__room_type",
-                                                                                           "food_order",
-                                                                                           Prefetch("hotel__guests", queryset=Guest.objects.all()),
-                                                                                           Prefetch("hotel__guests__room", queryset=Room.objects.all()),
-                                                                                           Prefetch("hotel__guests__room__room_type", queryset=RoomType.objects.all()))
+        # === Only the order's own guests, not every guest the hotel has ever had ===
+        return HotelOrder.objects.completed_orders().select_related("hotel", "guest_group").prefetch_related(
+            Prefetch("guests", queryset=Guest.objects.select_related("room")),
+            Prefetch("food_order", queryset=FoodOrder.objects.select_related("counter_agent", "food", "menu", "recipe")),
+        )
 
     def list(self, request, *args, **kwargs):
         queryset= self.filter_queryset(self.get_queryset())
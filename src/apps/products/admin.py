@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from apps.products.models import Product
+from apps.products.models import Product, ProductDependency
 
 
 admin.site.register(Product)
+admin.site.register(ProductDependency)
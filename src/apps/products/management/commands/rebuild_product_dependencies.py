@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.utils.dependency_graph import rebuild_dependency_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product -> recipe food -> food -> menu -> recipe dependency index."
+
+    def handle(self, *args, **kwargs):
+        created = rebuild_dependency_index()
+        self.stdout.write(self.style.SUCCESS(f"Dependency index rebuilt: {created} rows"))
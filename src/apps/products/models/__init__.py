@@ -1 +1,2 @@
-from .product import *
\ No newline at end of file
+from .product import *
+from .product_dependency import *
@@ -0,0 +1,51 @@
+from django.db import models
+
+from apps.base.models import AbstractBaseModel
+
+
+class ProductDependency(AbstractBaseModel):
+    """
+    Materialized reachability index of the catalog graph.
+
+    One row says that a change of the product's stock affects the given
+    recipe food, food, menu or recipe. The rows are maintained by the
+    signals in ``apps.products.signals.dependency``.
+    """
+
+    class NodeType(models.TextChoices):
+        """
+        Enum for the catalog node types that depend on a product.
+        """
+        RECIPE_FOOD = "recipe_food", "Recipe food"
+        FOOD = "food", "Food"
+        MENU = "menu", "Menu"
+        RECIPE = "recipe", "Recipe"
+
+    # === The product whose stock changes affect the node. ===
+    product = models.ForeignKey(
+        "products.Product", on_delete=models.CASCADE, related_name="dependencies"
+    )
+    # === The type of the dependent catalog node. ===
+    node_type = models.CharField(max_length=16, choices=NodeType.choices)
+    # === The primary key of the dependent catalog node. ===
+    node_id = models.UUIDField()
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "product_dependency"
+        # === The human-readable singular name of the model. ===
+        verbose_name = "Product dependency"
+        # === The human-readable plural name of the model. ===
+        verbose_name_plural = "Product dependencies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "node_type", "node_id"],
+                name="unique_product_dependency",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["node_type", "node_id"], name="product_dep_node_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.node_type}:{self.node_id}"
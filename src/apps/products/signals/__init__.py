@@ -0,0 +1,2 @@
+from .dependency import *
+from .product import *
@@ -0,0 +1,101 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.foods.models import Food, RecipeFood
+from apps.menus.models import Menu, Recipe
+from apps.products.models import ProductDependency
+from apps.products.utils.dependency_graph import refresh_dependencies, remove_dependencies
+
+
+def refresh_on_m2m_change(instance, action, reverse, pk_set, node_type, reverse_accessor):
+    """
+    Rebuild the dependency index after an m2m relation of the catalog has changed.
+
+    The owner of the relation (food or menu) is always the affected node. On the
+    reverse side (e.g. ``recipe_food.foods.clear()``) the owners are captured
+    before clearing, because ``pk_set`` is empty for clear actions.
+    """
+    if reverse and action == "pre_clear":
+        instance._dependency_clear_ids = list(
+            getattr(instance, reverse_accessor).values_list("id", flat=True)
+        )
+        return
+
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+
+    if not reverse:
+        refresh_dependencies(node_type, [instance.pk])
+    elif action == "post_clear":
+        refresh_dependencies(node_type, getattr(instance, "_dependency_clear_ids", []))
+    else:
+        refresh_dependencies(node_type, pk_set or [])
+
+
+@receiver(m2m_changed, sender=Food.recipes.through)
+def food_recipes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    refresh_on_m2m_change(
+        instance,
+        action,
+        reverse,
+        pk_set,
+        node_type=ProductDependency.NodeType.FOOD,
+        reverse_accessor="foods",
+    )
+
+
+@receiver(m2m_changed, sender=Menu.foods.through)
+def menu_foods_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    refresh_on_m2m_change(
+        instance,
+        action,
+        reverse,
+        pk_set,
+        node_type=ProductDependency.NodeType.MENU,
+        reverse_accessor="menus",
+    )
+
+
+@receiver(post_save, sender=RecipeFood)
+def recipe_food_saved(sender, instance, **kwargs):
+    refresh_dependencies(ProductDependency.NodeType.RECIPE_FOOD, [instance.pk])
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    refresh_dependencies(ProductDependency.NodeType.RECIPE, [instance.pk])
+
+
+# === Deleting a node removes its m2m rows without m2m_changed; the parents are refreshed here ===
+PARENT_ACCESSORS = {
+    RecipeFood: ("foods", ProductDependency.NodeType.FOOD),
+    Food: ("menus", ProductDependency.NodeType.MENU),
+}
+
+
+@receiver(pre_delete, sender=RecipeFood)
+@receiver(pre_delete, sender=Food)
+def catalog_node_deleting(sender, instance, **kwargs):
+    accessor, _ = PARENT_ACCESSORS[sender]
+    instance._dependency_parent_ids = list(getattr(instance, accessor).values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=RecipeFood)
+@receiver(post_delete, sender=Food)
+@receiver(post_delete, sender=Menu)
+@receiver(post_delete, sender=Recipe)
+def catalog_node_deleted(sender, instance, **kwargs):
+    """
+    Remove the index rows of the deleted node and rebuild those of its parents.
+    Menus need no parent refresh: recipes protect the menus they use.
+    """
+    node_types = {
+        RecipeFood: ProductDependency.NodeType.RECIPE_FOOD,
+        Food: ProductDependency.NodeType.FOOD,
+        Menu: ProductDependency.NodeType.MENU,
+        Recipe: ProductDependency.NodeType.RECIPE,
+    }
+    remove_dependencies(node_types[sender], [instance.pk])
+
+    if sender in PARENT_ACCESSORS:
+        refresh_dependencies(PARENT_ACCESSORS[sender][1], getattr(instance, "_dependency_parent_ids", []))
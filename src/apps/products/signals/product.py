@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.products.models import Product
+from apps.warehouses.utils.product_stock import refresh_product_stock
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """
+    The stock ledger depends on difference_measures and cached missing products
+    show the product's name and measure, so both are refreshed on every change.
+    """
+    if created:
+        return
+    refresh_product_stock([instance.pk])
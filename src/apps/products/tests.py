@@ -1,3 +1,225 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.foods.models import Food, FoodSection, RecipeFood
+from apps.menus.models import Menu, Recipe
+from apps.products.models import Product, ProductDependency
+from apps.products.utils.dependency_graph import rebuild_dependency_index
+from apps.sections.models import Measure, Section
+from apps.base.exceptions import CustomExceptionError
+from apps.warehouses.models import ProductStock, ProductsUsed, Warehouse
+from apps.warehouses.utils.deduct_products import deduct_products
+from apps.warehouses.utils.product_stock import get_available_quantities, rebuild_product_stock
+
+
+class ProductStockTests(TestCase):
+    """
+    The stock ledger must follow the warehouse batches of every product.
+    """
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        self.product = Product.objects.create(
+            name="Potato",
+            measure=measure,
+            measure_warehouse=measure,
+            section=section,
+            difference_measures=Decimal("1000"),
+        )
+
+    def test_receipt_updates_ledger(self):
+        first = Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("30"), arrived_count=Decimal("3")
+        )
+        Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("50"), arrived_count=Decimal("2")
+        )
+
+        stock = ProductStock.objects.get(product=self.product)
+        self.assertEqual(stock.available, Decimal("5000"))
+        self.assertEqual(stock.oldest_batch_id, first.id)
+        self.assertEqual(stock.unit_price, first.get_net_price())
+
+    def test_used_batch_moves_fifo_head(self):
+        first = Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("30"), arrived_count=Decimal("3")
+        )
+        second = Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("50"), arrived_count=Decimal("2")
+        )
+
+        first.count = Decimal("0")
+        first.save()
+
+        stock = ProductStock.objects.get(product=self.product)
+        self.assertEqual(stock.available, Decimal("2000"))
+        self.assertEqual(stock.oldest_batch_id, second.id)
+        self.assertEqual(get_available_quantities([self.product.id]), {self.product.id: Decimal("2000")})
+
+    def test_rebuild_and_missing_rows(self):
+        self.assertEqual(get_available_quantities([self.product.id]), {self.product.id: Decimal("0")})
+
+        Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("30"), arrived_count=Decimal("3")
+        )
+        ProductStock.objects.all().delete()
+        rebuild_product_stock()
+
+        self.assertEqual(ProductStock.objects.get(product=self.product).available, Decimal("3000"))
+
+
+class ProductDeductionTests(TestCase):
+    """
+    Orders consume the oldest batches first and record what was actually taken.
+    """
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        self.product = Product.objects.create(
+            name="Onion",
+            measure=measure,
+            measure_warehouse=measure,
+            section=section,
+            difference_measures=Decimal("10"),
+        )
+        self.first = Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("30"), arrived_count=Decimal("3")
+        )
+        self.second = Warehouse.objects.create(
+            product=self.product, gross_price=Decimal("60"), arrived_count=Decimal("3")
+        )
+
+    def test_batch_of_orders_is_consumed_fifo(self):
+        deduct_products({"order-1": {self.product.id: Decimal("25")}, "order-2": {self.product.id: Decimal("10")}})
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.count, self.first.status), (Decimal("0"), False))
+        self.assertEqual(self.second.count, Decimal("2.50"))
+
+        used = {
+            (used.order_id, used.warehouse_id): Decimal(used.count)
+            for used in ProductsUsed.objects.all()
+        }
+        self.assertEqual(
+            used,
+            {
+                ("order-1", self.first.id): Decimal("25"),
+                ("order-2", self.first.id): Decimal("5"),
+                ("order-2", self.second.id): Decimal("5"),
+            },
+        )
+        self.assertEqual(ProductStock.objects.get(product=self.product).available, Decimal("25"))
+
+    def test_shortage_deducts_nothing(self):
+        with self.assertRaises(CustomExceptionError):
+            deduct_products({"order-1": {self.product.id: Decimal("61")}})
+
+        self.assertFalse(ProductsUsed.objects.exists())
+        self.assertEqual(ProductStock.objects.get(product=self.product).available, Decimal("60"))
+
+
+class ProductDependencyIndexTests(TestCase):
+    """
+    The dependency index follows every structural change of the catalog and
+    always equals a full rebuild.
+    """
+
+    def setUp(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        food_section = FoodSection.objects.create(name="Soups")
+
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}", measure=measure, measure_warehouse=measure, section=section,
+                difference_measures=Decimal("1"),
+            )
+            for i in range(4)
+        ]
+        self.recipe_foods = [
+            RecipeFood.objects.create(product=product, count=Decimal("1")) for product in self.products
+        ]
+        self.foods = [
+            Food.objects.create(name=f"Food {i}", section=food_section, profit=Decimal("5")) for i in range(2)
+        ]
+        self.foods[0].recipes.set(self.recipe_foods[:2])
+        self.foods[1].recipes.set(self.recipe_foods[2:])
+
+        self.menus = [
+            Menu.objects.create(name=f"Menu {i}", profit=Decimal("4"), menu_type="lunch") for i in range(3)
+        ]
+        self.menus[0].foods.set([self.foods[0]])
+        self.menus[1].foods.set([self.foods[1]])
+
+        self.recipe = Recipe.objects.create(
+            name="Recipe", profit=Decimal("3"),
+            menu_breakfast=self.menus[0], menu_lunch=self.menus[0], menu_dinner=self.menus[0],
+        )
+
+    def products_of(self, node_type, node):
+        return set(
+            ProductDependency.objects.filter(node_type=node_type, node_id=node.pk).values_list("product_id", flat=True)
+        )
+
+    def ids(self, *indexes):
+        return {self.products[i].id for i in indexes}
+
+    def assertMatchesRebuild(self):
+        rows = lambda: set(ProductDependency.objects.values_list("product_id", "node_type", "node_id"))
+        current = rows()
+        rebuild_dependency_index()
+        self.assertEqual(current, rows())
+
+    def test_food_recipes_changes(self):
+        NodeType = ProductDependency.NodeType
+        self.foods[0].recipes.add(self.recipe_foods[2])
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[0]), self.ids(0, 1, 2))
+        self.assertEqual(self.products_of(NodeType.RECIPE, self.recipe), self.ids(0, 1, 2))
+
+        self.foods[0].recipes.remove(self.recipe_foods[0])
+        self.assertEqual(self.products_of(NodeType.FOOD, self.foods[0]), self.ids(1, 2))
+
+        # === Reverse side: the owners are captured before clearing ===
+        self.recipe_foods[1].foods.clear()
+        self.assertEqual(self.products_of(NodeType.FOOD, self.foods[0]), self.ids(2))
+
+        self.foods[0].recipes.clear()
+        self.assertEqual(self.products_of(NodeType.RECIPE, self.recipe), set())
+        self.assertMatchesRebuild()
+
+    def test_menu_foods_changes(self):
+        NodeType = ProductDependency.NodeType
+        self.menus[0].foods.add(self.foods[1])
+        self.assertEqual(self.products_of(NodeType.RECIPE, self.recipe), self.ids(0, 1, 2, 3))
+
+        self.menus[0].foods.remove(self.foods[0])
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[0]), self.ids(2, 3))
+
+        self.foods[1].menus.clear()
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[0]), set())
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[1]), set())
+        self.assertMatchesRebuild()
+
+    def test_recipe_menu_swap(self):
+        self.recipe.menu_dinner = self.menus[1]
+        self.recipe.save()
+
+        self.assertEqual(self.products_of(ProductDependency.NodeType.RECIPE, self.recipe), self.ids(0, 1, 2, 3))
+        self.assertMatchesRebuild()
+
+    def test_deleted_nodes_leave_no_rows(self):
+        NodeType = ProductDependency.NodeType
+        # === Bypasses Food.delete, which refuses foods used by menus ===
+        Food.objects.filter(pk=self.foods[0].pk).delete()
+        self.assertEqual(self.products_of(NodeType.FOOD, self.foods[0]), set())
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[0]), set())
+        self.assertEqual(self.products_of(NodeType.RECIPE, self.recipe), set())
+
+        self.menus[2].foods.set([self.foods[1]])
+        self.menus[2].delete()
+        self.assertEqual(self.products_of(NodeType.MENU, self.menus[2]), set())
+        self.assertMatchesRebuild()
@@ -0,0 +1 @@
+from .dependency_graph import *
@@ -0,0 +1,256 @@
+"""
+Product Dependency Graph Utility Module
+
+This module maintains and reads the ``ProductDependency`` index, which stores
+for every product the recipe foods, foods, menus and recipes that depend on it.
+
+Instead of rediscovering the RecipeFood -> Food -> Menu -> Recipe chain with
+several ``distinct()`` JOIN queries on every warehouse change, callers read all
+affected nodes with a single indexed lookup:
+
+Example:
+    dependents = get_dependent_ids([product.id])
+    # Returns: {"recipe_food": {...}, "food": {...}, "menu": {...}, "recipe": {...}}
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+
+
+def get_dependency_model():
+    return apps.get_model("products", "ProductDependency")
+
+
+def get_dependent_ids(product_ids):
+    """
+    Return the IDs of all catalog nodes that depend on the given products.
+
+    Args:
+        product_ids: Iterable of Product IDs
+
+    Returns:
+        dict: Dictionary mapping node types to sets of node IDs
+              Example: {"recipe_food": {id1}, "food": {id2}, "menu": set(), "recipe": set()}
+    """
+    ProductDependency = get_dependency_model()
+    result = {node_type: set() for node_type in ProductDependency.NodeType.values}
+
+    if not product_ids:
+        return result
+
+    rows = ProductDependency.objects.filter(product_id__in=product_ids).values_list(
+        "node_type", "node_id"
+    )
+    for node_type, node_id in rows:
+        result[node_type].add(node_id)
+
+    return result
+
+
+def get_ancestor_ids(node_type, node_ids):
+    """
+    Expand the given nodes with every node above them in the catalog graph.
+
+    Args:
+        node_type: One of ProductDependency.NodeType values
+        node_ids: Iterable of node IDs of that type
+
+    Returns:
+        dict: Dictionary mapping node types to sets of node IDs (including the given nodes)
+    """
+    ProductDependency = get_dependency_model()
+    Food = apps.get_model("foods", "Food")
+    Menu = apps.get_model("menus", "Menu")
+    Recipe = apps.get_model("menus", "Recipe")
+    NodeType = ProductDependency.NodeType
+
+    levels = [NodeType.RECIPE_FOOD, NodeType.FOOD, NodeType.MENU, NodeType.RECIPE]
+    result = {level: set() for level in levels}
+    result[node_type] = set(node_ids)
+
+    if node_type == NodeType.RECIPE_FOOD and result[NodeType.RECIPE_FOOD]:
+        result[NodeType.FOOD] |= set(
+            Food.recipes.through.objects.filter(
+                recipefood_id__in=result[NodeType.RECIPE_FOOD]
+            ).values_list("food_id", flat=True)
+        )
+
+    if node_type in (NodeType.RECIPE_FOOD, NodeType.FOOD) and result[NodeType.FOOD]:
+        result[NodeType.MENU] |= set(
+            Menu.foods.through.objects.filter(
+                food_id__in=result[NodeType.FOOD]
+            ).values_list("menu_id", flat=True)
+        )
+
+    if node_type != NodeType.RECIPE and result[NodeType.MENU]:
+        menu_ids = result[NodeType.MENU]
+        result[NodeType.RECIPE] |= set(
+            Recipe.objects.filter(
+                Q(menu_breakfast_id__in=menu_ids)
+                | Q(menu_lunch_id__in=menu_ids)
+                | Q(menu_dinner_id__in=menu_ids)
+            ).values_list("id", flat=True)
+        )
+
+    return result
+
+
+def collect_node_products(nodes):
+    """
+    Collect the products each node depends on, bottom-up.
+
+    Args:
+        nodes: Dictionary mapping node types to sets of node IDs
+
+    Returns:
+        dict: Dictionary mapping (node_type, node_id) to a set of product IDs
+    """
+    ProductDependency = get_dependency_model()
+    RecipeFood = apps.get_model("foods", "RecipeFood")
+    Food = apps.get_model("foods", "Food")
+    Menu = apps.get_model("menus", "Menu")
+    Recipe = apps.get_model("menus", "Recipe")
+    NodeType = ProductDependency.NodeType
+
+    node_products = defaultdict(set)
+
+    if nodes[NodeType.RECIPE_FOOD]:
+        rows = RecipeFood.objects.filter(id__in=nodes[NodeType.RECIPE_FOOD]).values_list(
+            "id", "product_id"
+        )
+        for recipe_food_id, product_id in rows:
+            node_products[(NodeType.RECIPE_FOOD, recipe_food_id)].add(product_id)
+
+    if nodes[NodeType.FOOD]:
+        rows = Food.recipes.through.objects.filter(
+            food_id__in=nodes[NodeType.FOOD]
+        ).values_list("food_id", "recipefood__product_id")
+        for food_id, product_id in rows:
+            node_products[(NodeType.FOOD, food_id)].add(product_id)
+
+    # === Recipes depend on menus that may not be in the given node set ===
+    recipe_menus = {}
+    if nodes[NodeType.RECIPE]:
+        rows = Recipe.objects.filter(id__in=nodes[NodeType.RECIPE]).values_list(
+            "id", "menu_breakfast_id", "menu_lunch_id", "menu_dinner_id"
+        )
+        for recipe_id, *menu_ids in rows:
+            recipe_menus[recipe_id] = [menu_id for menu_id in menu_ids if menu_id]
+
+    menu_ids = set(nodes[NodeType.MENU])
+    for ids in recipe_menus.values():
+        menu_ids.update(ids)
+
+    menu_products = defaultdict(set)
+    if menu_ids:
+        rows = Menu.foods.through.objects.filter(menu_id__in=menu_ids).values_list(
+            "menu_id", "food__recipes__product_id"
+        )
+        for menu_id, product_id in rows:
+            if product_id:
+                menu_products[menu_id].add(product_id)
+
+    for menu_id in nodes[NodeType.MENU]:
+        node_products[(NodeType.MENU, menu_id)] = menu_products[menu_id]
+
+    for recipe_id, ids in recipe_menus.items():
+        for menu_id in ids:
+            node_products[(NodeType.RECIPE, recipe_id)] |= menu_products[menu_id]
+
+    return node_products
+
+
+def refresh_dependencies(node_type, node_ids):
+    """
+    Rebuild the index rows of the given nodes and of every node above them.
+
+    Call this after the structure of the catalog graph has changed, e.g. when the
+    recipes of a food, the foods of a menu or the menus of a recipe were edited.
+
+    Args:
+        node_type: One of ProductDependency.NodeType values
+        node_ids: Iterable of node IDs of that type
+    """
+    # === Imported here: apps.warehouses.utils imports this module ===
+    from apps.warehouses.utils.product_stock import bump_stock_versions_on_commit
+
+    ProductDependency = get_dependency_model()
+
+    node_ids = [node_id for node_id in node_ids if node_id]
+    if not node_ids:
+        return
+
+    nodes = get_ancestor_ids(node_type, node_ids)
+    node_products = collect_node_products(nodes)
+
+    with transaction.atomic():
+        lookup = Q()
+        for level, ids in nodes.items():
+            if ids:
+                lookup |= Q(node_type=level, node_id__in=ids)
+        old_rows = ProductDependency.objects.filter(lookup)
+        changed_product_ids = set(old_rows.values_list("product_id", flat=True))
+        old_rows.delete()
+
+        ProductDependency.objects.bulk_create(
+            [
+                ProductDependency(product_id=product_id, node_type=level, node_id=node_id)
+                for (level, node_id), product_ids in node_products.items()
+                for product_id in product_ids
+            ]
+        )
+
+        # === Results cached per product stock version are stale for old and new ingredients ===
+        for product_ids in node_products.values():
+            changed_product_ids |= product_ids
+        bump_stock_versions_on_commit(changed_product_ids)
+
+
+def remove_dependencies(node_type, node_ids):
+    """
+    Remove the index rows of deleted nodes.
+
+    Args:
+        node_type: One of ProductDependency.NodeType values
+        node_ids: Iterable of node IDs of that type
+    """
+    ProductDependency = get_dependency_model()
+    ProductDependency.objects.filter(node_type=node_type, node_id__in=node_ids).delete()
+
+
+def rebuild_dependency_index():
+    """
+    Rebuild the whole index from the current catalog.
+
+    Returns:
+        int: Number of index rows created
+    """
+    ProductDependency = get_dependency_model()
+    RecipeFood = apps.get_model("foods", "RecipeFood")
+    Food = apps.get_model("foods", "Food")
+    Menu = apps.get_model("menus", "Menu")
+    Recipe = apps.get_model("menus", "Recipe")
+    NodeType = ProductDependency.NodeType
+
+    nodes = {
+        NodeType.RECIPE_FOOD: set(RecipeFood.objects.values_list("id", flat=True)),
+        NodeType.FOOD: set(Food.objects.values_list("id", flat=True)),
+        NodeType.MENU: set(Menu.objects.values_list("id", flat=True)),
+        NodeType.RECIPE: set(Recipe.objects.values_list("id", flat=True)),
+    }
+    node_products = collect_node_products(nodes)
+
+    with transaction.atomic():
+        ProductDependency.objects.all().delete()
+        created = ProductDependency.objects.bulk_create(
+            [
+                ProductDependency(product_id=product_id, node_type=level, node_id=node_id)
+                for (level, node_id), product_ids in node_products.items()
+                for product_id in product_ids
+            ]
+        )
+
+    return len(created)
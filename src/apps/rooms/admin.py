@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from apps.rooms.models.rooms import Room
 from apps.rooms.models.room_type import RoomType
+from apps.rooms.models.occupancy_event import OccupancyEvent
 
 
 @admin.register(RoomType)
@@ -27,3 +28,15 @@ class RoomAdmin(admin.ModelAdmin):
     )
     list_display_links = list_display
     list_filter = ("hotel", "room_type")
+
+
+@admin.register(OccupancyEvent)
+class OccupancyEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "room",
+        "at",
+        "delta",
+        "applied",
+    )
+    list_filter = ("applied",)
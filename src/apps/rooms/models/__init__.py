@@ -1,2 +1,3 @@
 from .rooms import *
-from .room_type import *
\ No newline at end of file
+from .room_type import *
+from .occupancy_event import *
\ No newline at end of file
@@ -0,0 +1,45 @@
+from django.db import models
+
+from apps.base.models import AbstractBaseModel
+
+
+class OccupancyEvent(AbstractBaseModel):
+    """
+    A scheduled change of a room's head-count (a check-in or a check-out).
+
+    Guests and group hotel orders are turned into events by
+    ``apps.rooms.utils.occupancy_events``. The scheduler applies every event
+    whose time has passed to ``Room.current_guests``; applied events are kept
+    until the next consistency check so a changed source can be reversed.
+    """
+
+    # === The room whose head-count changes. ===
+    room = models.ForeignKey(
+        "rooms.Room",
+        on_delete=models.CASCADE,
+        related_name="occupancy_events",
+    )
+    # === The guest or group hotel order that produced the event. ===
+    source_id = models.UUIDField(db_index=True)
+    # === The time the change takes effect. ===
+    at = models.DateTimeField()
+    # === Number of guests added (positive) or removed (negative). ===
+    delta = models.IntegerField()
+    # === Whether the change has been applied to the room. ===
+    applied = models.BooleanField(default=False)
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "room_occupancy_event"
+        # === The singular name for the occupancy event. ===
+        verbose_name = "Occupancy event"
+        # === The plural name for the occupancy events. ===
+        verbose_name_plural = "Occupancy events"
+        # === Ordering field for sorting a set of queries ===
+        ordering = ["at"]
+        indexes = [
+            models.Index(fields=["applied", "at"], name="occupancy_event_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} {self.delta:+d} @ {self.at}"
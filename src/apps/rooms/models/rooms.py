@@ -62,6 +62,11 @@ class Room(AbstractBaseModel):
 
     remaining_capacity = models.PositiveSmallIntegerField(default=0)
 
+    current_guests = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of guests currently in the rooms of this type, maintained by occupancy events."
+    )
+
     # =============   end room_type   =================
 
     available_count = models.PositiveSmallIntegerField(default=0)
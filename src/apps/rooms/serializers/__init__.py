@@ -1,3 +1,4 @@
 from .room import *
 from .room_type import *
-from .room_hotel_serializers import *
\ No newline at end of file
+from .room_hotel_serializers import *
+from .availability import *
\ No newline at end of file
@@ -0,0 +1,50 @@
+from rest_framework import serializers
+
+from apps.base.exceptions import CustomExceptionError
+from apps.base.serializers import CustomModelSerializer
+from apps.rooms.models import Room
+
+
+class RoomAvailabilityQuerySerializer(serializers.Serializer):
+    check_in = serializers.DateTimeField(input_formats=["%d.%m.%Y %H:%M"])
+    check_out = serializers.DateTimeField(input_formats=["%d.%m.%Y %H:%M"])
+    hotel = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        if attrs["check_out"] <= attrs["check_in"]:
+            raise CustomExceptionError(code=400, detail="Check-out check-in dan keyin bo‘lishi kerak.")
+        return attrs
+
+
+class RoomAvailabilitySerializer(CustomModelSerializer):
+    room_name = serializers.CharField(source="room_type.name")
+    hotel_name = serializers.CharField(source="hotel.name")
+    total_capacity = serializers.SerializerMethodField()
+    booked = serializers.SerializerMethodField()
+    free_capacity = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Room
+        fields = [
+            "id",
+            "hotel",
+            "hotel_name",
+            "room_type",
+            "room_name",
+            "floor",
+            "room_number",
+            "capacity",
+            "count",
+            "total_capacity",
+            "booked",
+            "free_capacity",
+        ]
+
+    def get_total_capacity(self, obj):
+        return self.context["availability"][obj.id]["capacity"]
+
+    def get_booked(self, obj):
+        return self.context["availability"][obj.id]["booked"]
+
+    def get_free_capacity(self, obj):
+        return self.context["availability"][obj.id]["free"]
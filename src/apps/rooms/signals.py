@@ -1,29 +1,25 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from apps.guests.models import GuestGroup, Guest
+from apps.guests.models import GuestGroup
 from apps.orders.models import HotelOrder
-from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.occupancy_events import get_order_schedule, sync_occupancy_sources, sync_order_occupancy
 
 
 @receiver(post_save, sender=HotelOrder)
 def update_occupancy_on_order_save(sender, instance, **kwargs):
+    # Individual guests are synced by their own signal
     if instance.guest_type == HotelOrder.GuestType.GROUP:
-        for room in instance.rooms.all():
-            update_room_occupancy(room)
-    elif instance.guest_type == HotelOrder.GuestType.INDIVIDUAL and instance.room:
-        update_room_occupancy(instance.room)
+        sync_order_occupancy(instance)
 
 
-@receiver(post_save, sender=Guest)
-def update_occupancy_on_guest_save(sender, instance, **kwargs):
-    if instance.room:
-        update_room_occupancy(instance.room)
+@receiver(post_delete, sender=HotelOrder)
+def update_occupancy_on_order_delete(sender, instance, **kwargs):
+    if instance.guest_type == HotelOrder.GuestType.GROUP:
+        sync_order_occupancy(instance, deleted=True)
 
 
 @receiver(post_save, sender=GuestGroup)
 def update_occupancy_on_guestgroup_save(sender, instance, **kwargs):
-    orders = instance.orders.filter(guest_type=HotelOrder.GuestType.GROUP)
-    for order in orders:
-        for room in order.rooms.all():
-            update_room_occupancy(room)
+    orders = HotelOrder.objects.filter(guest_group=instance, guest_type=HotelOrder.GuestType.GROUP)
+    sync_occupancy_sources({order.id: get_order_schedule(order) for order in orders})
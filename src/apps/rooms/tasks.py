@@ -2,61 +2,30 @@
 Celery tasks for room management
 """
 from celery import shared_task
-from django.utils import timezone
 from apps.rooms.models import Room
-from apps.guests.models import Guest
-from apps.orders.models import HotelOrder
 from apps.orders.utils.refresh_rooms import update_room_occupancy
+from apps.rooms.utils.occupancy_events import apply_due_occupancy_events, rebuild_occupancy_events
 
 
 @shared_task
 def refresh_all_room_occupancy():
     """
-    Barcha xonalarning occupancy holatini yangilaydi.
-    Bu task har daqiqada ishga tushadi va check_out vaqti o'tgan mehmonlarni
-    xonalardan chiqaradi.
+    Davriy consistency check: occupancy event navbatini qayta quradi va barcha
+    xonalarni bitta set-based hisob bilan yangilaydi. Statuslar
+    apps.orders.tasks.transition_hotel_order_statuses_task da yangilanadi.
     """
-    now = timezone.now()
-    print(f"🔄 TASK: Barcha xonalarni yangilash boshlandi - {now}")
-    
-    # 1. Check_out vaqti o'tgan mehmonlarning statusini COMPLETED ga o'zgartirish
-    expired_guests = Guest.objects.filter(
-        status=Guest.Status.NEW,
-        check_out__lte=now  # Check-out vaqti o'tgan
-    )
-    
-    expired_count = expired_guests.count()
-    if expired_count > 0:
-        print(f"🔄 TASK: {expired_count} ta mehmonning check_out vaqti o'tdi")
-        expired_guests.update(status=Guest.Status.COMPLETED)
-        print(f"✅ TASK: {expired_count} ta mehmon COMPLETED statusiga o'tkazildi")
-    
-    # 2. Check_out vaqti o'tgan orderlarning statusini COMPLETED ga o'zgartirish
-    expired_orders = HotelOrder.objects.filter(
-        order_status=HotelOrder.OrderStatus.ACTIVE,
-        check_out__lte=now  # Check-out vaqti o'tgan
-    )
-    
-    expired_orders_count = expired_orders.count()
-    if expired_orders_count > 0:
-        print(f"🔄 TASK: {expired_orders_count} ta orderning check_out vaqti o'tdi")
-        expired_orders.update(order_status=HotelOrder.OrderStatus.COMPLETED)
-        print(f"✅ TASK: {expired_orders_count} ta order COMPLETED statusiga o'tkazildi")
-    
-    # 2. Barcha xonalarni yangilash
-    rooms = Room.objects.all()
-    updated_count = 0
-    
-    for room in rooms:
-        try:
-            # Har bir xonaning occupancy holatini yangilash
-            update_room_occupancy(room, save=True)
-            updated_count += 1
-        except Exception as e:
-            print(f"❌ ERROR: Room {room.room_number} yangilanmadi: {str(e)}")
-    
-    print(f"✅ TASK: {updated_count} ta xona yangilandi")
-    return f"Updated {expired_count} guests, {expired_orders_count} orders and {updated_count} rooms"
+    events_count = rebuild_occupancy_events()
+
+    return f"Rebuilt {events_count} occupancy events"
+
+
+@shared_task
+def apply_occupancy_events():
+    """
+    Vaqti kelgan check-in/check-out eventlarini xonalarga qo'llaydi.
+    """
+    applied_count = apply_due_occupancy_events()
+    return f"Applied {applied_count} occupancy events"
 
 
 @shared_task
@@ -1,5 +1,17 @@
+from datetime import timedelta
+
 from django import apps
 from django.db.models import Count, Sum, Max
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.guests.models import Guest
+from apps.orders.tests import RoomStaysMixin
+from apps.rooms.models import OccupancyEvent
+from apps.rooms.utils.availability import get_rooms_availability
+from apps.rooms.utils.occupancy_events import apply_due_occupancy_events, rebuild_occupancy_events
 
 Room = apps.apps.get_model("rooms.Room")
 
@@ -51,3 +63,66 @@ def get_grouped_room_data(hotel=None):
         })
 
     return result
+
+
+class OccupancyEventQueueTests(RoomStaysMixin, TestCase):
+    """
+    Room occupancy follows the check-in and check-out events applied when due.
+    """
+
+    def test_rebuild_event_queue(self):
+        # === 2 current guests and the group in both rooms, each with a check-in and a check-out ===
+        self.assertEqual(rebuild_occupancy_events(), 8)
+        self.assertEqual(OccupancyEvent.objects.filter(applied=False).count(), 4)
+
+        self.small_room.refresh_from_db()
+        self.assertEqual((self.small_room.current_guests, self.small_room.occupied_count), (9, 3))
+
+    def test_guest_events_applied_when_due(self):
+        now = timezone.now()
+        guest = Guest.objects.create(
+            hotel=self.large_room.hotel, room=self.large_room, order_number="№9", gender=Guest.Gender.MALE,
+            full_name="Late guest", count=2, check_in=now + timedelta(hours=1), check_out=now + timedelta(days=1),
+        )
+        self.assertEqual(OccupancyEvent.objects.filter(source_id=guest.id, applied=False).count(), 2)
+
+        self.assertEqual(apply_due_occupancy_events(now + timedelta(hours=2)), 1)
+        self.large_room.refresh_from_db()
+        self.assertEqual((self.large_room.current_guests, self.large_room.remaining_capacity), (2, 2))
+
+        # === Removing an applied source emits a correction that is applied at once ===
+        guest.delete()
+        self.large_room.refresh_from_db()
+        self.assertEqual((self.large_room.current_guests, self.large_room.remaining_capacity), (0, 4))
+        self.assertFalse(OccupancyEvent.objects.filter(source_id=guest.id, applied=False).exists())
+
+
+class RoomAvailabilityTests(RoomStaysMixin, TestCase):
+    """
+    Free capacity of every room for a stay window, as the peak of the overlapping stays.
+    """
+
+    def test_availability_for_window(self):
+        now = timezone.now()
+
+        # === Guest 1 checks out exactly at the window start: stays are half-open ===
+        availability = get_rooms_availability(now + timedelta(days=2), now + timedelta(days=4))
+        self.assertEqual(availability[self.small_room.id], {"capacity": 6, "booked": 6, "free": 0})
+        self.assertEqual(availability[self.large_room.id], {"capacity": 4, "booked": 1, "free": 3})
+
+        # === Peak, not sum: guests 0 and 1 overlap the group, guest 2 has left ===
+        availability = get_rooms_availability(now, now + timedelta(days=5))
+        self.assertEqual(availability[self.small_room.id]["booked"], 9)
+
+        response = APIClient().get(
+            reverse("room_availability"),
+            {
+                "check_in": (now + timedelta(days=5)).strftime("%d.%m.%Y %H:%M"),
+                "check_out": (now + timedelta(days=6)).strftime("%d.%m.%Y %H:%M"),
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {item["room_number"]: item["free_capacity"] for item in response.data["results"]},
+            {"101": 6, "201": 4},
+        )
@@ -13,6 +13,7 @@ from apps.rooms.views.room_types import (RoomTypeListsAPIView,
                                          RoomTypeDeleteAPIView)
 from apps.rooms.views.rooms_group_delete import RoomGroupDeleteAPIView
 from apps.rooms.views.rooms_on_hotel import RoomsOfHotelAPIView
+from apps.rooms.views.availability import RoomAvailabilityAPIView
 
 
 urlpatterns = [
@@ -26,6 +27,7 @@ urlpatterns = [
     # ================== Rooms of Hotels ===========================
     path("", RoomListsAPIView.as_view(), name="room_list"),
     path("create/", RoomCreateAPIView.as_view(), name="room_create"),
+    path("availability/", RoomAvailabilityAPIView.as_view(), name="room_availability"),
     path("<str:pk>/", RoomRetrieveAPIView.as_view(), name="room_retrieve"),
     path("update/<str:pk>/", RoomUpdateAPIView.as_view(), name="room_update"),
     path("delete/<uuid:pk>/", RoomDeleteAPIView.as_view(), name="room_delete"),
@@ -0,0 +1,144 @@
+"""
+Room Availability Utility Module
+
+This module answers "how many guests can still stay in each room between
+check-in and check-out" for any window, including future ones.
+
+Every stay (a guest with a room, or a booked group hotel order spread across
+its rooms) is the half-open interval ``[check_in, check_out)``. On PostgreSQL
+stays are matched with the range overlap operator
+``tstzrange(check_in, check_out) && tstzrange(start, end)``, which is served by
+the GiST expression indexes declared with ``stay_gist_indexes``. Other databases
+fall back to the equivalent ``check_in < end AND check_out > start`` filter.
+
+The free capacity of a room is its total capacity minus the peak number of
+guests that stay in it at the same time during the window.
+
+Example:
+    get_rooms_availability(check_in, check_out, rooms=hotel.rooms.all())
+    # Returns: {room_id: {"capacity": 6, "booked": 2, "free": 4}, ...}
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import BooleanField, DateTimeField, F, Func, Value
+
+from apps.base.exceptions import CustomExceptionError
+from apps.orders.utils.refresh_rooms import get_group_distribution, load_group_orders
+from apps.rooms.utils.stay_range import StayRange
+
+
+class RangeOverlaps(Func):
+    """
+    ``lhs && rhs``: true when two ranges share at least one instant.
+    """
+    arg_joiner = " && "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+def filter_overlapping(queryset, check_in, check_out, prefix=""):
+    """
+    Keep the stays of ``queryset`` that overlap ``[check_in, check_out)``.
+
+    Args:
+        queryset: QuerySet of a model with ``check_in`` and ``check_out`` fields
+        check_in: Start of the window
+        check_out: End of the window
+        prefix: Lookup prefix of the stay fields, e.g. ``"hotelorder__"``
+    """
+    check_in_field, check_out_field = f"{prefix}check_in", f"{prefix}check_out"
+    # === Empty stays occupy nothing; also keeps the GiST index predicate usable ===
+    queryset = queryset.filter(**{f"{check_out_field}__gt": F(check_in_field)})
+
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.filter(**{f"{check_in_field}__lt": check_out, f"{check_out_field}__gt": check_in})
+
+    return queryset.filter(
+        RangeOverlaps(
+            StayRange(check_in_field, check_out_field),
+            StayRange(Value(check_in, output_field=DateTimeField()), Value(check_out, output_field=DateTimeField())),
+        )
+    )
+
+
+def get_peak_guests(stays, check_in, check_out):
+    """
+    Sweep the stays of one room and return the most guests present at once.
+
+    Args:
+        stays: List of (check_in, check_out, guests)
+    """
+    events = []
+    for start, end, guests in stays:
+        events.append((max(start, check_in), 1, guests))
+        events.append((min(end, check_out), 0, -guests))
+
+    # === Check-outs sort before check-ins at the same instant: stays are half-open ===
+    peak = current = 0
+    for _, _, delta in sorted(events, key=lambda event: (event[0], event[1])):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def get_rooms_availability(check_in, check_out, rooms=None, exclude_order=None):
+    """
+    Calculate the free capacity of rooms for a check-in/check-out window.
+
+    Args:
+        check_in: Start of the window
+        check_out: End of the window
+        rooms: QuerySet of rooms to check, all rooms by default
+        exclude_order: Hotel order whose own stays are ignored (when it is edited)
+
+    Returns:
+        dict: {room_id: {"capacity": int, "booked": int, "free": int}}
+    """
+    Room = apps.get_model("rooms", "Room")
+    Guest = apps.get_model("guests", "Guest")
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+
+    if check_out <= check_in:
+        raise CustomExceptionError(code=400, detail="Check-out check-in dan keyin bo‘lishi kerak.")
+
+    rooms = Room.objects.all() if rooms is None else rooms
+    capacities = {
+        room_id: (capacity or 0) * (count or 0)
+        for room_id, capacity, count in rooms.values_list("id", "capacity", "count")
+    }
+
+    stays = defaultdict(list)
+    guests = filter_overlapping(
+        Guest.objects.filter(status=Guest.Status.NEW, room_id__in=capacities), check_in, check_out
+    )
+    if exclude_order is not None:
+        guests = guests.exclude(hotel_orders=exclude_order)
+    for room_id, start, end, count in guests.values_list("room_id", "check_in", "check_out", "count"):
+        stays[room_id].append((start, end, count))
+
+    order_rooms = filter_overlapping(
+        HotelOrder.rooms.through.objects.filter(
+            hotelorder__guest_type=HotelOrder.GuestType.GROUP,
+            hotelorder__order_status__in=HotelOrder.BOOKED_STATUSES,
+            hotelorder__in=HotelOrder.rooms.through.objects.filter(room_id__in=capacities).values("hotelorder_id"),
+        ),
+        check_in,
+        check_out,
+        prefix="hotelorder__",
+    )
+    if exclude_order is not None:
+        order_rooms = order_rooms.exclude(hotelorder_id=exclude_order.pk)
+    for order in load_group_orders(order_rooms).values():
+        for room_id, guests_count in get_group_distribution(order).items():
+            if guests_count and room_id in capacities:
+                stays[room_id].append((order["check_in"], order["check_out"], guests_count))
+
+    availability = {}
+    for room_id, capacity in capacities.items():
+        booked = get_peak_guests(stays[room_id], check_in, check_out)
+        availability[room_id] = {"capacity": capacity, "booked": booked, "free": max(capacity - booked, 0)}
+    return availability
+
@@ -0,0 +1,227 @@
+"""
+Room Occupancy Events Utility Module
+
+This module maintains room occupancy incrementally from a time-ordered queue of
+check-in and check-out events (``OccupancyEvent``).
+
+Every guest with a room and every booked group hotel order is a *source*: it
+adds its guests to its rooms at check-in and removes them at check-out. When a
+source changes, ``sync_occupancy_sources`` replaces its pending events and
+emits a correction for the part that has already been applied. The scheduler
+(``apply_due_occupancy_events``) applies every event whose time has passed to
+``Room.current_guests`` and recomputes the occupancy fields of those rooms only.
+
+``rebuild_occupancy_events`` is the periodic consistency check: it regenerates
+the queue from the guests and orders and recomputes every room from scratch.
+
+Example:
+    sync_guest_occupancy(guest)
+    apply_due_occupancy_events()
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.orders.utils.refresh_rooms import (
+    OCCUPANCY_FIELDS,
+    apply_room_occupancy,
+    get_group_distribution,
+    load_group_orders,
+    refresh_rooms_occupancy,
+)
+
+
+def get_guest_schedule(guest):
+    """
+    Returns:
+        list: [(room_id, time, delta), ...] of an individual guest
+    """
+    Guest = apps.get_model("guests", "Guest")
+    if guest.pk is None or guest.status != Guest.Status.NEW or not guest.room_id:
+        return []
+    return [
+        (guest.room_id, guest.check_in, guest.count),
+        (guest.room_id, guest.check_out, -guest.count),
+    ]
+
+
+def get_order_schedule(order):
+    """
+    Returns:
+        list: [(room_id, time, delta), ...] of a group hotel order, its guests
+              distributed across its rooms
+    """
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+    if (
+        order.pk is None
+        or order.guest_type != HotelOrder.GuestType.GROUP
+        or order.order_status not in HotelOrder.BOOKED_STATUSES
+    ):
+        return []
+
+    loaded = load_group_orders(HotelOrder.rooms.through.objects.filter(hotelorder_id=order.pk))
+    if order.pk not in loaded:
+        return []
+    return get_order_schedule_from_loaded(loaded[order.pk])
+
+
+def get_order_schedule_from_loaded(order):
+    schedule = []
+    for room_id, guests in get_group_distribution(order).items():
+        if guests:
+            schedule.append((room_id, order["check_in"], guests))
+            schedule.append((room_id, order["check_out"], -guests))
+    return schedule
+
+
+def sync_occupancy_sources(schedules, now=None):
+    """
+    Replace the events of the given sources with their current schedules.
+
+    Pending events of the sources are dropped and future events re-created.
+    For the part of a schedule that is already due, one correction event is
+    emitted per room: the difference between what should be applied by now and
+    what has been applied. Due events are applied immediately.
+
+    Args:
+        schedules: Dictionary mapping source IDs (guest or order IDs) to
+                   schedules [(room_id, time, delta), ...]; an empty schedule
+                   removes the source
+        now: Reference time, defaults to the current time
+    """
+    OccupancyEvent = apps.get_model("rooms", "OccupancyEvent")
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        events = OccupancyEvent.objects.filter(source_id__in=schedules)
+        events.filter(applied=False).delete()
+
+        applied = defaultdict(lambda: defaultdict(int))
+        rows = (
+            events.filter(applied=True)
+            .order_by()
+            .values("source_id", "room_id")
+            .annotate(total=Sum("delta"))
+            .values_list("source_id", "room_id", "total")
+        )
+        for source_id, room_id, total in rows:
+            applied[source_id][room_id] = total
+
+        new_events = []
+        for source_id, schedule in schedules.items():
+            due = defaultdict(int)
+            for room_id, at, delta in schedule:
+                if at <= now:
+                    due[room_id] += delta
+                else:
+                    new_events.append(OccupancyEvent(room_id=room_id, source_id=source_id, at=at, delta=delta))
+
+            for room_id in set(due) | set(applied[source_id]):
+                correction = due[room_id] - applied[source_id][room_id]
+                if correction:
+                    new_events.append(
+                        OccupancyEvent(room_id=room_id, source_id=source_id, at=now, delta=correction)
+                    )
+
+        OccupancyEvent.objects.bulk_create(new_events)
+        apply_due_occupancy_events(now)
+
+
+def sync_guest_occupancy(guest, deleted=False):
+    """
+    Re-schedule the occupancy events of an individual guest.
+    """
+    sync_occupancy_sources({guest.id: [] if deleted else get_guest_schedule(guest)})
+
+
+def sync_order_occupancy(order, deleted=False):
+    """
+    Re-schedule the occupancy events of a group hotel order.
+    """
+    sync_occupancy_sources({order.id: [] if deleted else get_order_schedule(order)})
+
+
+def apply_due_occupancy_events(now=None):
+    """
+    Apply every pending event whose time has passed, oldest first.
+
+    Rooms and events are locked, the deltas are summed per room and only the
+    affected rooms are recomputed and written with one ``bulk_update``.
+
+    Returns:
+        int: Number of applied events
+    """
+    OccupancyEvent = apps.get_model("rooms", "OccupancyEvent")
+    Room = apps.get_model("rooms", "Room")
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        due_events = list(
+            OccupancyEvent.objects.select_for_update()
+            .filter(applied=False, at__lte=now)
+            .order_by("at")
+            .values_list("id", "room_id", "delta")
+        )
+        if not due_events:
+            return 0
+
+        deltas = defaultdict(int)
+        for _, room_id, delta in due_events:
+            deltas[room_id] += delta
+
+        rooms = list(Room.objects.select_for_update().filter(id__in=deltas))
+        for room in rooms:
+            room.current_guests = max(room.current_guests + deltas[room.id], 0)
+            if room.capacity:
+                apply_room_occupancy(room, room.current_guests, 0)
+        Room.objects.bulk_update(rooms, OCCUPANCY_FIELDS)
+
+        OccupancyEvent.objects.filter(id__in=[event_id for event_id, _, _ in due_events]).update(applied=True)
+    return len(due_events)
+
+
+def rebuild_occupancy_events(now=None):
+    """
+    Consistency check: regenerate the event queue and recompute every room.
+
+    Returns:
+        int: Number of events written
+    """
+    OccupancyEvent = apps.get_model("rooms", "OccupancyEvent")
+    Guest = apps.get_model("guests", "Guest")
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        schedules = {}
+        guests = Guest.objects.filter(
+            status=Guest.Status.NEW, room__isnull=False, check_out__gt=now
+        ).values_list("id", "room_id", "check_in", "check_out", "count")
+        for guest_id, room_id, check_in, check_out, count in guests:
+            schedules[guest_id] = [(room_id, check_in, count), (room_id, check_out, -count)]
+
+        orders = load_group_orders(
+            HotelOrder.rooms.through.objects.filter(
+                hotelorder__order_status__in=HotelOrder.BOOKED_STATUSES,
+                hotelorder__guest_type=HotelOrder.GuestType.GROUP,
+                hotelorder__check_out__gt=now,
+            )
+        )
+        for order_id, order in orders.items():
+            schedules[order_id] = get_order_schedule_from_loaded(order)
+
+        # === Already-started parts are recorded as applied, the rest stays pending ===
+        events = [
+            OccupancyEvent(room_id=room_id, source_id=source_id, at=at, delta=delta, applied=at <= now)
+            for source_id, schedule in schedules.items()
+            for room_id, at, delta in schedule
+        ]
+
+        OccupancyEvent.objects.all().delete()
+        OccupancyEvent.objects.bulk_create(events)
+        refresh_rooms_occupancy()
+    return len(events)
@@ -0,0 +1,46 @@
+"""
+Stay Range Utility Module
+
+Every stay (a guest or a hotel order) is the half-open interval
+``[check_in, check_out)``. On PostgreSQL it is expressed as
+``tstzrange(check_in, check_out)``, and a partial GiST expression index over that
+range serves the availability search.
+
+This module only depends on Django, so models can declare the index in their
+``Meta.indexes``.
+
+Example:
+    class Meta:
+        indexes = [...] + stay_gist_indexes("guest_stay_gist_idx")
+"""
+
+from django.conf import settings
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
+from django.db.models import F, Func, Q
+
+
+class StayRange(Func):
+    """
+    ``tstzrange(lower, upper)``: the half-open range ``[lower, upper)``.
+    """
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+def stay_gist_indexes(name):
+    """
+    Returns:
+        list: The GiST index over ``tstzrange(check_in, check_out)`` of non-empty
+              stays, or no index when the project runs on the SQLite fallback
+              (``POSTGRES`` off), which has neither ranges nor GiST
+    """
+    if not settings.POSTGRES:
+        return []
+    return [
+        GistIndex(
+            StayRange("check_in", "check_out"),
+            condition=Q(check_out__gt=F("check_in")),
+            name=name,
+        )
+    ]
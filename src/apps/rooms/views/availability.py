@@ -0,0 +1,31 @@
+from apps.base.views import CustomGenericAPIView, PageSerializerContextMixin
+from apps.rooms.models import Room
+from apps.rooms.serializers.availability import RoomAvailabilityQuerySerializer, RoomAvailabilitySerializer
+from apps.rooms.utils.availability import get_rooms_availability
+
+
+class RoomAvailabilityAPIView(PageSerializerContextMixin, CustomGenericAPIView):
+    """
+    Free capacity of every room for a check_in → check_out window.
+    Query params: check_in, check_out ("%d.%m.%Y %H:%M"), hotel (optional).
+    """
+    queryset = Room.objects.select_related("hotel", "room_type")
+    serializer_class = RoomAvailabilitySerializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.window.get("hotel"):
+            queryset = queryset.filter(hotel_id=self.window["hotel"])
+        return queryset
+
+    def get_page_serializer_context(self, objects):
+        rooms = Room.objects.filter(id__in=[room.id for room in objects])
+        return {
+            "availability": get_rooms_availability(self.window["check_in"], self.window["check_out"], rooms=rooms)
+        }
+
+    def get(self, request, *args, **kwargs):
+        query = RoomAvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        self.window = query.validated_data
+        return self.list(request, *args, **kwargs)
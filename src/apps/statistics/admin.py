@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from apps.products.models import Product
+from apps.statistics.models import MonthlyKitchenStats, MonthlyHotelStats
 
 
-admin.site.register(Product)
+admin.site.register(MonthlyKitchenStats)
+admin.site.register(MonthlyHotelStats)
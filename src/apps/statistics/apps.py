@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StatisticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.statistics"
+
+    def ready(self):
+        import apps.statistics.signals
+        return super().ready()
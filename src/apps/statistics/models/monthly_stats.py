@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+from django.db import models
+
+from apps.base.models import AbstractBaseModel
+
+
+class MonthlyKitchenStats(AbstractBaseModel):
+    """
+    Pre-aggregated kitchen figures of one calendar month.
+
+    Rows are refreshed by the food order and warehouse signals (see
+    ``apps.statistics.utils.monthly_stats``), so the diagrams read at most
+    twelve rows instead of every order and batch of the range.
+    """
+
+    # === The first day of the month. ===
+    month = models.DateField(unique=True)
+    # === Number of accepted food orders placed in the month. ===
+    order_count = models.PositiveIntegerField(default=0)
+    # === Sum of the profit snapshots of the accepted food orders. ===
+    checkout = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal("0"))
+    # === Sum of the gross prices of the warehouse batches received in the month. ===
+    check_in = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "monthly_kitchen_stats"
+        # === The singular name for the monthly kitchen statistics. ===
+        verbose_name = "Monthly kitchen stats"
+        # === The plural name for the monthly kitchen statistics. ===
+        verbose_name_plural = "Monthly kitchen stats"
+        # === Ordering field for sorting a set of queries ===
+        ordering = ["month"]
+
+    def __str__(self):
+        return f"{self.month:%m.%Y} - {self.order_count}"
+
+
+class MonthlyHotelStats(AbstractBaseModel):
+    """
+    Pre-aggregated hotel figures of one calendar month.
+    """
+
+    # === The first day of the month. ===
+    month = models.DateField(unique=True)
+    # === Number of completed hotel orders placed in the month. ===
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "monthly_hotel_stats"
+        # === The singular name for the monthly hotel statistics. ===
+        verbose_name = "Monthly hotel stats"
+        # === The plural name for the monthly hotel statistics. ===
+        verbose_name_plural = "Monthly hotel stats"
+        # === Ordering field for sorting a set of queries ===
+        ordering = ["month"]
+
+    def __str__(self):
+        return f"{self.month:%m.%Y} - {self.order_count}"
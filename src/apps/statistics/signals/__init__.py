@@ -0,0 +1 @@
+from .monthly_stats import *
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.orders.models import FoodOrder, HotelOrder
+from apps.statistics.utils.monthly_stats import refresh_monthly_stats_on_commit
+from apps.warehouses.models import Warehouse
+
+
+@receiver(post_save, sender=FoodOrder)
+@receiver(post_save, sender=HotelOrder)
+@receiver(post_save, sender=Warehouse)
+def post_save_monthly_stats(sender, instance, **kwargs):
+    """
+    Signal handler that refreshes the monthly rollup of the month the food order,
+    hotel order or warehouse batch belongs to.
+    """
+    refresh_monthly_stats_on_commit([instance.created_at])
+
+
+@receiver(post_delete, sender=FoodOrder)
+@receiver(post_delete, sender=HotelOrder)
+@receiver(post_delete, sender=Warehouse)
+def post_delete_monthly_stats(sender, instance, **kwargs):
+    """
+    Signal handler that removes a deleted row from its monthly rollup.
+    """
+    refresh_monthly_stats_on_commit([instance.created_at])
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from apps.statistics.utils.monthly_stats import backfill_monthly_stats
+
+
+@shared_task
+def backfill_monthly_stats_task():
+    """
+    Rebuild the monthly kitchen and hotel rollups from the source tables.
+    """
+    months = backfill_monthly_stats()
+    return f"Monthly stats rebuilt: {months} rows"
@@ -1,3 +1,124 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
 from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.foods.models import Food, FoodSection
+from apps.orders.models import FoodOrder
+from apps.products.models import Product
+from apps.sections.models import Measure, Section
+from apps.statistics.models import MonthlyKitchenStats
+from apps.statistics.utils import backfill_monthly_stats, month_start, refresh_monthly_stats
+from apps.warehouses.models import ProductsUsed, Warehouse
+
+
+class KitchenStatisticsTests(TestCase):
+    """
+    Kitchen statistics are aggregated in SQL from the profit snapshot of the orders.
+    """
+
+    def setUp(self):
+        self.section = FoodSection.objects.create(name="Soups")
+        self.foods = [
+            Food.objects.create(name=f"Food {i}", section=self.section, profit=Decimal("5"))
+            for i in range(3)
+        ]
+        FoodOrder.objects.bulk_create(
+            [
+                FoodOrder(
+                    food=self.foods[i],
+                    product_type=FoodOrder.ProductType.FOOD,
+                    order_type=FoodOrder.OrderType.ONCE,
+                    price=Decimal("20"),
+                    profit=profit,
+                )
+                for i, profit in [(0, Decimal("2")), (1, Decimal("7")), (1, Decimal("3"))]
+            ]
+        )
+        self.client = APIClient()
+
+    def test_food_statistics(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("food-statistics"), {"per_page": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            [(food["name"], food["order_count"], food["price"]) for food in response.data["results"]],
+            [("Food 1", 2, Decimal("10")), ("Food 0", 1, Decimal("2"))],
+        )
+
+    def test_section_statistics(self):
+        response = self.client.get(reverse("section-statistics"))
+
+        self.assertEqual(
+            list(response.data["results"]),
+            [{"name": "Soups", "order_count": 3, "price": Decimal("12")}],
+        )
+
+    def test_kitchen_summary(self):
+        FoodOrder.objects.update(status=FoodOrder.Status.ACCEPTED, cost=Decimal("4"))
+
+        response = self.client.get(reverse("kitchen-statistics"))
+
+        self.assertEqual(response.data["checkout"], Decimal("60"))
+        self.assertEqual(response.data["profit"], Decimal("12"))
+        self.assertEqual(response.data["cost"], Decimal("12"))
+
+    def test_kitchen_diagram_reads_monthly_rollup(self):
+        FoodOrder.objects.update(status=FoodOrder.Status.ACCEPTED)
+        # === Same month one year earlier: outside the window, must not be counted ===
+        last_year = FoodOrder.objects.filter(food=self.foods[0])
+        last_year.update(created_at=timezone.now() - relativedelta(years=1) - timedelta(days=1))
+        self.assertEqual(backfill_monthly_stats(), 2)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("kitchen-statistics-diagram"))
+
+        self.assertEqual(len(response.data["data"]), 12)
+        self.assertEqual(response.data["data"][-1]["checkout"], 10)
+
+        # === A refresh re-aggregates the month from the source rows ===
+        FoodOrder.objects.filter(food=self.foods[1]).update(status=FoodOrder.Status.CANCELED)
+        refresh_monthly_stats([timezone.now()])
+        month = MonthlyKitchenStats.objects.get(month=month_start(timezone.now()))
+        self.assertEqual((month.order_count, month.checkout), (0, Decimal("0")))
+
+
+class WarehouseStatisticsTests(TestCase):
+    """
+    Warehouse statistics are grouped by product in SQL.
+    """
+
+    def test_most_used_products(self):
+        measure = Measure.objects.create(name="kg", abbreviation="kg")
+        section = Section.objects.create(name="Vegetables")
+        products = [
+            Product.objects.create(
+                name=name, measure=measure, measure_warehouse=measure, section=section, difference_measures=1
+            )
+            for name in ["Rice", "Onion"]
+        ]
+        batches = [
+            Warehouse.objects.create(product=product, gross_price=Decimal("10"), arrived_count=Decimal("5"))
+            for product in products
+        ]
+        ProductsUsed.objects.bulk_create(
+            [
+                ProductsUsed(warehouse=batches[0], count=Decimal("1.5"), price=Decimal("3")),
+                ProductsUsed(warehouse=batches[0], count=Decimal("2.25"), price=Decimal("4.5")),
+                ProductsUsed(warehouse=batches[1], count=Decimal("4"), price=Decimal("8")),
+            ]
+        )
+
+        with self.assertNumQueries(3):
+            response = APIClient().get(reverse("most-used-products-statistics"))
 
-# Create your tests here.
+        self.assertEqual(
+            [(row["name"], row["count"], row["price"]) for row in response.data["results"]],
+            [("Onion", Decimal("4"), Decimal("8")), ("Rice", Decimal("3.75"), Decimal("7.5"))],
+        )
@@ -1,2 +1,3 @@
 from .round_up_y_axis import *
-from .validate_date import *
\ No newline at end of file
+from .validate_date import *
+from .monthly_stats import *
\ No newline at end of file
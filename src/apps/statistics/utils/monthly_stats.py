@@ -0,0 +1,163 @@
+"""
+Monthly Statistics Rollup Utility Module
+
+This module keeps the ``MonthlyKitchenStats`` and ``MonthlyHotelStats`` rollups
+in sync with the food orders, hotel orders and warehouse batches.
+
+Signals refresh the months touched by a change once the transaction commits. A refresh re-aggregates only those months with one grouped
+query per source table, so it stays correct when an order changes status or is
+deleted. ``backfill_monthly_stats`` rebuilds every month at once.
+
+Example:
+    refresh_monthly_stats_on_commit([order.created_at])
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+ZERO = Decimal("0")
+
+
+def month_start(value):
+    """
+    Return the first day of the month of a date or (aware) datetime.
+    """
+    if hasattr(value, "hour") and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def get_kitchen_rows(start=None, end=None):
+    """
+    Aggregate food orders and warehouse batches per month.
+
+    Returns:
+        dict: {month: {"order_count": int, "checkout": Decimal, "check_in": Decimal}}
+    """
+    FoodOrder = apps.get_model("orders", "FoodOrder")
+    Warehouse = apps.get_model("warehouses", "Warehouse")
+
+    date_filter = {}
+    if start:
+        date_filter = {"created_at__date__gte": start, "created_at__date__lt": end}
+
+    rows = {}
+    orders = (
+        FoodOrder.objects.filter(status=FoodOrder.Status.ACCEPTED, **date_filter)
+        .annotate(month=TruncMonth("created_at"))
+        .order_by()
+        .values("month")
+        .annotate(order_count=Count("id"), checkout=Sum("profit"))
+    )
+    for row in orders:
+        rows.setdefault(month_start(row["month"]), {"order_count": 0, "checkout": ZERO, "check_in": ZERO}).update(
+            order_count=row["order_count"], checkout=row["checkout"] or ZERO
+        )
+
+    warehouses = (
+        Warehouse.objects.filter(**date_filter)
+        .annotate(month=TruncMonth("created_at"))
+        .order_by()
+        .values("month")
+        .annotate(check_in=Sum("gross_price"))
+    )
+    for row in warehouses:
+        rows.setdefault(month_start(row["month"]), {"order_count": 0, "checkout": ZERO, "check_in": ZERO}).update(
+            check_in=row["check_in"] or ZERO
+        )
+    return rows
+
+
+def get_hotel_rows(start=None, end=None):
+    """
+    Aggregate completed hotel orders per month.
+
+    Returns:
+        dict: {month: {"order_count": int}}
+    """
+    HotelOrder = apps.get_model("orders", "HotelOrder")
+
+    date_filter = {}
+    if start:
+        date_filter = {"created_at__date__gte": start, "created_at__date__lt": end}
+
+    orders = (
+        HotelOrder.objects.filter(order_status=HotelOrder.OrderStatus.COMPLETED, **date_filter)
+        .annotate(month=TruncMonth("created_at"))
+        .order_by()
+        .values("month")
+        .annotate(order_count=Count("id"))
+    )
+    return {month_start(row["month"]): {"order_count": row["order_count"]} for row in orders}
+
+
+def save_rows(model, months, rows, fields):
+    """
+    Write one rollup row per month; months without source rows are reset to zero.
+    """
+    defaults = {field: model._meta.get_field(field).get_default() for field in fields}
+    objs = [model(month=month, **{**defaults, **rows.get(month, {})}) for month in months]
+    model.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=["month"], update_fields=[*fields, "updated_at"]
+    )
+
+
+def refresh_monthly_stats(months):
+    """
+    Re-aggregate the kitchen and hotel rollups of the given months.
+
+    Args:
+        months: Iterable of dates or datetimes inside the months to refresh
+    """
+    MonthlyKitchenStats = apps.get_model("statistics", "MonthlyKitchenStats")
+    MonthlyHotelStats = apps.get_model("statistics", "MonthlyHotelStats")
+
+    months = sorted({month_start(value) for value in months if value})
+    if not months:
+        return
+
+    start, end = months[0], months[-1] + relativedelta(months=1)
+    kitchen_rows = get_kitchen_rows(start, end)
+    hotel_rows = get_hotel_rows(start, end)
+
+    with transaction.atomic():
+        save_rows(MonthlyKitchenStats, months, kitchen_rows, ["order_count", "checkout", "check_in"])
+        save_rows(MonthlyHotelStats, months, hotel_rows, ["order_count"])
+
+
+def refresh_monthly_stats_on_commit(months):
+    """
+    Refresh the given months once the current transaction commits, so the
+    rollups are aggregated from committed rows only.
+    """
+    months = {month_start(value) for value in months if value}
+    if months:
+        transaction.on_commit(lambda: refresh_monthly_stats(months))
+
+
+def backfill_monthly_stats():
+    """
+    Rebuild every kitchen and hotel rollup row from the source tables.
+
+    Returns:
+        int: Number of months written
+    """
+    MonthlyKitchenStats = apps.get_model("statistics", "MonthlyKitchenStats")
+    MonthlyHotelStats = apps.get_model("statistics", "MonthlyHotelStats")
+
+    kitchen_rows = get_kitchen_rows()
+    hotel_rows = get_hotel_rows()
+
+    with transaction.atomic():
+        MonthlyKitchenStats.objects.exclude(month__in=kitchen_rows).delete()
+        MonthlyHotelStats.objects.exclude(month__in=hotel_rows).delete()
+        save_rows(MonthlyKitchenStats, kitchen_rows, kitchen_rows, ["order_count", "checkout", "check_in"])
+        save_rows(MonthlyHotelStats, hotel_rows, hotel_rows, ["order_count"])
+    return len(kitchen_rows) + len(hotel_rows)
@@ -1,4 +1,4 @@
-from django.db.models import Prefetch
+from django.db.models import Count, Sum
 
 from apps.base.pagination import CustomPageNumberPagination
 from apps.base.views import CustomGenericAPIView
@@ -8,33 +8,29 @@ from apps.statistics.utils.validate_date import validate_from_and_date_to_date
 
 
 class CounterAgentListAPIView(CustomGenericAPIView):
-    queryset = CounterAgent.objects.all().prefetch_related(
-        Prefetch(
-            "orders",
-            queryset=FoodOrder.objects.select_related("food", "menu", "recipe"),
-        )
-    )
+    queryset = CounterAgent.objects.all()
 
     def get(self, request, *args, **kwargs):
-        counter_agents = self.get_queryset()
         from_date, to_date = validate_from_and_date_to_date(request)
-        data = []
-
-        for counter_agent in list(counter_agents):
-            orders = counter_agent.orders.filter(
-                status=FoodOrder.Status.ACCEPTED, created_at__lte=to_date, created_at__gte=from_date
+        counter_agents = (
+            FoodOrder.objects.filter(
+                counter_agent__in=self.get_queryset(),
+                status=FoodOrder.Status.ACCEPTED,
+                created_at__lte=to_date,
+                created_at__gte=from_date,
             )
-            if orders.exists():
-                counter_data = {
-                    "name": counter_agent.name,
-                    "order_count": orders.count(),
-                    "price": 0,
-                }
-                for order in orders:
-                    counter_data["price"] += order.profit
-                data.append(counter_data)
-        data.sort(key=lambda x: x["price"], reverse=True)
+            .values("counter_agent_id", "counter_agent__name")
+            .annotate(order_count=Count("id"), price=Sum("profit"))
+            .order_by("-price", "counter_agent_id")
+        )
         paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data, request)
-
-        return paginator.get_paginated_response(paginated_data)
+        paginated_data = paginator.paginate_queryset(counter_agents, request)
+        data = [
+            {
+                "name": counter_agent["counter_agent__name"],
+                "order_count": counter_agent["order_count"],
+                "price": counter_agent["price"],
+            }
+            for counter_agent in paginated_data
+        ]
+        return paginator.get_paginated_response(data)
@@ -1,140 +1,136 @@
 import calendar
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
 
 from rest_framework.response import Response
 
 from apps.base.pagination import CustomPageNumberPagination
 from apps.base.views import CustomGenericAPIView
 from apps.foods.models import FoodSection, Food
-from apps.orders.models import HotelOrder
 from apps.menus.models import Menu, Recipe
 from apps.orders.models import FoodOrder
+from apps.statistics.models import MonthlyKitchenStats, MonthlyHotelStats
 from apps.statistics.utils import validate_from_and_date_to_date, iterate_months, round_up_to_nice_number
 from apps.statistics.views.abstract import AbstractStatisticsAPIView
 from apps.warehouses.models import Warehouse
 
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=15, decimal_places=2))
+
 
 class SectionStatisticListAPIView(AbstractStatisticsAPIView):
-    queryset = FoodSection.objects.all().prefetch_related("foods")
+    queryset = FoodSection.objects.all()
 
     def get(self, request, *args, **kwargs):
-        sections = self.get_queryset()
-        data = []
-        for section in sections:
-            section_data = {"name": section.name, "order_count": 0, "price": 0}
-            if section.foods.exists():
-                for food in section.foods.all():
-                    section_data["order_count"] += food.orders.count()
-                    if food.orders.exists:
-                        for order in food.orders.all():
-                            section_data["price"] += order.profit
-            data.append(section_data)
-        data.sort(
-            key=lambda section_statistic: section_statistic["price"], reverse=True
+        sections = (
+            self.get_queryset()
+            .annotate(
+                order_count=Count("foods__orders"),
+                price=Coalesce(Sum("foods__orders__profit"), ZERO),
+            )
+            .order_by("-price", "id")
+            .values("name", "order_count", "price")
         )
         paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data, request)
+        paginated_data = paginator.paginate_queryset(sections, request)
         return paginator.get_paginated_response(paginated_data)
 
 
 class FoodStatisticListAPIView(AbstractStatisticsAPIView):
-    queryset = Food.objects.all().select_related("section").prefetch_related("orders")
+    queryset = Food.objects.all().select_related("section")
 
     def get(self, request, *args, **kwargs):
-        foods = self.get_queryset()
-        data = []
-        for food in foods:
-            food_data = {
+        foods = (
+            self.get_queryset()
+            .annotate(
+                order_count=Count("orders"),
+                price=Coalesce(Sum("orders__profit"), ZERO),
+            )
+            .order_by("-price", "id")
+        )
+        paginator = CustomPageNumberPagination()
+        paginated_foods = paginator.paginate_queryset(foods, request)
+        data = [
+            {
                 "name": food.name,
-                "order_count": food.orders.count(),
+                "order_count": food.order_count,
                 "section": food.section.name,
-                "price": 0,
+                "price": food.price,
                 "image": (
                     request.build_absolute_uri(food.image.url) if food.image else None
                 ),
             }
-            if food.orders.exists():
-                for order in food.orders.all():
-                    food_data["price"] += order.profit
-            data.append(food_data)
-        data.sort(key=lambda food_data: food_data["price"], reverse=True)
-        paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data, request)
-        return paginator.get_paginated_response(paginated_data)
+            for food in paginated_foods
+        ]
+        return paginator.get_paginated_response(data)
 
 
 class MenuStatisticListAPIView(AbstractStatisticsAPIView):
-    queryset = Menu.objects.all().prefetch_related("orders")
+    queryset = Menu.objects.all()
 
     def get(self, request, *args, **kwargs):
-        menus = self.get_queryset()
-        data = []
-        for menu in menus:
-            menu_data = {
+        menus = (
+            self.get_queryset()
+            .annotate(
+                order_count=Count("orders"),
+                net_price_sum=Coalesce(Sum("orders__net_price"), ZERO),
+                profit_sum=Coalesce(Sum("orders__profit"), ZERO),
+                gross_price_sum=Coalesce(Sum("orders__price"), ZERO),
+            )
+            .order_by("-profit_sum", "id")
+        )
+        paginator = CustomPageNumberPagination()
+        paginated_menus = paginator.paginate_queryset(menus, request)
+        data = [
+            {
                 "name": menu.name,
-                "order_count": menu.orders.count(),
-                "net_price": 0,
-                "profit": 0,
-                "gross_price": 0,
+                "order_count": menu.order_count,
+                "net_price": menu.net_price_sum,
+                "profit": menu.profit_sum,
+                "gross_price": menu.gross_price_sum,
                 "image": (
                     request.build_absolute_uri(menu.image.url) if menu.image else None
                 ),
             }
-            if menu.orders.exists():
-                for order in menu.orders.all():
-                    menu_data["net_price"] += order.net_price
-                    menu_data["profit"] += order.profit
-                    menu_data["gross_price"] += order.price
-            data.append(menu_data)
-        data.sort(key=lambda menu_data: menu_data["profit"], reverse=True)
-        paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data, request)
-        return paginator.get_paginated_response(paginated_data)
+            for menu in paginated_menus
+        ]
+        return paginator.get_paginated_response(data)
 
 
 class RecipeStatisticListAPIView(AbstractStatisticsAPIView):
-    queryset = Recipe.objects.all().prefetch_related("orders")
+    queryset = Recipe.objects.all()
 
     def get(self, request, *args, **kwargs):
         recipes = self.get_queryset()
-        data = []
-        total = 0
-        for recipe in recipes:
-            recipe_data = {
-                "name": recipe.name,
-                "order_count": recipe.orders.count(),
-                "price": 0,
-            }
-            if recipe.orders.exists():
-                for order in recipe.orders.all():
-                    recipe_data["price"] += order.profit
-                    total += order.profit
-            data.append(recipe_data)
-        data.sort(key=lambda recipe_data: recipe_data["price"], reverse=True)
-        return Response({"total": total, "result": data[:5]})
+        total = recipes.aggregate(total=Coalesce(Sum("orders__profit"), ZERO))["total"]
+        data = (
+            recipes.annotate(
+                order_count=Count("orders"),
+                price=Coalesce(Sum("orders__profit"), ZERO),
+            )
+            .order_by("-price", "id")
+            .values("name", "order_count", "price")[:5]
+        )
+        return Response({"total": total, "result": list(data)})
 
 
 class StatisticKitchenAPIView(CustomGenericAPIView):
     def get(self, request, *args, **kwargs):
         from_date, to_date = validate_from_and_date_to_date(request)
 
-        warehouses = list(
-            Warehouse.objects.filter(created_at__lte=to_date, created_at__gte=from_date)
-        )
-        orders = list(
-            FoodOrder.objects.filter(
-                created_at__lte=to_date, created_at__gte=from_date, status=FoodOrder.Status.ACCEPTED
-            )
+        check_in = Warehouse.objects.filter(
+            created_at__lte=to_date, created_at__gte=from_date
+        ).aggregate(check_in=Coalesce(Sum("gross_price"), ZERO))["check_in"]
+        orders = FoodOrder.objects.filter(
+            created_at__lte=to_date, created_at__gte=from_date, status=FoodOrder.Status.ACCEPTED
+        ).aggregate(
+            checkout=Coalesce(Sum("price"), ZERO),
+            profit=Coalesce(Sum("profit"), ZERO),
+            cost=Coalesce(Sum("cost"), ZERO),
         )
 
-        data = {"check_in": 0, "checkout": 0, "profit": 0, "general_trade": 0}
-
-        for order in orders:
-            data["checkout"] += order.price
-            data["profit"] += order.profit
-
-        for warehouse in warehouses:
-            data["check_in"] += warehouse.gross_price
-
+        data = {"check_in": check_in, **orders}
         data["general_trade"] = data["checkout"] + data["check_in"]
 
         return Response(data)
@@ -143,43 +139,28 @@ class StatisticKitchenAPIView(CustomGenericAPIView):
 class HotelAndKitchenDiagramAPIView(CustomGenericAPIView):
     def get(self, request, *args, **kwargs):
         from_date, to_date = validate_from_and_date_to_date(request)
+        months = list(iterate_months(from_date, to_date))
 
-        data = []
+        kitchen_stats = {
+            stats.month: stats
+            for stats in MonthlyKitchenStats.objects.filter(month__gte=months[0], month__lte=months[-1])
+        }
+        hotel_stats = {
+            stats.month: stats
+            for stats in MonthlyHotelStats.objects.filter(month__gte=months[0], month__lte=months[-1])
+        }
 
-        food_orders = list(
-            FoodOrder.objects.filter(
-                created_at__lte=to_date, created_at__gte=from_date, status=FoodOrder.Status.ACCEPTED
-            )
-        )
-        hotel_orders = list(
-            HotelOrder.objects.filter(
-                created_at__lte=to_date,
-                created_at__gte=from_date,
-                order_status=HotelOrder.OrderStatus.COMPLETED,
-            )
-        )
-
-        for month_date in iterate_months(from_date, to_date):
-
-            month_hotel_orders = []
-            month_food_orders = []
-            month_name = calendar.month_name[month_date.month]
-
-            for hotel_order in hotel_orders:
-                if hotel_order.created_at.month == month_date.month:
-                    month_hotel_orders.append(hotel_order)
-
-            for food_order in food_orders:
-                if food_order.created_at.month == month_date.month:
-                    month_food_orders.append(food_order)
-
-            diagram = {
-                "name": month_name,
-                "mehmonxona": len(month_hotel_orders),
-                "ovqat": len(month_food_orders),
+        data = []
+        for month_date in months:
+            hotel_month = hotel_stats.get(month_date)
+            kitchen_month = kitchen_stats.get(month_date)
+            data.append(
+                {
+                    "name": calendar.month_name[month_date.month],
+                    "mehmonxona": hotel_month.order_count if hotel_month else 0,
+                    "ovqat": kitchen_month.order_count if kitchen_month else 0,
                 }
-
-            data.append(diagram)
+            )
 
         max_raw = max(
             max(d["mehmonxona"], d["ovqat"]) for d in data
@@ -1,178 +1,97 @@
 import calendar
 
+from django.db.models import Sum
 from rest_framework.response import Response
 
 from apps.base.pagination import CustomPageNumberPagination
 from apps.base.views import CustomGenericAPIView
-from apps.orders.models import FoodOrder
+from apps.products.models import Product
+from apps.statistics.models import MonthlyKitchenStats
 from apps.statistics.utils import iterate_months, validate_from_and_date_to_date, round_up_to_nice_number
 from apps.statistics.views.abstract import AbstractStatisticsAPIView
 from apps.warehouses.models import Warehouse, ProductsUsed, Experience
 
 
-class CheckoutListAPIView(AbstractStatisticsAPIView):
-    queryset = Experience.objects.all().select_related(
-        "warehouse",
-        "warehouse__product",
-        "warehouse__product__section",
-        "warehouse__product__measure",
-    )
+class ProductStatisticsMixin:
+    """
+    Groups the queryset by product in SQL and paginates the groups.
+    Subclasses set the product lookup, the summed count and price fields and the sort order.
+    """
+    product_field = "warehouse__product"
+    count_field = "count"
+    price_field = "price"
+    order_field = "-price"
 
     def get(self, request, *args, **kwargs):
-        experiences = self.get_queryset()
-        data = {}
-
-        for experience in experiences:
-            product = experience.warehouse.product
-            measure_warehouse = product.measure_warehouse
-            name = product.name
-
-            count_value = experience.count
+        groups = (
+            self.get_queryset()
+            .values(self.product_field)
+            .annotate(count=Sum(self.count_field), price=Sum(self.price_field))
+            .order_by(self.order_field, self.product_field)
+        )
+        paginator = CustomPageNumberPagination()
+        paginated_groups = paginator.paginate_queryset(groups, request)
 
-            if name not in data:
-                data[name] = {
-                    "measure": measure_warehouse.abbreviation,
-                    "count": count_value,
+        products = Product.objects.select_related("measure_warehouse", "section").in_bulk(
+            [group[self.product_field] for group in paginated_groups]
+        )
+        data = []
+        for group in paginated_groups:
+            product = products[group[self.product_field]]
+            data.append(
+                {
+                    "name": product.name,
+                    "measure": product.measure_warehouse.abbreviation,
+                    "count": group["count"],
                     "section": product.section.name,
-                    "price": experience.price,
+                    "price": group["price"],
                     "image": (
                         request.build_absolute_uri(product.image.url)
                         if product.image
                         else None
                     ),
                 }
-            else:
-                data[name]["count"] += count_value
-                data[name]["price"] += experience.price
-
-        data_list = [
-            {"name": name, **details} for name, details in data.items()
-        ]
-
-        paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data_list, request)
-        return paginator.get_paginated_response(paginated_data)
-
-
-class CheckInListAPIView(AbstractStatisticsAPIView):
-    queryset = Warehouse.objects.all().select_related(
-        "product", "product__measure", "product__section"
-    )
-
-    def get(self, request, *args, **kwargs):
-        warehouses = self.get_queryset()
-        data = {}
-
-        for warehouse in warehouses:
-            name = warehouse.product.name
-            if name not in data:
-                data[name] = {
-                    "measure": warehouse.product.measure_warehouse.abbreviation,
-                    "count": warehouse.arrived_count,
-                    "section": warehouse.product.section.name,
-                    "price": warehouse.gross_price,
-                    "image": (
-                        request.build_absolute_uri(warehouse.product.image.url)
-                        if warehouse.product.image
-                        else None
-                    ),
-                }
-            else:
-                data[name]["count"] += warehouse.arrived_count
-                data[name]["price"] += warehouse.gross_price
-
-        data_list = [
-            {"name": name, **details} for name, details in data.items()
-        ]
-
-        paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data_list, request)
-        return paginator.get_paginated_response(paginated_data)
-
-
-class MostUsedProductsListAPIView(AbstractStatisticsAPIView):
-    queryset = ProductsUsed.objects.all().select_related(
-        "warehouse", "warehouse__product", "warehouse__product__measure_warehouse", "warehouse__product__section"
-    )
+            )
+        return paginator.get_paginated_response(data)
 
-    def get(self, request, *args, **kwargs):
-        used_products = self.get_queryset()
-        data = {}
 
-        for used_product in used_products:
-            product = used_product.warehouse.product
-            name = product.name
+class CheckoutListAPIView(ProductStatisticsMixin, AbstractStatisticsAPIView):
+    queryset = Experience.objects.all()
 
-            count = float(used_product.count)
-            price = float(used_product.price)
 
-            if name not in data:
-                data[name] = {
-                    "measure": product.measure_warehouse.abbreviation,
-                    "count": count,
-                    "section": product.section.name,
-                    "price": price,
-                    "image": (
-                        request.build_absolute_uri(product.image.url)
-                        if product.image else None
-                    ),
-                }
-            else:
-                data[name]["count"] += count
-                data[name]["price"] += price
+class CheckInListAPIView(ProductStatisticsMixin, AbstractStatisticsAPIView):
+    queryset = Warehouse.objects.all()
+    product_field = "product"
+    count_field = "arrived_count"
+    price_field = "gross_price"
 
-        data_list = [
-            {"name": name, **details} for name, details in data.items()
-        ]
-
-        paginator = CustomPageNumberPagination()
-        paginated_data = paginator.paginate_queryset(data_list, request)
-        return paginator.get_paginated_response(paginated_data)
 
+class MostUsedProductsListAPIView(ProductStatisticsMixin, AbstractStatisticsAPIView):
+    queryset = ProductsUsed.objects.all()
+    order_field = "-count"
 
 
 class CheckInCheckoutDiagramAPIView(CustomGenericAPIView):
     def get(self, request, *args, **kwargs):
 
         from_date, to_date = validate_from_and_date_to_date(request)
+        months = list(iterate_months(from_date, to_date))
 
-        data = []
+        kitchen_stats = {
+            stats.month: stats
+            for stats in MonthlyKitchenStats.objects.filter(month__gte=months[0], month__lte=months[-1])
+        }
 
-        warehouses = list(
-            Warehouse.objects.filter(created_at__lte=to_date, created_at__gte=from_date)
-        )
-        orders = list(
-            FoodOrder.objects.filter(
-                created_at__lte=to_date, created_at__gte=from_date, status=FoodOrder.Status.ACCEPTED
+        data = []
+        for month_date in months:
+            month_stats = kitchen_stats.get(month_date)
+            data.append(
+                {
+                    "name": calendar.month_name[month_date.month],
+                    "checkout": int(month_stats.checkout) if month_stats else 0,
+                    "check_in": int(month_stats.check_in) if month_stats else 0,
+                }
             )
-        )
-
-        for month_date in iterate_months(from_date, to_date):
-
-            month_warehouses = []
-            month_orders = []
-            month_name = calendar.month_name[month_date.month]
-
-            for warehouse in warehouses:
-                if warehouse.created_at.month == month_date.month:
-                    month_warehouses.append(warehouse)
-
-            for order in orders:
-                if order.created_at.month == month_date.month:
-                    month_orders.append(order)
-
-            diagram = {
-                "name": month_name,
-                "checkout": 0,
-                "check_in": 0,
-            }
-
-            for warehouse in month_warehouses:
-                diagram["check_in"] = int(diagram["check_in"] + warehouse.gross_price)
-
-            for order in month_orders:
-                diagram["checkout"] = int(diagram["checkout"] + order.profit)
-            data.append(diagram)
 
         max_raw = max(
             max(d["check_in"], d["checkout"]) for d in data
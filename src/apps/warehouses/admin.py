@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from apps.warehouses.models import Warehouse, ProductsUsed, Experience
+from apps.warehouses.models import Warehouse, ProductsUsed, Experience, ProductStock
 
 
 admin.site.register(Warehouse)
 admin.site.register(ProductsUsed)
 admin.site.register(Experience)
+admin.site.register(ProductStock)
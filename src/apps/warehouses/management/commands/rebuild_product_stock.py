@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.warehouses.utils.product_stock import rebuild_product_stock
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-product stock ledger from the warehouse batches."
+
+    def handle(self, *args, **kwargs):
+        rebuilt = rebuild_product_stock()
+        self.stdout.write(self.style.SUCCESS(f"Product stock rebuilt: {rebuilt} rows"))
@@ -1,3 +1,4 @@
 from .experience import *
+from .product_stock import *
 from .products_used import *
-from .warehouse import *
\ No newline at end of file
+from .warehouse import *
@@ -7,11 +7,11 @@ from apps.base.models import AbstractBaseModel
 
 class Experience(AbstractBaseModel):
     warehouse = models.ForeignKey("warehouses.Warehouse", on_delete=models.PROTECT, related_name="experiences")
-    count = models.CharField(max_length=10)
+    count = models.DecimalField(max_digits=10, decimal_places=2)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
 
     def __str__(self):
-        return self.count
+        return str(self.count)
 
     class Meta:
         db_table = "experience"
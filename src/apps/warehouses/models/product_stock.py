@@ -0,0 +1,42 @@
+from django.db import models
+from decimal import Decimal
+
+from apps.base.models import AbstractBaseModel
+
+
+class ProductStock(AbstractBaseModel):
+    """
+    Denormalized stock ledger with one row per product.
+
+    The row is kept in sync with the product's warehouse batches by the receipt,
+    deduction and rollback paths (see ``apps.warehouses.utils.product_stock``),
+    so availability checks read one row instead of aggregating every batch.
+    """
+
+    # === The product whose stock is summarized. ===
+    product = models.OneToOneField(
+        "products.Product", on_delete=models.CASCADE, related_name="stock"
+    )
+    # === Total available quantity in recipe units (count * difference_measures). ===
+    available = models.DecimalField(max_digits=20, decimal_places=4, default=Decimal("0"))
+    # === The oldest active batch, consumed first (FIFO). ===
+    oldest_batch = models.ForeignKey(
+        "warehouses.Warehouse",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    # === Net price per recipe unit of the oldest active batch. ===
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        # === The name of the database table. ===
+        db_table = "product_stock"
+        # === The singular name for the product stock. ===
+        verbose_name = "Product stock"
+        # === The plural name for the product stock. ===
+        verbose_name_plural = "Product stocks"
+
+    def __str__(self):
+        return f"{self.product_id} - {self.available}"
@@ -8,11 +8,11 @@ from apps.base.models.base import AbstractBaseModel
 class ProductsUsed(AbstractBaseModel):
     order_id = models.CharField(max_length=24, db_index=True, default="0")
     warehouse = models.ForeignKey("warehouses.Warehouse", on_delete=models.PROTECT, related_name="used")
-    count = models.CharField(max_length=50)
+    count = models.DecimalField(max_digits=20, decimal_places=4)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
 
     def __str__(self):
-        return self.count
+        return str(self.count)
 
     class Meta:
         db_table = "used_products"
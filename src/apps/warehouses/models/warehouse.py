@@ -35,6 +35,14 @@ class Warehouse(AbstractBaseModel):
         verbose_name_plural = "Warehouses"
         # === Ordering field for sorting a set of queries ===
         ordering = ["-created_at"]
+        indexes = [
+            # === FIFO deduction and stock: active batches of a product, oldest first ===
+            models.Index(
+                fields=["product", "created_at"],
+                condition=models.Q(status=True),
+                name="warehouse_active_product_idx",
+            ),
+        ]
 
 
     def save(self, *args, **kwargs):
@@ -1,8 +1,12 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 
 from apps.base.exceptions.exception_error import CustomExceptionError
 from apps.base.serializers import CustomModelSerializer, CustomSerializer
+from apps.products.models import Product
 from apps.warehouses.models import Warehouse
+from apps.warehouses.utils.bulk_receive import receive_delivery
 
 
 class WarehouseSerializer(CustomModelSerializer):
@@ -52,3 +56,36 @@ class WarehouseExpensesSerializer(CustomSerializer):
         warehouse = self.context["warehouse"]
         warehouse.count = warehouse.count - self.validated_data["amount"]
         warehouse.save()
+
+
+class WarehouseReceiveLineSerializer(CustomSerializer):
+    product = serializers.UUIDField()
+    gross_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("1"))
+    arrived_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.01"), source="arrived_count"
+    )
+
+
+class WarehouseBulkReceiveSerializer(CustomSerializer):
+    """
+    A whole delivery note: the products of all lines are validated with one query.
+    """
+    lines = WarehouseReceiveLineSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_lines(self, lines):
+        products = Product.objects.select_related("measure", "measure_warehouse", "section").in_bulk(
+            {line["product"] for line in lines}
+        )
+        errors = [
+            {} if line["product"] in products else {"product": ["Product not found."]}
+            for line in lines
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        for line in lines:
+            line["product"] = products[line["product"]]
+        return lines
+
+    def create(self, validated_data):
+        return receive_delivery(validated_data["lines"], user=self.get_user_from_context())
@@ -0,0 +1 @@
+from .recompute_catalog import *
\ No newline at end of file
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from apps.warehouses.utils.recalculation_queue import drain_changed_dependencies
+
+
+@shared_task
+def drain_catalog_recompute_queue():
+    """
+    Navbatga qo'yilgan mahsulot, recipe food, taom va menyu o'zgarishlarini
+    bitta paketda qayta hisoblaydi (CATALOG_RECOMPUTE_ASYNC yoqilganda).
+    """
+    return f"{drain_changed_dependencies()} queued changes recomputed"
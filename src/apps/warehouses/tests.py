@@ -1,21 +1,100 @@
-import requests
+from decimal import Decimal
+from unittest import mock
 
-product_ids = []
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-products_url = "https://catering.mukhsin.space/api/v1/products/"
-warehouses_url = "https://catering.mukhsin.space/api/v1/warehouses/"
+from apps.menus.models import Recipe
+from apps.menus.tests import CatalogTestMixin
+from apps.statistics.models import MonthlyKitchenStats
+from apps.statistics.utils.monthly_stats import month_start
+from apps.users.models import CustomUser
+from apps.warehouses.models import Warehouse
+from apps.warehouses.utils import recalculation_queue
 
-next_exists = True
 
-while next_exists:
-    products = requests.get(url=products_url).json()
-    if products["next"] == None:
-        next_exists = False
-    products_url = products["next"]
+class WarehouseBulkReceiveTests(CatalogTestMixin, TestCase):
+    """
+    A whole delivery is received in a fixed number of queries and leaves the
+    catalog, the audit fields and the monthly rollup as single saves would.
+    """
 
-    for i in products["results"]:
-        product_ids.append(i["id"])
+    def test_bulk_receive_takes_fixed_queries(self):
+        def receive(lines):
+            with self.captureOnCommitCallbacks(execute=True):
+                return APIClient().post(reverse("warehouse-bulk-receive"), {"lines": lines}, format="json")
 
-for product_id in product_ids:
-    response = requests.post(url=warehouses_url, data={"arrived_amount": 300, "gross_price": 300, "product": product_id})
-    print(response.status_code)
+        def lines(count):
+            return [
+                {"product": str(self.products[i % 4].id), "gross_price": "20", "arrived_amount": str(i + 1)}
+                for i in range(count)
+            ]
+
+        with CaptureQueriesContext(connection) as small:
+            receive(lines(2))
+        with CaptureQueriesContext(connection) as large:
+            response = receive(lines(12))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([line["arrived_amount"] for line in response.data], [Decimal(i + 1) for i in range(12)])
+        self.assertEqual(len(large), len(small))
+        self.assertMatchesLegacy()
+
+        response = receive([{"product": str(self.recipe.id), "gross_price": "20", "arrived_amount": "1"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Warehouse.objects.count(), 14)
+
+    def test_bulk_receive_records_user_and_monthly_stats(self):
+        user = CustomUser.objects.create_user(
+            full_name="Store Keeper",
+            email="storekeeper@example.com",
+            role=CustomUser.UserRole.ADMIN,
+            password="testpassword123",
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        lines = [{"product": str(product.id), "gross_price": "25", "arrived_amount": "2"} for product in self.products]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse("warehouse-bulk-receive"), {"lines": lines}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        batches = Warehouse.objects.all()
+        self.assertEqual({batch.created_by_id for batch in batches}, {user.id})
+        self.assertEqual({batch.updated_by_id for batch in batches}, {user.id})
+        stats = MonthlyKitchenStats.objects.get(month=month_start(batches[0].created_at))
+        self.assertEqual(stats.check_in, Decimal("100"))
+
+
+class CatalogRecomputeWorkerTests(CatalogTestMixin, TestCase):
+    """
+    In async mode changes are queued in Redis and recomputed by the worker.
+    """
+
+    @override_settings(CATALOG_RECOMPUTE_ASYNC=True)
+    def test_async_mode_queues_changes_for_the_worker(self):
+        queued = set()
+        client = mock.MagicMock()
+        client.sadd.side_effect = lambda key, *members: queued.update(members)
+        client.exists.side_effect = lambda *keys: int(bool(queued))
+        client.smembers.side_effect = lambda key: {member.encode() for member in queued}
+        client.delete.side_effect = lambda key: queued.clear()
+
+        with mock.patch.object(recalculation_queue, "get_redis", return_value=client):
+            with self.captureOnCommitCallbacks(execute=True):
+                for product in self.products:
+                    Warehouse.objects.create(product=product, gross_price=Decimal("10"), arrived_count=Decimal("1"))
+
+            self.assertEqual(queued, {f"product:{product.id}" for product in self.products})
+            self.assertTrue(recalculation_queue.is_catalog_stale())
+            self.assertFalse(Recipe.objects.get(pk=self.recipe.pk).status)
+
+            client.exists.side_effect = lambda *keys: 0
+            self.assertEqual(recalculation_queue.drain_changed_dependencies(), len(self.products))
+
+        client.rename.assert_called_once_with(recalculation_queue.DIRTY_KEY, recalculation_queue.PROCESSING_KEY)
+        self.assertEqual(queued, set())
+        self.assertMatchesLegacy()
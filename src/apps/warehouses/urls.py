@@ -6,5 +6,6 @@ from apps.warehouses import views
 urlpatterns = [
     # === RecipeFood URLs ===
     path("", views.WarehouseListCreateAPIView.as_view()),
+    path("receive/", views.WarehouseBulkReceiveAPIView.as_view(), name="warehouse-bulk-receive"),
     path("<str:pk>/", views.WarehouseExpensesRetrieveAPIView.as_view()),
 ]
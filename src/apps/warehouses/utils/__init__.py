@@ -1,4 +1,10 @@
+from .bulk_receive import *
 from .check_availability import *
+from .deduct_products import *
+from .missing_products_cache import *
+from .product_stock import *
+from .recalculate_dependencies import *
+from .recalculation_queue import *
+from .requirements import *
 from .update_product_dependencies import *
 from .validate_uuid import *
-
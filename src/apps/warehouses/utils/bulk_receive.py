@@ -0,0 +1,65 @@
+"""
+Bulk Warehouse Receiving Utility Module
+
+This module receives a whole supplier delivery note at once. A delivery has
+hundreds of lines; saving them one by one fires ``post_save_warehouse`` for
+every line, and every signal refreshes the stock ledger and recomputes the
+dependent catalog.
+
+Here the batches are written with one ``bulk_create`` (no per-row signals),
+the ledger is refreshed once, the dependency recalculation is marked once
+for the union of the received products and the monthly kitchen rollup is
+refreshed once for the delivery's month, so the whole delivery takes a fixed
+number of queries.
+
+Example:
+    batches = receive_delivery(
+        [{"product": rice, "gross_price": Decimal("300"), "arrived_count": Decimal("25")}],
+        user=request.user,
+    )
+    # Returns: list of created Warehouse instances, in line order
+"""
+
+from django.apps import apps
+from django.db import transaction
+
+from apps.statistics.utils.monthly_stats import refresh_monthly_stats_on_commit
+from apps.warehouses.utils.product_stock import refresh_product_stock
+from apps.warehouses.utils.recalculation_queue import mark_products_changed
+
+
+def receive_delivery(lines, user=None):
+    """
+    Create one warehouse batch per delivery line in a single transaction.
+
+    Args:
+        lines: List of dicts with "product" (Product instance), "gross_price"
+               and "arrived_count"
+        user: The user receiving the delivery, stored as created_by/updated_by
+
+    Returns:
+        list: The created Warehouse instances, in line order
+    """
+    Warehouse = apps.get_model("warehouses", "Warehouse")
+
+    # === Same defaults as Warehouse.save for a new batch ===
+    batches = [
+        Warehouse(
+            product=line["product"],
+            gross_price=line["gross_price"],
+            arrived_count=line["arrived_count"],
+            count=line["arrived_count"],
+            status=True,
+            created_by=user,
+            updated_by=user,
+        )
+        for line in lines
+    ]
+    product_ids = {batch.product_id for batch in batches}
+
+    with transaction.atomic():
+        Warehouse.objects.bulk_create(batches)
+        refresh_product_stock(product_ids)
+        mark_products_changed(product_ids)
+        refresh_monthly_stats_on_commit([batch.created_at for batch in batches])
+    return batches
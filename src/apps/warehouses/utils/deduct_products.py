@@ -0,0 +1,167 @@
+"""
+Product Deduction Utility Module
+
+This module deducts the products required by one or more food orders from the
+warehouse using FIFO (oldest batch first).
+
+All active batches of the required products are fetched and locked with one
+``select_for_update`` query ordered by ``(product_id, created_at)``. Shortage
+detection and FIFO consumption run in memory, and the results are written with
+one ``Warehouse.bulk_update`` and one ``ProductsUsed.bulk_create``. The stock
+ledger and the dependent catalog objects are refreshed once at the end.
+
+Example:
+    deduct_products({order.food_order_id: {product_id: Decimal("250")}})
+"""
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.apps import apps
+from django.db import transaction
+
+from apps.base.exceptions import CustomExceptionError
+from apps.warehouses.utils.product_stock import refresh_product_stock
+from apps.warehouses.utils.update_product_dependencies import update_product_dependencies_in_warehouse
+
+TWO_PLACES = Decimal("0.01")
+
+
+def get_measure(product):
+    return product.difference_measures if product.difference_measures else Decimal("1")
+
+
+def find_shortages(products_required, products, batches):
+    """
+    Compare the required quantities with the locked batches.
+
+    Returns:
+        dict: Dictionary mapping product IDs (as strings) to shortage details
+              Example: {"product_id": {"name": "Potato", "needed": Decimal("1.5"), "measure": "kg"}}
+    """
+    shortages = {}
+    for product_id, required_quantity in products_required.items():
+        product = products[product_id]
+        measure = get_measure(product)
+        total_available = sum(
+            (batch.count * measure for batch in batches[product_id]), Decimal("0")
+        )
+        if total_available < required_quantity:
+            shortages[str(product_id)] = {
+                "name": product.name,
+                "needed": required_quantity - total_available,
+                "measure": product.measure.abbreviation,
+            }
+    return shortages
+
+
+def consume_batches(order_id, product, required_quantity, batches, updated_batches):
+    """
+    Take the required quantity of a product from its batches, oldest first.
+
+    Returns:
+        list: Unsaved ProductsUsed objects, one per consumed batch, holding the
+              quantity actually taken from that batch
+    """
+    ProductsUsed = apps.get_model("warehouses", "ProductsUsed")
+    measure = get_measure(product)
+    used_products = []
+
+    for batch in batches:
+        if required_quantity <= Decimal("0"):
+            break
+        if batch.count <= Decimal("0"):
+            continue
+
+        available_quantity = batch.count * measure
+        if available_quantity >= required_quantity:
+            taken = required_quantity
+            batch.count -= (required_quantity / measure).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+        else:
+            taken = available_quantity
+            batch.count = Decimal("0")
+
+        batch.status = batch.count > Decimal("0")
+        updated_batches[batch.id] = batch
+        required_quantity -= taken
+
+        # === Warehouse.get_net_price without re-fetching the product ===
+        net_price = (batch.gross_price / (batch.arrived_count * measure)).quantize(
+            TWO_PLACES, rounding=ROUND_HALF_UP
+        )
+        used_products.append(
+            ProductsUsed(
+                warehouse_id=batch.id,
+                count=taken,
+                price=(net_price * taken).quantize(TWO_PLACES, rounding=ROUND_HALF_UP),
+                order_id=order_id,
+            )
+        )
+
+    return used_products
+
+
+def deduct_products(orders_products_needed):
+    """
+    Deduct the products of one or more orders from the warehouse in one transaction.
+
+    Args:
+        orders_products_needed: Dictionary mapping order IDs (``food_order_id``)
+                                to dictionaries {product_id: required quantity}
+
+    Returns:
+        list: The created ProductsUsed objects
+
+    Raises:
+        CustomExceptionError: If the warehouse cannot cover the total requirement
+                              of all orders. Nothing is deducted in this case.
+    """
+    Product = apps.get_model("products", "Product")
+    Warehouse = apps.get_model("warehouses", "Warehouse")
+    ProductsUsed = apps.get_model("warehouses", "ProductsUsed")
+
+    products_required = defaultdict(Decimal)
+    for products_needed in orders_products_needed.values():
+        for product_id, required_quantity in products_needed.items():
+            products_required[product_id] += Decimal(str(required_quantity))
+
+    if not products_required:
+        return []
+
+    with transaction.atomic():
+        products = Product.objects.select_related("measure").in_bulk(products_required)
+
+        batches = defaultdict(list)
+        locked_batches = (
+            Warehouse.objects.filter(product_id__in=products_required, status=True)
+            .order_by("product_id", "created_at")
+            .select_for_update()
+        )
+        for batch in locked_batches:
+            batches[batch.product_id].append(batch)
+
+        shortages = find_shortages(products_required, products, batches)
+        if shortages:
+            raise CustomExceptionError(code=400, detail=shortages)
+
+        updated_batches = {}
+        used_products = []
+        for order_id, products_needed in orders_products_needed.items():
+            for product_id, required_quantity in products_needed.items():
+                used_products.extend(
+                    consume_batches(
+                        order_id,
+                        products[product_id],
+                        Decimal(str(required_quantity)),
+                        batches[product_id],
+                        updated_batches,
+                    )
+                )
+
+        Warehouse.objects.bulk_update(updated_batches.values(), ["status", "count"])
+        used_products = ProductsUsed.objects.bulk_create(used_products)
+
+        refresh_product_stock(products_required)
+        update_product_dependencies_in_warehouse(list(products_required))
+
+    return used_products
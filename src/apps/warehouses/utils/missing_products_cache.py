@@ -0,0 +1,94 @@
+"""
+Missing Products Cache Utility Module
+
+This module caches missing-products results of foods, menus and recipes in the
+default (Redis) cache.
+
+Every product has a stock version token. It is replaced whenever the product's
+stock changes (warehouse receipts, order deductions and rollbacks all go through
+``refresh_product_stock``) or the catalog structure around it changes. An item's
+cache key contains the versions of all products it depends on, so a list page
+only recomputes the items whose ingredients actually changed.
+
+Example:
+    missing = get_cached_missing_products("menu", [menu.id])
+    # Returns: {menu_id: {"Product Name": {"measure": "kg", "missing": "5.25"}}}
+"""
+
+import hashlib
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.cache import cache
+
+from apps.warehouses.utils.product_stock import get_stock_versions
+from apps.warehouses.utils.requirements import explode_requirements
+
+MISSING_PRODUCTS_KEY = "missing_products:{item_type}:{item_id}:{signature}"
+MISSING_PRODUCTS_TIMEOUT = 60 * 60 * 24
+
+
+def get_item_products(item_type, item_ids):
+    """
+    Read the products every item depends on from the dependency index.
+
+    Returns:
+        dict: Dictionary mapping item IDs to sets of product IDs
+    """
+    ProductDependency = apps.get_model("products", "ProductDependency")
+    item_products = defaultdict(set)
+    rows = ProductDependency.objects.filter(node_type=item_type, node_id__in=item_ids).values_list(
+        "node_id", "product_id"
+    )
+    for item_id, product_id in rows:
+        item_products[item_id].add(product_id)
+    return item_products
+
+
+def get_signature(product_ids, versions):
+    value = ",".join(sorted(f"{product_id}:{versions[product_id]}" for product_id in product_ids))
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def get_cached_missing_products(item_type, item_ids):
+    """
+    Return the missing products of the given items, recomputing only stale entries.
+
+    Args:
+        item_type: One of "food", "menu", "recipe"
+        item_ids: Iterable of item IDs of that type
+
+    Returns:
+        dict: Dictionary mapping item IDs to their missing products
+    """
+    item_ids = list(dict.fromkeys(item_ids))
+    if not item_ids:
+        return {}
+
+    item_products = get_item_products(item_type, item_ids)
+    versions = get_stock_versions(
+        {product_id for product_ids in item_products.values() for product_id in product_ids}
+    )
+    keys = {
+        item_id: MISSING_PRODUCTS_KEY.format(
+            item_type=item_type,
+            item_id=item_id,
+            signature=get_signature(item_products[item_id], versions),
+        )
+        for item_id in item_ids
+    }
+
+    cached = cache.get_many(keys.values())
+    result = {item_id: cached[key] for item_id, key in keys.items() if key in cached}
+
+    stale_ids = [item_id for item_id in item_ids if item_id not in result]
+    if stale_ids:
+        exploded = explode_requirements({(item_type, item_id): 1 for item_id in stale_ids})
+        computed = {item_id: exploded[(item_type, item_id)]["missing"] for item_id in stale_ids}
+        cache.set_many(
+            {keys[item_id]: missing for item_id, missing in computed.items()},
+            timeout=MISSING_PRODUCTS_TIMEOUT,
+        )
+        result.update(computed)
+
+    return result
@@ -0,0 +1,168 @@
+"""
+Product Stock Ledger Utility Module
+
+This module maintains and reads the ``ProductStock`` ledger, which stores for
+every product its total available quantity, the oldest active batch and the
+FIFO unit price.
+
+Writers (warehouse receipts, order deductions and rollbacks) call
+``refresh_product_stock`` inside their transaction after changing batches.
+Readers get the available quantity of any number of products with a single
+indexed lookup instead of a ``Sum(count * difference_measures)`` aggregate
+over every batch. Every refresh also replaces the product's stock version
+token once the transaction commits; caches of derived data use it in their keys.
+
+Example:
+    available = get_available_quantities([product.id])
+    # Returns: {product_id: Decimal("12.5000")}
+"""
+
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import now
+
+STOCK_VERSION_KEY = "product_stock_version:{product_id}"
+
+
+def get_product_stock_model():
+    return apps.get_model("warehouses", "ProductStock")
+
+
+def get_available_quantities(product_ids, for_update=False):
+    """
+    Return the available quantity of the given products from the ledger.
+
+    Args:
+        product_ids: Iterable of Product IDs
+        for_update: Lock the ledger rows until the end of the transaction
+
+    Returns:
+        dict: Dictionary mapping every given product ID to its available quantity
+              (Decimal("0") for products that were never received)
+    """
+    ProductStock = get_product_stock_model()
+    product_ids = set(product_ids)
+    result = {product_id: Decimal("0") for product_id in product_ids}
+
+    if not product_ids:
+        return result
+
+    queryset = ProductStock.objects.filter(product_id__in=product_ids)
+    if for_update:
+        queryset = queryset.select_for_update()
+
+    for product_id, available in queryset.values_list("product_id", "available"):
+        result[product_id] = available
+
+    return result
+
+
+def bump_stock_versions(product_ids):
+    """
+    Replace the stock version tokens of the given products.
+    """
+    versions = {
+        STOCK_VERSION_KEY.format(product_id=product_id): uuid.uuid4().hex
+        for product_id in set(product_ids)
+    }
+    if versions:
+        cache.set_many(versions, timeout=None)
+
+
+def bump_stock_versions_on_commit(product_ids):
+    """
+    Replace the version tokens once the current transaction commits, so readers
+    never cache a result computed from uncommitted stock under the new version.
+    """
+    product_ids = set(product_ids)
+    if product_ids:
+        transaction.on_commit(lambda: bump_stock_versions(product_ids))
+
+
+def get_stock_versions(product_ids):
+    """
+    Returns:
+        dict: Dictionary mapping product IDs to their version tokens
+    """
+    keys = {STOCK_VERSION_KEY.format(product_id=product_id): product_id for product_id in product_ids}
+    versions = cache.get_many(keys)
+
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    for key, version in missing.items():
+        # === Another process may have created the token meanwhile; keep theirs ===
+        if not cache.add(key, version, timeout=None):
+            missing[key] = cache.get(key, version)
+    versions.update(missing)
+
+    return {product_id: versions[key] for key, product_id in keys.items()}
+
+
+def refresh_product_stock(product_ids):
+    """
+    Recompute the ledger rows of the given products from their active batches.
+
+    Args:
+        product_ids: Iterable of Product IDs whose batches have changed
+    """
+    ProductStock = get_product_stock_model()
+    Product = apps.get_model("products", "Product")
+    Warehouse = apps.get_model("warehouses", "Warehouse")
+
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+
+    measures = {
+        product_id: difference_measures if difference_measures else Decimal("1")
+        for product_id, difference_measures in Product.objects.filter(
+            id__in=product_ids
+        ).values_list("id", "difference_measures")
+    }
+
+    timestamp = now()
+    stocks = {
+        product_id: ProductStock(product_id=product_id, updated_at=timestamp)
+        for product_id in measures
+    }
+
+    batches = (
+        Warehouse.objects.filter(product_id__in=measures, status=True, count__gt=0)
+        .only("id", "product_id", "count", "gross_price", "arrived_count")
+        .order_by("created_at")
+    )
+    for batch in batches:
+        stock = stocks[batch.product_id]
+        measure = measures[batch.product_id]
+        stock.available += batch.count * measure
+        if stock.oldest_batch_id is None:
+            stock.oldest_batch_id = batch.id
+            # === Warehouse.get_net_price without re-fetching the product ===
+            stock.unit_price = (batch.gross_price / (batch.arrived_count * measure)).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+
+    with transaction.atomic():
+        ProductStock.objects.bulk_create(
+            stocks.values(),
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=["available", "oldest_batch", "unit_price", "updated_at"],
+        )
+        bump_stock_versions_on_commit(measures)
+
+
+def rebuild_product_stock():
+    """
+    Rebuild the ledger of every product from the warehouse.
+
+    Returns:
+        int: Number of ledger rows written
+    """
+    Product = apps.get_model("products", "Product")
+    product_ids = list(Product.objects.values_list("id", flat=True))
+    refresh_product_stock(product_ids)
+    return len(product_ids)
@@ -0,0 +1,277 @@
+"""
+Dependency Recalculation Engine
+
+This module recomputes statuses and prices of products, recipe foods, foods,
+menus and recipes in a single pass.
+
+The affected subgraph and the warehouse batches are loaded in a fixed number of
+queries, every status and price is computed bottom-up in memory, and the results
+are written with one ``bulk_update`` per model. The rules are the same as the
+per-object model methods (``RecipeFood.calculate_prices``, ``Food.calculate_prices``,
+``Menu.calculate_prices``, ``Recipe.calculate_prices``) and the batch availability
+checks in ``check_availability.py``. Available quantities are read from the
+``ProductStock`` ledger, so it must be refreshed before the recalculation.
+
+Example:
+    recalculate_product_dependencies([product.id])
+"""
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.apps import apps
+from django.db import transaction
+
+from apps.products.utils.dependency_graph import get_ancestor_ids, get_dependent_ids
+from apps.warehouses.utils.product_stock import get_available_quantities
+
+TWO_PLACES = Decimal("0.01")
+
+
+def quantize(value):
+    return Decimal(str(value)).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def gross_price(net_price, profit):
+    if net_price > Decimal("0"):
+        return (quantize(net_price) + profit).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    return Decimal(0)
+
+
+class DependencyRecalculator:
+    """
+    Recompute the given catalog nodes and product statuses in one pass.
+
+    Args:
+        nodes: Dictionary mapping node types ("recipe_food", "food", "menu", "recipe")
+               to sets of IDs that must be recomputed
+        product_ids: Iterable of Product IDs whose status must be recomputed
+    """
+
+    def __init__(self, nodes, product_ids=()):
+        self.nodes = {node_type: set(ids) for node_type, ids in nodes.items()}
+        self.product_ids = set(product_ids)
+
+        self.Product = apps.get_model("products", "Product")
+        self.RecipeFood = apps.get_model("foods", "RecipeFood")
+        self.Food = apps.get_model("foods", "Food")
+        self.Menu = apps.get_model("menus", "Menu")
+        self.Recipe = apps.get_model("menus", "Recipe")
+        self.Warehouse = apps.get_model("warehouses", "Warehouse")
+
+    def run(self):
+        """
+        Load the subgraph, recompute it and save the results.
+
+        Returns:
+            dict: Dictionary with the updated objects per model
+                  Example: {"products": [...], "recipe_foods": [...], "foods": [...], ...}
+        """
+        self.load()
+        result = {
+            "products": self.compute_products(),
+            "recipe_foods": self.compute_recipe_foods(),
+            "foods": self.compute_foods(),
+            "menus": self.compute_menus(),
+            "recipes": self.compute_recipes(),
+        }
+        self.save(result)
+        return result
+
+    # ============================ Loading ============================
+
+    def load(self):
+        recipe_ids = self.nodes.get("recipe", set())
+        self.recipes = {
+            recipe.id: recipe for recipe in self.Recipe.objects.filter(id__in=recipe_ids)
+        } if recipe_ids else {}
+
+        # === Recipes need all three menus, menus need all their foods, foods need all their recipe foods ===
+        menu_ids = set(self.nodes.get("menu", set()))
+        for recipe in self.recipes.values():
+            menu_ids.update(self.get_recipe_menu_ids(recipe))
+        self.menus = {menu.id: menu for menu in self.Menu.objects.filter(id__in=menu_ids)} if menu_ids else {}
+
+        self.menu_foods = defaultdict(list)
+        food_ids = set(self.nodes.get("food", set()))
+        if self.menus:
+            rows = self.Menu.foods.through.objects.filter(menu_id__in=self.menus).values_list(
+                "menu_id", "food_id"
+            )
+            for menu_id, food_id in rows:
+                self.menu_foods[menu_id].append(food_id)
+                food_ids.add(food_id)
+        self.foods = {food.id: food for food in self.Food.objects.filter(id__in=food_ids)} if food_ids else {}
+
+        self.food_recipe_foods = defaultdict(list)
+        recipe_food_ids = set(self.nodes.get("recipe_food", set()))
+        if self.foods:
+            rows = self.Food.recipes.through.objects.filter(food_id__in=self.foods).values_list(
+                "food_id", "recipefood_id"
+            )
+            for food_id, recipe_food_id in rows:
+                self.food_recipe_foods[food_id].append(recipe_food_id)
+                recipe_food_ids.add(recipe_food_id)
+        self.recipe_foods = {
+            recipe_food.id: recipe_food
+            for recipe_food in self.RecipeFood.objects.filter(id__in=recipe_food_ids)
+        } if recipe_food_ids else {}
+
+        product_ids = self.product_ids | {rf.product_id for rf in self.recipe_foods.values()}
+        self.products = self.Product.objects.in_bulk(product_ids) if product_ids else {}
+
+        # === Warehouse batches of every product, oldest first (FIFO) ===
+        self.batches = defaultdict(list)
+        if self.products:
+            warehouses = self.Warehouse.objects.filter(product_id__in=self.products).order_by("created_at")
+            for warehouse in warehouses:
+                self.batches[warehouse.product_id].append(warehouse)
+
+        self.available = get_available_quantities(self.products)
+
+    @staticmethod
+    def get_recipe_menu_ids(recipe):
+        return [
+            menu_id
+            for menu_id in (recipe.menu_breakfast_id, recipe.menu_lunch_id, recipe.menu_dinner_id)
+            if menu_id
+        ]
+
+    @staticmethod
+    def get_measure(product):
+        return product.difference_measures if product.difference_measures else Decimal("1")
+
+    # ============================ Computing ============================
+
+    def compute_products(self):
+        products = [self.products[product_id] for product_id in self.product_ids if product_id in self.products]
+        for product in products:
+            product.status = self.available[product.id] > Decimal("0")
+        return products
+
+    def calculate_recipe_food_price(self, recipe_food):
+        """
+        Price of the first batch (FIFO) that covers the recipe food count,
+        otherwise of the newest batch.
+        """
+        batches = self.batches[recipe_food.product_id]
+        if not batches:
+            return recipe_food.price
+
+        product = self.products[recipe_food.product_id]
+        measure = self.get_measure(product)
+        price_obj = next(
+            (batch for batch in batches if batch.count * measure >= recipe_food.count),
+            batches[-1],
+        )
+        # === Warehouse.get_net_price without re-fetching the product ===
+        net_price = quantize(price_obj.gross_price / (price_obj.arrived_count * measure))
+        return (net_price * recipe_food.count).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+    def compute_recipe_foods(self):
+        recipe_foods = [self.recipe_foods[pk] for pk in self.nodes.get("recipe_food", set()) if pk in self.recipe_foods]
+        for recipe_food in recipe_foods:
+            recipe_food.price = self.calculate_recipe_food_price(recipe_food)
+            recipe_food.status = recipe_food.count <= self.available.get(recipe_food.product_id, Decimal("0"))
+        return recipe_foods
+
+    def is_available(self, recipe_food_ids):
+        products_required = defaultdict(Decimal)
+        for recipe_food_id in recipe_food_ids:
+            recipe_food = self.recipe_foods[recipe_food_id]
+            products_required[recipe_food.product_id] += recipe_food.count
+
+        return all(
+            required <= self.available.get(product_id, Decimal("0"))
+            for product_id, required in products_required.items()
+        )
+
+    def get_food_recipe_food_ids(self, food_id):
+        return self.food_recipe_foods[food_id]
+
+    def get_menu_recipe_food_ids(self, menu_id):
+        return [
+            recipe_food_id
+            for food_id in self.menu_foods[menu_id]
+            for recipe_food_id in self.food_recipe_foods[food_id]
+        ]
+
+    def compute_foods(self):
+        foods = [self.foods[pk] for pk in self.nodes.get("food", set()) if pk in self.foods]
+        for food in foods:
+            recipe_food_ids = self.get_food_recipe_food_ids(food.id)
+            prices = [self.recipe_foods[pk].price for pk in recipe_food_ids]
+
+            net_price = Decimal(0) if any(price == Decimal("0") for price in prices) else sum(prices, Decimal(0))
+            food.net_price = quantize(net_price)
+            food.gross_price = gross_price(net_price, food.profit)
+            food.status = self.is_available(recipe_food_ids)
+        return foods
+
+    def compute_menus(self):
+        menus = [self.menus[pk] for pk in self.nodes.get("menu", set()) if pk in self.menus]
+        for menu in menus:
+            prices = [self.foods[food_id].net_price for food_id in self.menu_foods[menu.id]]
+
+            net_price = Decimal(0) if any(price == Decimal("0") for price in prices) else sum(prices, Decimal(0))
+            menu.net_price = quantize(net_price)
+            menu.gross_price = gross_price(net_price, menu.profit)
+            menu.status = self.is_available(self.get_menu_recipe_food_ids(menu.id))
+        return menus
+
+    def compute_recipes(self):
+        recipes = list(self.recipes.values())
+        for recipe in recipes:
+            menu_ids = self.get_recipe_menu_ids(recipe)
+            prices = [self.menus[menu_id].net_price for menu_id in menu_ids]
+
+            net_price = Decimal(0) if any(price == Decimal("0") for price in prices) else sum(prices, Decimal(0))
+            recipe.net_price = quantize(net_price)
+            recipe.gross_price = gross_price(net_price, recipe.profit)
+            recipe.status = self.is_available(
+                [pk for menu_id in menu_ids for pk in self.get_menu_recipe_food_ids(menu_id)]
+            )
+        return recipes
+
+    # ============================ Saving ============================
+
+    def save(self, result):
+        with transaction.atomic():
+            if result["products"]:
+                self.Product.objects.bulk_update(result["products"], ["status"])
+            if result["recipe_foods"]:
+                self.RecipeFood.objects.bulk_update(result["recipe_foods"], ["status", "price"])
+            if result["foods"]:
+                self.Food.objects.bulk_update(result["foods"], ["status", "net_price", "gross_price"])
+            if result["menus"]:
+                self.Menu.objects.bulk_update(result["menus"], ["status", "net_price", "gross_price"])
+            if result["recipes"]:
+                self.Recipe.objects.bulk_update(result["recipes"], ["status", "net_price", "gross_price"])
+
+
+def recalculate_product_dependencies(product_ids):
+    """
+    Recompute the products and every catalog node that depends on them.
+
+    Args:
+        product_ids: Iterable of Product IDs whose stock has changed
+
+    Returns:
+        dict: Dictionary with the updated objects per model
+    """
+    product_ids = set(product_ids)
+    return DependencyRecalculator(get_dependent_ids(product_ids), product_ids).run()
+
+
+def recalculate_dependent_objects(node_type, node_ids):
+    """
+    Recompute the given catalog nodes and every node above them.
+
+    Args:
+        node_type: One of "recipe_food", "food", "menu", "recipe"
+        node_ids: Iterable of node IDs of that type
+
+    Returns:
+        dict: Dictionary with the updated objects per model
+    """
+    return DependencyRecalculator(get_ancestor_ids(node_type, node_ids)).run()
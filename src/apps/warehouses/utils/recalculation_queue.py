@@ -0,0 +1,234 @@
+"""
+Dependency Recalculation Queue Utility Module
+
+This module collects the products and catalog nodes (recipe foods, foods, menus,
+recipes) changed during a transaction and recomputes them once, in
+``transaction.on_commit``.
+
+A request that saves several warehouse batches or recipe foods used to walk the
+same Product -> RecipeFood -> Food -> Menu -> Recipe cascade once per save.
+Now every save only marks its IDs as changed; the first mark of a transaction
+schedules a single flush that merges all marked nodes with their dependents and
+runs one ``DependencyRecalculator`` pass. Outside an atomic block the flush runs
+immediately, as before.
+
+With ``CATALOG_RECOMPUTE_ASYNC`` enabled the flush does not recompute anything:
+it adds the changed IDs to a Redis set and returns, and the
+``drain_catalog_recompute_queue`` task recomputes everything collected so far in
+one batch every ``CATALOG_RECOMPUTE_INTERVAL`` seconds. Until that batch lands
+``is_catalog_stale`` is true and catalog reads are marked stale.
+
+Example:
+    with transaction.atomic():
+        mark_products_changed([rice.id])
+        mark_nodes_changed("food", [plov.id])
+    # One recalculation runs (or is queued) here, after the commit
+"""
+
+import threading
+import uuid
+import weakref
+
+import redis
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from apps.products.utils.dependency_graph import get_ancestor_ids, get_dependent_ids
+from apps.warehouses.utils.recalculate_dependencies import DependencyRecalculator
+
+DIRTY_KEY = "catalog:recompute:dirty"
+PROCESSING_KEY = "catalog:recompute:processing"
+LOCK_KEY = "catalog:recompute:lock"
+
+_state = threading.local()
+_redis = None
+
+
+def get_redis():
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_PORT_URL)
+    return _redis
+
+
+def get_pending(using):
+    """
+    Returns:
+        dict: The changes collected on the connection ``using`` of this thread
+              and the token of their scheduled flush (None if not scheduled)
+    """
+    if not hasattr(_state, "pending"):
+        _state.pending = {}
+    return _state.pending.setdefault(using, {"products": set(), "nodes": {}, "scheduled": None})
+
+
+def reset_pending(using, token):
+    """
+    Drop the pending changes and the "flush scheduled" flag, unless a newer
+    flush has been scheduled since ``token`` was issued.
+    """
+    pending = get_pending(using)
+    if pending["scheduled"] is token:
+        pending["products"].clear()
+        pending["nodes"].clear()
+        pending["scheduled"] = None
+
+
+def schedule_flush(using):
+    """
+    Return the pending changes of the current transaction, scheduling their
+    flush on the first call.
+
+    The "flush scheduled" flag is reset by the flush itself on commit. On
+    rollback Django discards the callback; ``weakref.finalize`` notices the
+    callback being released and resets the flag together with the changes
+    of the rolled back transaction.
+    """
+    pending = get_pending(using)
+    if pending["scheduled"] is None:
+        token = object()
+
+        def flush():
+            flush_changed_dependencies(using)
+
+        weakref.finalize(flush, reset_pending, using, token)
+        pending["scheduled"] = token
+        transaction.on_commit(flush, using=using)
+    return pending
+
+
+def mark_products_changed(product_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Mark products whose stock has changed.
+
+    Args:
+        product_ids: Iterable of Product IDs
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    if not transaction.get_connection(using).in_atomic_block:
+        dispatch_changes(product_ids, {})
+        return
+    schedule_flush(using)["products"] |= product_ids
+
+
+def mark_nodes_changed(node_type, node_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Mark catalog nodes whose prices or statuses must be recomputed, together
+    with every node above them.
+
+    Args:
+        node_type: One of "recipe_food", "food", "menu", "recipe"
+        node_ids: Iterable of node IDs of that type
+    """
+    node_ids = set(node_ids)
+    if not node_ids:
+        return
+    if not transaction.get_connection(using).in_atomic_block:
+        dispatch_changes(set(), {node_type: node_ids})
+        return
+    schedule_flush(using)["nodes"].setdefault(node_type, set()).update(node_ids)
+
+
+def flush_changed_dependencies(using=DEFAULT_DB_ALIAS):
+    """
+    Recompute (or queue) everything marked in the committed transaction.
+
+    Returns:
+        dict: Dictionary with the updated objects per model, None if nothing
+              was recomputed
+    """
+    pending = get_pending(using)
+    product_ids, nodes = set(pending["products"]), dict(pending["nodes"])
+    pending["products"].clear()
+    pending["nodes"].clear()
+    pending["scheduled"] = None
+    return dispatch_changes(product_ids, nodes)
+
+
+def dispatch_changes(product_ids, nodes):
+    if not product_ids and not nodes:
+        return None
+    if settings.CATALOG_RECOMPUTE_ASYNC:
+        enqueue_changes(product_ids, nodes)
+        return None
+    return recalculate_changes(product_ids, nodes)
+
+
+def recalculate_changes(product_ids, nodes):
+    """
+    Merge the changed products and nodes with their dependents and recompute
+    them in one ``DependencyRecalculator`` pass.
+
+    Args:
+        product_ids: Set of Product IDs
+        nodes: Dictionary mapping node types to sets of node IDs
+    """
+    merged = get_dependent_ids(product_ids)
+    for node_type, node_ids in nodes.items():
+        for level, ids in get_ancestor_ids(node_type, node_ids).items():
+            merged.setdefault(level, set()).update(ids)
+    return DependencyRecalculator(merged, product_ids).run()
+
+
+def enqueue_changes(product_ids, nodes):
+    """
+    Add the changed IDs to the Redis set drained by the recompute worker.
+    Members are ``"<node type>:<id>"``, products use the ``"product"`` type.
+    """
+    members = [f"product:{product_id}" for product_id in product_ids]
+    members += [f"{node_type}:{node_id}" for node_type, node_ids in nodes.items() for node_id in node_ids]
+    get_redis().sadd(DIRTY_KEY, *members)
+
+
+def is_catalog_stale():
+    """
+    Returns:
+        bool: True while queued changes have not been recomputed yet
+    """
+    if not settings.CATALOG_RECOMPUTE_ASYNC:
+        return False
+    return get_redis().exists(DIRTY_KEY, PROCESSING_KEY) > 0
+
+
+def drain_changed_dependencies():
+    """
+    Recompute every queued change in one batch.
+
+    The dirty set is renamed to a processing set, so changes queued meanwhile
+    go to the next batch. The processing set is removed only after the
+    recalculation has been committed; a batch interrupted by a crash is
+    retried by the next run.
+
+    Returns:
+        int: Number of recomputed queue entries
+    """
+    client = get_redis()
+    lock = client.lock(LOCK_KEY, timeout=300, blocking=False)
+    if not lock.acquire():
+        return 0
+
+    try:
+        if not client.exists(PROCESSING_KEY):
+            try:
+                client.rename(DIRTY_KEY, PROCESSING_KEY)
+            except redis.ResponseError:
+                # === Nothing was queued since the last batch ===
+                return 0
+
+        members = client.smembers(PROCESSING_KEY)
+        product_ids, nodes = set(), {}
+        for member in members:
+            node_type, node_id = member.decode().split(":", 1)
+            if node_type == "product":
+                product_ids.add(uuid.UUID(node_id))
+            else:
+                nodes.setdefault(node_type, set()).add(uuid.UUID(node_id))
+
+        with transaction.atomic():
+            recalculate_changes(product_ids, nodes)
+        client.delete(PROCESSING_KEY)
+        return len(members)
+    finally:
+        lock.release()
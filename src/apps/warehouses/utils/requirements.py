@@ -0,0 +1,184 @@
+"""
+Requirements Explosion Utility Module
+
+This module explodes any mix of foods, menus and recipes into the products they
+require (bill of materials) and compares the totals with the stock ledger.
+
+The whole catalog walk takes a bounded number of queries regardless of how many
+items are given: recipe menus, menu foods and food recipe foods are each read
+with one query, available quantities with one ledger read and product names
+only for products that are actually short.
+
+Example:
+    result = explode_requirements({("food", food.id): 2, ("recipe", recipe.id): 1})
+    # Returns: {
+    #     ("food", food.id): {
+    #         "requirements": {product_id: Decimal("500")},
+    #         "available": True,
+    #         "missing": {},
+    #     },
+    #     ...
+    # }
+"""
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.apps import apps
+
+from apps.warehouses.utils.product_stock import get_available_quantities
+
+
+def load_recipe_menus(recipe_ids):
+    """
+    Returns:
+        dict: {recipe_id: [menu_id, ...]} in breakfast, lunch, dinner order
+    """
+    Recipe = apps.get_model("menus", "Recipe")
+    if not recipe_ids:
+        return {}
+
+    rows = Recipe.objects.filter(id__in=recipe_ids).values_list(
+        "id", "menu_breakfast_id", "menu_lunch_id", "menu_dinner_id"
+    )
+    return {
+        recipe_id: [menu_id for menu_id in menu_ids if menu_id]
+        for recipe_id, *menu_ids in rows
+    }
+
+
+def load_menu_foods(menu_ids):
+    """
+    Returns:
+        dict: {menu_id: [food_id, ...]}
+    """
+    Menu = apps.get_model("menus", "Menu")
+    menu_foods = defaultdict(list)
+    if not menu_ids:
+        return menu_foods
+
+    rows = Menu.foods.through.objects.filter(menu_id__in=menu_ids).values_list("menu_id", "food_id")
+    for menu_id, food_id in rows:
+        menu_foods[menu_id].append(food_id)
+    return menu_foods
+
+
+def load_food_requirements(food_ids):
+    """
+    Returns:
+        dict: {food_id: {product_id: quantity required by one portion}}
+    """
+    Food = apps.get_model("foods", "Food")
+    food_requirements = defaultdict(lambda: defaultdict(Decimal))
+    if not food_ids:
+        return food_requirements
+
+    rows = Food.recipes.through.objects.filter(food_id__in=food_ids).values_list(
+        "food_id", "recipefood__product_id", "recipefood__count"
+    )
+    for food_id, product_id, count in rows:
+        food_requirements[food_id][product_id] += count
+    return food_requirements
+
+
+def get_missing_products(requirements, available_quantities, products):
+    """
+    Returns:
+        dict: {product name: {"measure": abbreviation, "missing": "5.25"}}
+    """
+    missing_products = {}
+    for product_id, required_quantity in requirements.items():
+        missing_quantity = required_quantity - available_quantities.get(product_id, Decimal("0"))
+        if missing_quantity > 0:
+            product = products[product_id]
+            rounded_missing = Decimal(str(missing_quantity)).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+            missing_products[product.name] = {
+                "measure": product.measure.abbreviation,
+                "missing": str(rounded_missing),
+            }
+    return missing_products
+
+
+def explode_requirements(items):
+    """
+    Explode foods, menus and recipes into product requirements and check them
+    against the warehouse.
+
+    Args:
+        items: Dictionary mapping (item_type, item_id) to a multiplier, where
+               item_type is one of "food", "menu", "recipe"
+               Example: {("food", food_id): 3, ("menu", menu_id): 1}
+
+    Returns:
+        dict: Dictionary mapping every given (item_type, item_id) to
+              {"requirements": {product_id: quantity},
+               "available": bool,
+               "missing": {product name: {"measure": ..., "missing": ...}}}
+    """
+    Product = apps.get_model("products", "Product")
+
+    item_ids = defaultdict(set)
+    for item_type, item_id in items:
+        item_ids[item_type].add(item_id)
+
+    recipe_menus = load_recipe_menus(item_ids["recipe"])
+
+    menu_ids = set(item_ids["menu"])
+    for ids in recipe_menus.values():
+        menu_ids.update(ids)
+    menu_foods = load_menu_foods(menu_ids)
+
+    food_ids = set(item_ids["food"])
+    for ids in menu_foods.values():
+        food_ids.update(ids)
+    food_requirements = load_food_requirements(food_ids)
+
+    # === Requirements of every item, scaled by its multiplier ===
+    requirements = {}
+    for (item_type, item_id), multiplier in items.items():
+        match item_type:
+            case "food":
+                item_food_ids = [item_id]
+            case "menu":
+                item_food_ids = menu_foods[item_id]
+            case "recipe":
+                item_food_ids = [
+                    food_id
+                    for menu_id in recipe_menus.get(item_id, [])
+                    for food_id in menu_foods[menu_id]
+                ]
+
+        item_requirements = defaultdict(Decimal)
+        for food_id in item_food_ids:
+            for product_id, count in food_requirements[food_id].items():
+                item_requirements[product_id] += count * multiplier
+        requirements[(item_type, item_id)] = dict(item_requirements)
+
+    product_ids = {product_id for item in requirements.values() for product_id in item}
+    available_quantities = get_available_quantities(product_ids)
+
+    short_product_ids = {
+        product_id
+        for item in requirements.values()
+        for product_id, required_quantity in item.items()
+        if required_quantity > available_quantities[product_id]
+    }
+    products = (
+        Product.objects.select_related("measure").in_bulk(short_product_ids)
+        if short_product_ids
+        else {}
+    )
+
+    return {
+        item: {
+            "requirements": item_requirements,
+            "available": all(
+                required_quantity <= available_quantities[product_id]
+                for product_id, required_quantity in item_requirements.items()
+            ),
+            "missing": get_missing_products(item_requirements, available_quantities, products),
+        }
+        for item, item_requirements in requirements.items()
+    }
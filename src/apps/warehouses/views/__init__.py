@@ -1 +1,2 @@
+from .mixins import *
 from .warehouse import *
\ No newline at end of file
@@ -0,0 +1,16 @@
+from apps.warehouses.utils.recalculation_queue import is_catalog_stale
+
+
+class CatalogStaleMixin:
+    """
+    CatalogStaleMixin: Marks catalog reads whose statuses and prices may be out of date.
+    With CATALOG_RECOMPUTE_ASYNC enabled, changes are recomputed by a Celery worker a few seconds after they
+    are saved; until that batch lands, GET responses carry the ``X-Catalog-Stale: true`` header.
+    Example: Use in food, recipe food, menu and recipe views.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == "GET" and is_catalog_stale():
+            response["X-Catalog-Stale"] = "true"
+        return response
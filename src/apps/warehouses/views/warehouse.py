@@ -8,7 +8,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.base.views import CustomListCreateAPIView, CustomGenericAPIView
 from apps.warehouses.models import Warehouse, Experience
-from apps.warehouses.serializers import WarehouseSerializer, WarehouseExpensesSerializer
+from apps.warehouses.serializers import (
+    WarehouseBulkReceiveSerializer,
+    WarehouseExpensesSerializer,
+    WarehouseSerializer,
+)
 from apps.warehouses.utils import validate_uuid
 
 
@@ -63,3 +67,18 @@ class WarehouseListCreateAPIView(CustomListCreateAPIView):
         "product__measure_warehouse": ["exact"],
     }
     search_fields = ["product__name"]
+
+
+class WarehouseBulkReceiveAPIView(CustomGenericAPIView):
+    """
+    Receives a whole delivery note in one transaction and returns the created
+    batches in line order.
+    """
+    serializer_class = WarehouseBulkReceiveSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        batches = serializer.save()
+        data = WarehouseSerializer(batches, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=201)
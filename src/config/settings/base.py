@@ -57,6 +57,7 @@ INSTALLED_APPS += [
     'apps.sections.apps.SectionsConfig',
     'apps.transports.apps.TransportsConfig',
     'apps.warehouses.apps.WarehousesConfig',
+    'apps.statistics.apps.StatisticsConfig',
 ]
 
 MIDDLEWARE = [
@@ -1,8 +1,11 @@
 import os
+from datetime import timedelta
 
 from celery.schedules import crontab
 from dotenv import load_dotenv
 
+from config.settings.envs import CATALOG_RECOMPUTE_ASYNC, CATALOG_RECOMPUTE_INTERVAL
+
 
 load_dotenv()
 
@@ -21,12 +24,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.guests.tasks.update_daily_guest_prices',
         'schedule': crontab(minute=1),  # Run every 00:00 hour
     },
-    'update-hotel-order-statuses-every-midnight': {
-        'task': 'apps.orders.tasks.update_order_status.update_order_status_daily',
-        'schedule': crontab(minute=0, hour=0),  # Run every 00:00 hour
+    'transition-hotel-order-statuses-every-ten-minutes': {
+        'task': 'apps.orders.tasks.update_order_status.transition_hotel_order_statuses_task',
+        'schedule': crontab(minute='*/10'),  # Run every 10 minutes
     },
     'refresh-room-occupancy-every-minute': {
         'task': 'apps.rooms.tasks.refresh_all_room_occupancy',
         'schedule': crontab(minute='*/60'),  # Run every 1 hour
     },
-}
\ No newline at end of file
+    'apply-room-occupancy-events-every-minute': {
+        'task': 'apps.rooms.tasks.apply_occupancy_events',
+        'schedule': crontab(),  # Run every minute
+    },
+}
+
+if CATALOG_RECOMPUTE_ASYNC:
+    CELERY_BEAT_SCHEDULE['drain-catalog-recompute-queue-every-few-seconds'] = {
+        'task': 'apps.warehouses.tasks.recompute_catalog.drain_catalog_recompute_queue',
+        'schedule': timedelta(seconds=CATALOG_RECOMPUTE_INTERVAL),  # Run every few seconds
+    }
@@ -32,3 +32,7 @@ ENV = os.getenv("ENV")
 PRIVATE_KEY = open('./config/secrets/private.pem').read()
 PUBLIC_KEY = open('./config/secrets/public.pem').read()
 
+
+# ===================== Catalog recompute configurations =====================
+CATALOG_RECOMPUTE_ASYNC = os.getenv("CATALOG_RECOMPUTE_ASYNC", "false").lower() in ("true", "yes", "1")
+CATALOG_RECOMPUTE_INTERVAL = int(os.getenv("CATALOG_RECOMPUTE_INTERVAL", 5))